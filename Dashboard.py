@@ -1,10 +1,23 @@
+import time
+_inicio_script = time.perf_counter()
+
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 import os
 from datetime import datetime
-import plotly.graph_objects as go
 import numpy as np
+from startup import ModuloDiferido, registrar_render
+from data_cleaning import limpiar_dataframe
+from data_validation import validar
+from data_store import cargar_con_version, filtrar_fechas
+from basket import pares_frecuentes
+from anomalies import SEMANAS_BASE
+from paged_table import tabla_paginada
+from comparisons import COMPARACIONES, diario_cortes, diario_ventas, serie_diaria, comparar, variacion, serie_comparada
+
+# Plotly se importa hasta la primera gráfica: los KPIs se pintan antes
+px = ModuloDiferido("plotly.express")
+go = ModuloDiferido("plotly.graph_objects")
 
 # --- CONFIGURACIÓN DE LA PÁGINA ---
 st.set_page_config(
@@ -14,80 +27,72 @@ st.set_page_config(
 )
 
 # --- FUNCIÓN DE CARGA Y LIMPIEZA DE DATOS ---
+# Los reportes del pipeline viven en el cache del proceso (data_store), compartido
+# entre sesiones y precargado por startup.py; sólo los archivos subidos pasan por st.cache_data.
 @st.cache_data
+def load_subido(archivo):
+    # Un archivo subido a mano no pasó por el pipeline: mismas reglas de validación
+    validas, _, resumen = validar(pd.read_csv(archivo), 'ventas')
+    if resumen['cuarentena']:
+        st.warning(f"Se descartaron {resumen['cuarentena']:,} de {resumen['filas']:,} filas con datos inválidos: {resumen['motivos']}")
+    return limpiar_dataframe(validas)
+
 def load_data(file_path):
+    # (DataFrame, versión): la versión va en la clave de todo st.cache_data calculado con ese DataFrame
     try:
-        # Detectar si el archivo existe
-        if not os.path.exists(file_path):
-            return None
+        if isinstance(file_path, str):
+            return cargar_con_version(file_path)
+        return load_subido(file_path), file_path.file_id
 
-        df = pd.read_csv(file_path)
-        
-        # 1. Normalización de Nombres de Columnas
-        df.columns = df.columns.str.strip()
-        
-        # 2. Manejo de Fechas
-        if 'FECHA' in df.columns:
-            df['FECHA'] = pd.to_datetime(df['FECHA'], errors='coerce')
-        
-        # 3. Limpieza de Moneda y Números
-        # Agregamos TOTAL_FACTURA, SUBTOTAL_FACTURA, IMPUESTOS_FACTURA a la limpieza
-        cols_moneda = [
-            'PRECIO_UNITARIO_FINAL', 'TOTAL_TICKET_PAGADO', 
-            'DINERO_RECIBIDO', 'CAMBIO_CALCULADO', 
-            'MONTO_DESCUENTO', 'PRECIO_RENGLON_IVA', 'TOTAL_TICKET_IVA',
-            'TOTAL_FACTURA', 'SUBTOTAL_FACTURA', 'IMPUESTOS_FACTURA',
-            'PRECIO_UNITARIO', 'IMPORTE_RENGLON'
-        ]
-        
-        for col in cols_moneda:
-            if col in df.columns:
-                # Quitamos signos de pesos y comas, convertimos a numérico
-                df[col] = df[col].astype(str).str.replace('$', '', regex=False).str.replace(',', '', regex=False)
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-
-        # 4. Limpieza de Porcentajes
-        if '%_DESCUENTO' in df.columns:
-            df['%_DESCUENTO'] = df['%_DESCUENTO'].astype(str).str.replace('%', '', regex=False)
-            df['%_DESCUENTO'] = pd.to_numeric(df['%_DESCUENTO'], errors='coerce').fillna(0)
-
-        # 5. Lógica de Importe Real para Ventas
-        # Solo aplica si es el archivo de Ventas (tiene TIPO_MOV)
-        if 'TIPO_MOV' in df.columns:
-            # Calculamos importe renglón si no existe explícitamente limpio
-            if 'IMPORTE_RENGLON_CALC' not in df.columns:
-                # Prioridad: Importe Renglon -> Precio Final * Cantidad
-                if 'PRECIO_UNITARIO_FINAL' in df.columns and 'CANTIDAD' in df.columns:
-                    df['IMPORTE_RENGLON_CALC'] = df['PRECIO_UNITARIO_FINAL'] * df['CANTIDAD']
-                else:
-                    df['IMPORTE_RENGLON_CALC'] = 0.0
+    except Exception as e:
+        st.error(f"Error al procesar el archivo {file_path}: {e}")
+        return None, None
 
-            df['IMPORTE_REAL'] = df.apply(
-                lambda x: -abs(x['IMPORTE_RENGLON_CALC']) if str(x['TIPO_MOV']).upper() == 'DEVOLUCION' else x['IMPORTE_RENGLON_CALC'], axis=1
-            )
-        
-        # 6. Corrección de Hora y Fecha String
-        if 'HORA' in df.columns:
-            def parse_hour_intelligent(h_str):
-                h_str = str(h_str).strip()
-                try:
-                    return datetime.strptime(h_str, '%I:%M %p').hour # AM/PM
-                except:
-                    try:
-                        return int(h_str.split(':')[0]) # Militar
-                    except:
-                        return 0
-            
-            df['HORA_NUM'] = df['HORA'].apply(parse_hour_intelligent)
-            
-        if 'FECHA' in df.columns:
-            df['FECHA_STR'] = df['FECHA'].dt.strftime('%Y-%m-%d')
+# --- SERIES DIARIAS PARA COMPARACIÓN DE PERIODOS ---
+# Los DataFrames no se hashean (prefijo _); la clave es la ruta y la versión cargada (snapshot o mtime)
+@st.cache_data
+def series_diarias(_df_cortes, _df_ventas, clave):
+    if _df_cortes is not None:
+        dia_cortes = diario_cortes(_df_cortes)
+    else:
+        dia_cortes = pd.DataFrame(columns=['SUCURSAL', 'FECHA', 'VENTA_NETA', 'CORTES'])
+    return dia_cortes, diario_ventas(_df_ventas)
 
-        return df
+# --- SALIDAS PRECALCULADAS DEL PIPELINE (carpeta datos/) ---
+# La fecha de modificación entra en la clave del cache para tomar cada nueva corrida
+DATOS_DIR = os.path.join(os.getcwd(), "datos")
 
-    except Exception as e:
-        st.error(f"Error al procesar el archivo {file_path}: {e}")
+@st.cache_data
+def load_precalculado(ruta, mtime, fechas=()):
+    return pd.read_csv(ruta, parse_dates=list(fechas))
+
+def leer_precalculado(*partes, fechas=()):
+    ruta = os.path.join(DATOS_DIR, *partes)
+    if not os.path.exists(ruta):
         return None
+    return load_precalculado(ruta, os.path.getmtime(ruta), tuple(fechas))
+
+# --- ANÁLISIS DE CANASTA (CACHE POR RANGO DE FECHAS Y TIENDA) ---
+@st.cache_data(max_entries=32)
+def canasta(_df_ventas, clave, start_date, end_date, sucursal):
+    df = filtrar_fechas(_df_ventas, start_date, end_date)
+    if sucursal != "Todos":
+        df = df[df['SUCURSAL'] == sucursal]
+
+    pares = pares_frecuentes(df)
+    catalogo = df.drop_duplicates('CLAVE')
+    nombres = pd.Series(catalogo['ARTICULO'].values, index=catalogo['CLAVE'].astype(str))
+    pares['ARTICULO_A'] = pares['CLAVE_A'].map(nombres)
+    pares['ARTICULO_B'] = pares['CLAVE_B'].map(nombres)
+    # Confianzas en % para las barras de progreso (misma escala que Penetración)
+    pares[['CONFIANZA_A_B', 'CONFIANZA_B_A']] *= 100
+    return pares
+
+ETIQUETAS_COMP = {
+    "Año anterior": "vs año ant.",
+    "Año anterior (mismo día de semana)": "vs año ant. (mismo día)",
+    "Periodo anterior": "vs periodo ant.",
+}
 
 # --- CARGA DE ARCHIVOS ---
 #st.title("📊 Dashboard de Ventas Ferretería")
@@ -98,25 +103,16 @@ ruta_facturas = os.path.join(os.getcwd(), "Reporte_Facturas_Detallado.csv")
 
 # ... (código existente de carga de ventas y facturas)
 ruta_cortes = os.path.join(os.getcwd(), "Reporte_Cortes_Detallado.csv")
-df_cortes = load_data(ruta_cortes)
-
-# Limpieza especifica para Cortes (Asegurar que columnas clave sean numéricas)
-if df_cortes is not None:
-    cols_corte_num = ['VENTAS_TOT', 'RETIROS', 'SISTEMA_DE_EFECTIVO', 'REAL_CONTADO', 'DIFERENCIA']
-    for col in cols_corte_num:
-        if col in df_cortes.columns:
-            # Limpiar signos de $ y comas si load_data no lo cubrió
-            df_cortes[col] = df_cortes[col].astype(str).str.replace('$', '', regex=False).str.replace(',', '', regex=False)
-            df_cortes[col] = pd.to_numeric(df_cortes[col], errors='coerce').fillna(0)
+df_cortes, ver_cortes = load_data(ruta_cortes)
 
-df_ventas = load_data(ruta_ventas)
-df_facturas = load_data(ruta_facturas)
+df_ventas, ver_ventas = load_data(ruta_ventas)
+df_facturas, ver_facturas = load_data(ruta_facturas)
 
 if df_ventas is None:
     st.warning(f"No se encontró el archivo principal: `Reporte_Ventas_Historico.csv`. Por favor cárgalo o genéralo.")
     uploaded_file = st.file_uploader("Subir Reporte de Ventas", type=["csv"])
     if uploaded_file:
-        df_ventas = load_data(uploaded_file)
+        df_ventas, ver_ventas = load_data(uploaded_file)
 
 # --- INICIO DEL DASHBOARD ---
 if df_ventas is not None:
@@ -157,30 +153,21 @@ if df_ventas is not None:
     # Filtrado de Ventas
     if len(date_range) == 2:
         start_date, end_date = date_range
-        mask_ventas = (df_ventas['FECHA'].dt.date >= start_date) & (df_ventas['FECHA'].dt.date <= end_date)
-        df_v_filtered = df_ventas[mask_ventas]
-        
-        # --- CÁLCULO DE PERÍODO ANTERIOR (MISMO RANGO, AÑO PASADO) ---
-        dias_diferencia = (end_date - start_date).days
-        start_date_ly = start_date.replace(year=start_date.year - 1)
-        end_date_ly = end_date.replace(year=end_date.year - 1)
-        
-        mask_ventas_ly = (df_ventas['FECHA'].dt.date >= start_date_ly) & (df_ventas['FECHA'].dt.date <= end_date_ly)
-        df_v_filtered_ly = df_ventas[mask_ventas_ly]
+        df_v_filtered = filtrar_fechas(df_ventas, start_date, end_date)
     else:
+        start_date, end_date = min_date, max_date
         df_v_filtered = df_ventas
-        df_v_filtered_ly = pd.DataFrame()  # Sin comparación si no hay rango definido
 
     # Filtrado de Facturas (Si existe el archivo)
     df_f_filtered = pd.DataFrame() # Vacío por defecto
     total_facturado_kpi = 0.0
+    facturas_sin_cuadre = 0
     
     if df_facturas is not None:
         if len(date_range) == 2:
-            mask_facturas = (df_facturas['FECHA'].dt.date >= start_date) & (df_facturas['FECHA'].dt.date <= end_date)
-            df_f_filtered = df_facturas[mask_facturas]
+            df_f_filtered = filtrar_fechas(df_facturas, start_date, end_date).copy()
         else:
-            df_f_filtered = df_facturas
+            df_f_filtered = df_facturas.copy()  # El DataFrame del cache es compartido: no se modifica
             
         # --- CÁLCULO DE TOTAL FACTURADO ---
         # 1. Filtramos solo vigentes (no canceladas)
@@ -191,6 +178,8 @@ if df_ventas is not None:
             
             facturas_unicas = df_f_filtered[df_f_filtered['ESTATUS'] != 'CANCELADA'].drop_duplicates(subset=['FOLIO_INTERNO'])
             total_facturado_kpi = facturas_unicas['TOTAL_FACTURA'].sum()
+            if 'ALERTA_RENGLONES' in facturas_unicas.columns:
+                facturas_sin_cuadre = int(facturas_unicas['ALERTA_RENGLONES'].sum())
 
     # Filtros Dinámicos (Solo afectan a ventas visualmente, lógica de negocio)
     if 'SUCURSAL' in df_v_filtered.columns:
@@ -204,93 +193,80 @@ if df_ventas is not None:
         sel_lin = sidebar.selectbox("Línea", lineas)
         if sel_lin != "Todas": 
             df_v_filtered = df_v_filtered[df_v_filtered['LINEA'] == sel_lin]
+    else:
+        sel_lin = "Todas"
+
+    # Periodo de referencia para todas las variaciones (%) y la línea gris de Tiempo
+    sel_comp = sidebar.selectbox("Comparar contra", list(COMPARACIONES))
+    etiqueta_comp = ETIQUETAS_COMP[sel_comp]
+
+    # Identifica el contenido de las tablas de detalle (orden y búsqueda se cachean con ella)
+    clave_filtros = (ruta_ventas, ver_ventas, ruta_cortes, ver_cortes, start_date, end_date, sel_alm, sel_lin)
 
 # --- 1. CÁLCULOS KPI PRINCIPALES (BASADOS EN CORTES DE CAJA) ---
     venta_neta_kpi = 0.0
-    venta_neta_ly = 0.0
     venta_bancos = 0.0
     pct_bancos = 0.0
     total_retiros_kpi = 0.0
 
     if df_cortes is not None:
         # Filtrado de Cortes (Periodo Actual)
-        mask_c = (df_cortes['FECHA'].dt.date >= start_date) & (df_cortes['FECHA'].dt.date <= end_date)
-        df_c_filtered_kpi = df_cortes[mask_c].copy()
-        
-        # Filtrado de Cortes (Año Pasado)
-        mask_c_ly = (df_cortes['FECHA'].dt.date >= start_date_ly) & (df_cortes['FECHA'].dt.date <= end_date_ly)
-        df_c_ly_kpi = df_cortes[mask_c_ly].copy()
+        df_c_filtered_kpi = filtrar_fechas(df_cortes, start_date, end_date).copy()
 
         # Aplicar filtro de Sucursal
         if sel_alm != "Todos":
             df_c_filtered_kpi = df_c_filtered_kpi[df_c_filtered_kpi['SUCURSAL'] == sel_alm]
-            if not df_c_ly_kpi.empty:
-                df_c_ly_kpi = df_c_ly_kpi[df_c_ly_kpi['SUCURSAL'] == sel_alm]
 
         # Totales Dinero
         venta_neta_kpi = df_c_filtered_kpi['VENTAS_TOTALES_NETAS'].sum()
-        venta_neta_ly = df_c_ly_kpi['VENTAS_TOTALES_NETAS'].sum() if not df_c_ly_kpi.empty else 0.0
         
         venta_bancos = df_c_filtered_kpi['PAGO_DEBITO'].sum() + df_c_filtered_kpi['PAGO_CREDITO'].sum()
         pct_bancos = (venta_bancos / venta_neta_kpi * 100) if venta_neta_kpi > 0 else 0
         total_retiros_kpi = df_c_filtered_kpi['RETIROS'].sum()
 
     # --- 2. CÁLCULOS DE VOLUMEN (TICKETS Y PROMEDIOS) ---
-    # Periodo Actual
     total_tickets = df_v_filtered[df_v_filtered['TIPO_MOV'] == 'VENTA']['FOLIO'].nunique()
     ticket_promedio = venta_neta_kpi / total_tickets if total_tickets > 0 else 0.0
 
-    # Periodo Año Pasado (DEFINICIONES FALTANTES)
-    total_tickets_ly = 0
-    ticket_promedio_ly = 0.0
-    if not df_v_filtered_ly.empty:
-        total_tickets_ly = df_v_filtered_ly[df_v_filtered_ly['TIPO_MOV'] == 'VENTA']['FOLIO'].nunique()
-        ticket_promedio_ly = venta_neta_ly / total_tickets_ly if total_tickets_ly > 0 else 0.0
-
-    # --- 3. VARIACIONES (%) ---
-    var_venta = ((venta_neta_kpi - venta_neta_ly) / venta_neta_ly * 100) if venta_neta_ly > 0 else 0.0
-    var_ticket_prom = ((ticket_promedio - ticket_promedio_ly) / ticket_promedio_ly * 100) if ticket_promedio_ly > 0 else 0.0
-
-    # --- 4. DEVOLUCIONES ---
+    # --- 3. DEVOLUCIONES ---
     df_devs = df_v_filtered[df_v_filtered['TIPO_MOV'] == 'DEVOLUCION']
     total_devoluciones = df_devs['IMPORTE_REAL'].sum() if not df_devs.empty else 0.0
     num_devoluciones = df_devs['FOLIO'].nunique()
-    
-    total_devoluciones_ly = 0.0
-    if not df_v_filtered_ly.empty:
-        df_devs_ly = df_v_filtered_ly[df_v_filtered_ly['TIPO_MOV'] == 'DEVOLUCION']
-        total_devoluciones_ly = abs(df_devs_ly['IMPORTE_REAL'].sum())
-    
-    var_devs_pct = ((abs(total_devoluciones) - total_devoluciones_ly) / total_devoluciones_ly * 100) if total_devoluciones_ly > 0 else 0.0
 
-    # --- 5. PROMEDIOS DIARIOS ---
-    # Actual
+    # --- 4. PROMEDIOS DIARIOS ---
     num_dias_seleccionados = df_c_filtered_kpi['FECHA'].nunique()
     dias_p_act = num_dias_seleccionados if num_dias_seleccionados > 0 else 1
     venta_promedio_dia = venta_neta_kpi / dias_p_act
     tickets_promedio_dia = total_tickets / dias_p_act
 
-    # Año Pasado (Para comparar promedios diarios)
-    num_dias_ly = df_c_ly_kpi['FECHA'].nunique() if not df_c_ly_kpi.empty else 0
-    dias_p_ly = num_dias_ly if num_dias_ly > 0 else 1
-    venta_prom_dia_ly = venta_neta_ly / dias_p_ly if venta_neta_ly > 0 else 0.0
-    tickets_prom_dia_ly = total_tickets_ly / dias_p_ly if total_tickets_ly > 0 else 0.0
+    # --- 5. VARIACIONES (%) CONTRA EL PERIODO DE REFERENCIA ---
+    # La serie diaria se arma una sola vez por archivo; cada periodo sale de sus acumulados
+    dia_cortes, dia_ventas = series_diarias(df_cortes, df_ventas, (ruta_cortes, ver_cortes, ruta_ventas, ver_ventas))
+    serie_kpi = serie_diaria(dia_cortes, dia_ventas, sel_alm, sel_lin)
+    comp = comparar(serie_kpi, start_date, end_date, [sel_comp])
+    act, ref = comp.loc["Actual"], comp.loc[sel_comp]
 
-    # Variaciones de promedios diarios
-    var_vpd = ((venta_promedio_dia - venta_prom_dia_ly) / venta_prom_dia_ly * 100) if venta_prom_dia_ly > 0 else 0.0
-    var_tpd = ((tickets_promedio_dia - tickets_prom_dia_ly) / tickets_prom_dia_ly * 100) if tickets_prom_dia_ly > 0 else 0.0
+    var_venta = variacion(act['VENTA_NETA'], ref['VENTA_NETA'])
+    var_ticket_prom = variacion(act['TICKET_PROM'], ref['TICKET_PROM'])
+    var_devs_pct = variacion(act['DEVOLUCIONES'], ref['DEVOLUCIONES'])
+    var_vpd = variacion(act['VENTA_DIA'], ref['VENTA_DIA'])
+    var_tpd = variacion(act['TICKETS_DIA'], ref['TICKETS_DIA'])
+    total_devoluciones_ref = ref['DEVOLUCIONES']
 
     # --- PESTAÑAS DEL DASHBOARD ---
-    tab1, tab2, tab3, tab4 = st.tabs(["📈 Resumen", "🕒 Tiempo", "👥 Personal", "📦 Productos"])
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["📈 Resumen", "🕒 Tiempo", "👥 Personal", "📦 Productos", "👤 Clientes"])
 
     # TAB 1: RESUMEN
     with tab1:
             # Fila 1: KPIs Principales desde Cortes
             c1, c2, c3, c4 = st.columns(4)
             
-            c1.metric("Venta Neta", f"${venta_neta_kpi:,.2f}", f"{var_venta:+.1f}% vs año ant.")
-            c2.metric("Total Facturado", f"${total_facturado_kpi:,.2f}", help="Suma de Facturas Vigentes")
-            c3.metric("Ticket Promedio", f"${ticket_promedio:,.2f}", help="Venta Cortes / Núm. Tickets")
+            c1.metric("Venta Neta", f"${venta_neta_kpi:,.2f}", f"{var_venta:+.1f}% {etiqueta_comp}")
+            ayuda_facturado = "Suma de Facturas Vigentes"
+            if facturas_sin_cuadre:
+                ayuda_facturado += f" ({facturas_sin_cuadre} con renglones que no suman el subtotal, marcadas en ALERTA_RENGLONES)"
+            c2.metric("Total Facturado", f"${total_facturado_kpi:,.2f}", help=ayuda_facturado)
+            c3.metric("Ticket Promedio", f"${ticket_promedio:,.2f}", f"{var_ticket_prom:+.1f}% {etiqueta_comp}", help="Venta Cortes / Núm. Tickets")
             c4.metric("Ingreso Tarjetas", f"${venta_bancos:,.2f}", f"{pct_bancos:.1f}% del total")
             
 
@@ -299,7 +275,7 @@ if df_ventas is not None:
             o1, o2, o3, o4 = st.columns(4)
             
             o1.metric("Tickets Emitidos", f"{total_tickets:,}")
-            delta_texto = f"{var_devs_pct:+.1f}% vs año ant." if total_devoluciones_ly > 0 else None
+            delta_texto = f"{var_devs_pct:+.1f}% {etiqueta_comp}" if total_devoluciones_ref > 0 else None
 
             o2.metric("Monto Devoluciones", f"${total_devoluciones:,.2f}", delta=delta_texto, delta_color="inverse")
             o3.metric("Núm. Devoluciones", f"{num_devoluciones}")
@@ -363,6 +339,13 @@ if df_ventas is not None:
         freq_map = {"Día": "D", "Semana": "W", "Mes": "MS"}
         frecuencia = freq_map[tg]
 
+        # Días atípicos detectados por el pipeline dentro del rango y tienda seleccionados
+        df_anom = leer_precalculado("anomalias", "anomalias.csv", fechas=['FECHA'])
+        if df_anom is not None:
+            df_anom = filtrar_fechas(df_anom, start_date, end_date)
+            if sel_alm != "Todos":
+                df_anom = df_anom[df_anom['SUCURSAL'] == sel_alm]
+
         # Diccionario de traducción para días
         dias_es = {
             "Monday": "Lunes", "Tuesday": "Martes", "Wednesday": "Miércoles",
@@ -371,8 +354,9 @@ if df_ventas is not None:
 
         if not df_c_filtered_kpi.empty:
             # 1. Procesar Datos Actuales
-            df_plot_act = df_c_filtered_kpi.set_index('FECHA').resample(frecuencia)['VENTAS_TOTALES_NETAS'].sum().reset_index()
-            df_plot_act.columns = ['FECHA', 'VENTAS_ACT']
+            # Actual y referencia salen de la misma serie diaria que los KPIs de Resumen
+            df_comp = serie_comparada(serie_kpi, start_date, end_date, sel_comp, frecuencia)
+            df_plot_act = df_comp.dropna(subset=['VENTAS_ACT'])[['FECHA', 'VENTAS_ACT']].reset_index(drop=True)
             
             # --- NUEVA SECCIÓN: CÁLCULOS ESTADÍSTICOS ROBUSTOS ---
             ventas_serie = df_plot_act['VENTAS_ACT'].values
@@ -426,34 +410,22 @@ if df_ventas is not None:
 
             st.markdown("---")
 
-            if not df_c_ly_kpi.empty:
-                # 2. Procesar Datos Año Pasado
-                df_plot_ly = df_c_ly_kpi.copy()
-                df_plot_ly = df_plot_ly.set_index('FECHA').resample(frecuencia)['VENTAS_TOTALES_NETAS'].sum().reset_index()
-                df_plot_ly['FECHA'] = df_plot_ly['FECHA'] + pd.DateOffset(years=1)
-                df_plot_ly.columns = ['FECHA', 'VENTAS_LY']
-                
-                df_comp = pd.merge(df_plot_act, df_plot_ly, on='FECHA', how='outer').sort_values('FECHA')
-            else:
-                df_comp = df_plot_act.copy()
-                df_comp['VENTAS_LY'] = None
-
             # Etiqueta de día para la gráfica de líneas
             df_comp['DIA_SEMANA'] = df_comp['FECHA'].dt.day_name().map(dias_es)
 
             fig = go.Figure()
             
-            # --- LÍNEA AÑO PASADO ---
+            # --- LÍNEA PERIODO DE REFERENCIA ---
             fig.add_trace(go.Scatter(
-                x=df_comp['FECHA'], y=df_comp['VENTAS_LY'],
-                name='Año Pasado',
+                x=df_comp['FECHA'], y=df_comp['VENTAS_REF'],
+                name=sel_comp,
                 customdata=df_comp['DIA_SEMANA'],
                 line=dict(color='#BDC3C7', width=2, dash='dot'),
                 connectgaps=True,
                 mode='lines+text',
-                text=[f"${y/1e3:.1f}k" if (not pd.isna(y) and y > 0) else "" for y in df_comp['VENTAS_LY']],
+                text=[f"${y/1e3:.1f}k" if (not pd.isna(y) and y > 0) else "" for y in df_comp['VENTAS_REF']],
                 textposition="top center",
-                hovertemplate='<b>%{customdata}</b> %{x|%d-%b}<br>Pasado: $%{y:,.2f}<extra></extra>'
+                hovertemplate='<b>%{customdata}</b> %{x|%d-%b}<br>' + sel_comp + ': $%{y:,.2f}<extra></extra>'
             ))
             
             # --- LÍNEA AÑO ACTUAL ---
@@ -469,6 +441,18 @@ if df_ventas is not None:
                 textfont=dict(size=11, color='#2ECC71'),
                 hovertemplate='<b>%{customdata}</b> %{x|%d-%b}<br>Actual: $%{y:,.2f}<extra></extra>'
             ))
+
+            # --- MARCAS DE DÍAS ATÍPICOS (venta diaria de una tienda, todas las líneas) ---
+            if df_anom is not None and tg == "Día" and sel_alm != "Todos" and sel_lin == "Todas":
+                dias_atipicos = df_anom[(df_anom['NIVEL'] == 'Sucursal') & (df_anom['METRICA'] == 'VENTAS')]['FECHA']
+                marcas = df_comp[df_comp['FECHA'].isin(dias_atipicos)]
+                fig.add_trace(go.Scatter(
+                    x=marcas['FECHA'], y=marcas['VENTAS_ACT'],
+                    name='Día atípico',
+                    mode='markers',
+                    marker=dict(color='#E74C3C', size=16, symbol='circle-open', line=dict(width=3)),
+                    hoverinfo='skip'
+                ))
             
             fig.update_layout(
                 height=380, margin=dict(t=30, b=20, l=0, r=0), 
@@ -537,6 +521,68 @@ if df_ventas is not None:
             )
             st.plotly_chart(fig_bot, use_container_width=True)
 
+        # --- 3. PRONÓSTICO (PRECALCULADO EN EL PIPELINE PARA CADA TIENDA x LÍNEA) ---
+        df_pron = leer_precalculado("pronosticos", "pronostico_ventas.csv", fechas=['FECHA'])
+        if df_pron is not None:
+            df_pron = df_pron[(df_pron['SUCURSAL'] == sel_alm) & (df_pron['LINEA'] == sel_lin)]
+
+        if df_pron is not None and not df_pron.empty:
+            st.markdown("---")
+            real = df_pron[df_pron['TIPO'] == 'REAL']
+            futuro = df_pron[df_pron['TIPO'] == 'PRONOSTICO']
+
+            fig_pron = go.Figure()
+            # Banda 80%
+            fig_pron.add_trace(go.Scatter(
+                x=pd.concat([futuro['FECHA'], futuro['FECHA'][::-1]]),
+                y=pd.concat([futuro['LS_80'], futuro['LI_80'][::-1]]),
+                fill='toself', fillcolor='rgba(52, 152, 219, 0.2)', line=dict(width=0),
+                name='Intervalo 80%', hoverinfo='skip'
+            ))
+            fig_pron.add_trace(go.Scatter(
+                x=real['FECHA'], y=real['VENTA'], name='Real',
+                line=dict(color='#2ECC71', width=2),
+                hovertemplate='%{x|%d-%b}<br>Real: $%{y:,.2f}<extra></extra>'
+            ))
+            fig_pron.add_trace(go.Scatter(
+                x=futuro['FECHA'], y=futuro['VENTA'], name='Pronóstico',
+                line=dict(color='#3498DB', width=3, dash='dash'),
+                hovertemplate='%{x|%d-%b}<br>Pronóstico: $%{y:,.2f}<extra></extra>'
+            ))
+            fig_pron.update_layout(
+                title=f"🔮 Pronóstico de Venta ({len(futuro)} días) · {futuro['MODELO'].iloc[0]}",
+                height=350, margin=dict(t=50, b=20, l=0, r=0),
+                plot_bgcolor='rgba(0,0,0,0)', hovermode='x unified', showlegend=False,
+                yaxis=dict(showticklabels=True, showgrid=True, gridcolor='#333')
+            )
+            st.plotly_chart(fig_pron, use_container_width=True)
+
+        # --- 4. DÍAS ATÍPICOS (TIENDA Y CAJERO, PRECALCULADOS EN EL PIPELINE) ---
+        if df_anom is not None and not df_anom.empty:
+            st.markdown("---")
+            st.subheader(f"🚨 Días Atípicos del Periodo ({df_anom['FECHA'].nunique()})")
+            st.caption(f"Cada día se compara contra el mismo día de la semana de las {SEMANAS_BASE} semanas anteriores.")
+            nombres_metrica = {'VENTAS': 'Venta Neta', 'TICKETS': 'Tickets', 'DIFERENCIA': 'Diferencia de Caja'}
+            df_anom_tabla = df_anom.assign(
+                METRICA=df_anom['METRICA'].map(nombres_metrica),
+                ORDEN=df_anom['DESVIACION'].abs()
+            ).sort_values('ORDEN', ascending=False)
+            st.dataframe(
+                df_anom_tabla[['FECHA', 'SUCURSAL', 'CAJERO', 'METRICA', 'VALOR', 'ESPERADO', 'DESVIACION', 'DIRECCION']],
+                column_config={
+                    "FECHA": st.column_config.DateColumn("Fecha", format="DD/MM/YYYY"),
+                    "SUCURSAL": "Tienda",
+                    "CAJERO": "Cajero",
+                    "METRICA": "Métrica",
+                    "VALOR": st.column_config.NumberColumn("Valor", format="%.2f"),
+                    "ESPERADO": st.column_config.NumberColumn("Esperado", format="%.2f"),
+                    "DESVIACION": st.column_config.NumberColumn("Desviación", format="%.1f", help="Cuántas veces se aleja de su variación normal (mediana y MAD)"),
+                    "DIRECCION": "Dirección"
+                },
+                use_container_width=True,
+                hide_index=True
+            )
+
 
 # TAB 3: PERSONAL (INCLUYE AUDITORÍA Y GRÁFICAS)
     with tab3:
@@ -554,19 +600,100 @@ if df_ventas is not None:
             am2.metric("Descuentos > 15%", len(df_hi_audit), delta_color="inverse")
             am3.metric("Devoluciones (Docs)", num_devs_docs, delta_color="inverse")
             am4.metric("Precio $0.00", len(df_z_audit), delta_color="inverse")
-            
+
+            # --- A2. PERFIL DE DESCUENTOS Y PRECIOS (CAJERO x SKU x DÍA, PRECALCULADO EN EL PIPELINE) ---
+            df_desc = leer_precalculado("descuentos", "descuentos_cajero_sku_dia.csv", fechas=['FECHA'])
+            if df_desc is not None:
+                df_desc = filtrar_fechas(df_desc, start_date, end_date)
+                if sel_alm != "Todos":
+                    df_desc = df_desc[df_desc['SUCURSAL'] == sel_alm]
+                if sel_lin != "Todas":
+                    df_desc = df_desc[df_desc['LINEA'] == sel_lin]
+
+            if df_desc is not None and not df_desc.empty:
+                with st.expander(f"💸 Perfil de Descuentos y Precios · Ingreso perdido ${df_desc['INGRESO_PERDIDO'].sum():,.2f}"):
+                    st.caption("Ingreso perdido = (precio de referencia - precio cobrado) x unidades. La referencia es la mediana del precio sin descuento del SKU en esa tienda y mes.")
+                    cubetas = ['DESC_0_10', 'DESC_10_15', 'DESC_15_30', 'DESC_30_MAS']
+                    por_cajero = df_desc.assign(DESC_PONDERADO=df_desc['DESC_PROM'] * df_desc['RENGLONES']).groupby(['SUCURSAL', 'CAJERO']).agg(
+                        INGRESO_PERDIDO=('INGRESO_PERDIDO', 'sum'),
+                        RENGLONES=('RENGLONES', 'sum'),
+                        DESC_PONDERADO=('DESC_PONDERADO', 'sum'),
+                        DESC_ALTO=('DESC_ALTO', 'sum'),
+                        MANIPULADOS=('MANIPULADOS', 'sum'),
+                        PRECIO_CERO=('PRECIO_CERO', 'sum'),
+                        SKUS=('CLAVE', 'nunique'),
+                        **{c: (c, 'sum') for c in cubetas}
+                    ).reset_index().sort_values('INGRESO_PERDIDO', ascending=False)
+                    por_cajero['DESC_PROM'] = por_cajero['DESC_PONDERADO'] / por_cajero['RENGLONES']
+                    # El cajero puede venir como número de empleado: se usa como texto en etiquetas y filtros
+                    por_cajero['CAJERO'] = por_cajero['CAJERO'].astype(str)
+
+                    col_caj, col_dist = st.columns([3, 2])
+                    with col_caj:
+                        st.dataframe(
+                            por_cajero[['SUCURSAL', 'CAJERO', 'INGRESO_PERDIDO', 'DESC_PROM', 'DESC_ALTO', 'MANIPULADOS', 'PRECIO_CERO', 'SKUS']],
+                            column_config={
+                                "SUCURSAL": "Tienda",
+                                "CAJERO": "Cajero",
+                                "INGRESO_PERDIDO": st.column_config.ProgressColumn("Ingreso Perdido", format="$%.0f", min_value=0, max_value=float(por_cajero['INGRESO_PERDIDO'].max())),
+                                "DESC_PROM": st.column_config.NumberColumn("Desc. Prom.", format="%.1f%%"),
+                                "DESC_ALTO": st.column_config.NumberColumn("Desc. > 15%", format="%d"),
+                                "MANIPULADOS": st.column_config.NumberColumn("Precio Modif.", format="%d"),
+                                "PRECIO_CERO": st.column_config.NumberColumn("Precio $0", format="%d"),
+                                "SKUS": st.column_config.NumberColumn("SKUs", format="%d")
+                            },
+                            use_container_width=True,
+                            hide_index=True
+                        )
+                    with col_dist:
+                        dist = por_cajero.head(10).melt(id_vars=['CAJERO'], value_vars=cubetas, var_name='Rango', value_name='Renglones')
+                        dist['Rango'] = dist['Rango'].map({'DESC_0_10': '0-10%', 'DESC_10_15': '10-15%', 'DESC_15_30': '15-30%', 'DESC_30_MAS': '30%+'})
+                        fig_dist = px.bar(
+                            dist, x='Renglones', y='CAJERO', color='Rango', orientation='h',
+                            title="Distribución de Descuentos",
+                            color_discrete_sequence=['#F9E79F', '#F5B041', '#E67E22', '#C0392B']
+                        )
+                        fig_dist.update_layout(height=300, margin=dict(t=40, b=0, l=0, r=0), legend_title_text='')
+                        st.plotly_chart(fig_dist, use_container_width=True)
+
+                    # Detalle de un cajero: qué SKUs y cuánto
+                    opciones_caj = (por_cajero['SUCURSAL'].astype(str) + " · " + por_cajero['CAJERO']).tolist()
+                    sel_caj = st.selectbox("Ver SKUs del cajero:", opciones_caj, key="cajero_descuentos")
+                    suc_caj, nom_caj = sel_caj.split(" · ", 1)
+                    det = df_desc[(df_desc['SUCURSAL'].astype(str) == suc_caj) & (df_desc['CAJERO'].astype(str) == nom_caj)]
+                    por_sku = det.groupby(['CLAVE', 'ARTICULO']).agg(
+                        DIAS=('FECHA', 'nunique'),
+                        RENGLONES=('RENGLONES', 'sum'),
+                        DESC_MAX=('DESC_MAX', 'max'),
+                        DESVIACION_MIN=('DESVIACION_MIN', 'min'),
+                        MANIPULADOS=('MANIPULADOS', 'sum'),
+                        INGRESO_PERDIDO=('INGRESO_PERDIDO', 'sum')
+                    ).reset_index().sort_values('INGRESO_PERDIDO', ascending=False).head(20)
+                    st.dataframe(
+                        por_sku,
+                        column_config={
+                            "ARTICULO": "Producto",
+                            "DIAS": st.column_config.NumberColumn("Días", format="%d"),
+                            "RENGLONES": st.column_config.NumberColumn("Renglones", format="%d"),
+                            "DESC_MAX": st.column_config.NumberColumn("Desc. Máx.", format="%.1f%%"),
+                            "DESVIACION_MIN": st.column_config.NumberColumn("Peor vs Referencia", format="%.1f%%"),
+                            "MANIPULADOS": st.column_config.NumberColumn("Precio Modif.", format="%d"),
+                            "INGRESO_PERDIDO": st.column_config.NumberColumn("Ingreso Perdido", format="$%.2f")
+                        },
+                        use_container_width=True,
+                        hide_index=True
+                    )
+
             #st.markdown("---")
 
             # 2. Preparación de datos de Cortes
-            mask_c = (df_cortes['FECHA'].dt.date >= start_date) & (df_cortes['FECHA'].dt.date <= end_date)
-            df_c_personal = df_cortes[mask_c].copy()
+            # (los cortes con |DIFERENCIA| > $30,000 llegan con la DIFERENCIA vacía desde la validación:
+            # sus ventas cuentan, su diferencia no)
+            df_c_personal = filtrar_fechas(df_cortes, start_date, end_date).copy()
             
             if sel_alm != "Todos":
                 df_c_personal = df_c_personal[df_c_personal['SUCURSAL'] == sel_alm]
 
-            # ELIMINACIÓN DE OUTLIERS (> $30,000)
-            df_c_personal = df_c_personal[df_c_personal['DIFERENCIA'].abs() <= 30000]
-
             if not df_c_personal.empty:
                 # --- B. KPIs DE CAJA ---
                 #st.markdown("##### 💰 Gestión de Caja")
@@ -576,8 +703,12 @@ if df_ventas is not None:
                 total_cortes = df_c_personal['FOLIO_CORTE'].nunique()
                 cortes_modificados = df_c_personal[df_c_personal['FUE_MODIFICADO'].astype(str).str.upper() == 'SI'].shape[0]
                 total_retiros = df_c_personal['RETIROS'].sum()
+                sin_diferencia = int(df_c_personal['ALERTA_DIFERENCIA'].sum()) if 'ALERTA_DIFERENCIA' in df_c_personal.columns else 0
 
-                kc1.metric("Balance Total", f"${total_dif:,.2f}", help="Suma de diferencias de caja")
+                ayuda_balance = "Suma de diferencias de caja"
+                if sin_diferencia:
+                    ayuda_balance += f" ({sin_diferencia} cortes con diferencia fuera de ±$30,000 no cuentan)"
+                kc1.metric("Balance Total", f"${total_dif:,.2f}", help=ayuda_balance)
                 kc2.metric("Cortes Realizados", total_cortes)
                 kc3.metric("Cortes Modificados", cortes_modificados, delta_color="inverse")
                 kc4.metric("Total Retiros", f"${total_retiros:,.2f}")
@@ -655,10 +786,15 @@ if df_ventas is not None:
                         df_time = df_v_filtered.copy()
                         # Intentamos reconstruir la fecha y hora exacta de cada ticket
                         df_time['FECHA_HORA'] = pd.to_datetime(df_time['FECHA_STR'] + ' ' + df_time['HORA'], errors='coerce')
-                        df_time = df_time.dropna(subset=['FECHA_HORA']).sort_values('FECHA_HORA')
+                        df_time = df_time.dropna(subset=['FECHA_HORA'])
 
                         # 2. Calcular la diferencia de tiempo entre un ticket y el anterior (por sucursal/día)
-                        df_time['GAP_MINUTOS'] = df_time.groupby(['SUCURSAL', 'FECHA'])['FECHA_HORA'].diff().dt.total_seconds() / 60
+                        # El consolidado ya viene por fecha, tienda y hora: sólo se ordena si aparece un salto negativo
+                        gaps = df_time.groupby(['SUCURSAL', 'FECHA'])['FECHA_HORA'].diff()
+                        if (gaps < pd.Timedelta(0)).any():
+                            df_time = df_time.sort_values('FECHA_HORA')
+                            gaps = df_time.groupby(['SUCURSAL', 'FECHA'])['FECHA_HORA'].diff()
+                        df_time['GAP_MINUTOS'] = gaps.dt.total_seconds() / 60
                         
                         # Filtramos Gaps extremos (ej. más de 4 horas) porque pueden ser cierres de comida o errores
                         # Solo contamos gaps entre 1 minuto y 120 minutos como "tiempo muerto operativo"
@@ -718,7 +854,7 @@ if df_ventas is not None:
                     ][['FECHA', 'HORA', 'SUCURSAL', 'CAJA', 'CAJERO', 'VENTAS_TOTALES_NETAS', 'DIFERENCIA', 'FUE_MODIFICADO', 'USUARIO_MODIF']]
                     
                     if not alertas.empty:
-                        st.dataframe(alertas.sort_values('FECHA', ascending=False), use_container_width=True)
+                        tabla_paginada(alertas, clave_filtros, key="tabla_alertas", orden='FECHA', nombre_archivo="cortes_con_alertas.csv")
                     else:
                         st.success("No hay cortes con alertas de descuadre.")
 
@@ -726,7 +862,7 @@ if df_ventas is not None:
                     if not df_devs.empty:
                         cols_mostrar = ['FECHA', 'HORA', 'CAJERO', 'FOLIO', 'ARTICULO', 'CANTIDAD', 'IMPORTE_REAL']
                         cols_existentes = [c for c in cols_mostrar if c in df_devs.columns]
-                        st.dataframe(df_devs[cols_existentes].sort_values('FECHA', ascending=False), use_container_width=True)
+                        tabla_paginada(df_devs[cols_existentes], clave_filtros, key="tabla_devoluciones", orden='FECHA', nombre_archivo="devoluciones.csv")
                     else:
                         st.info("No se registraron devoluciones en este periodo.")
 
@@ -885,17 +1021,103 @@ if df_ventas is not None:
                 st.plotly_chart(fig_linea, use_container_width=True)
             else:
                 st.info("No se encontró la columna 'LINEA' en los datos.")
-        # --- 6. TABLA DE EXPLORACIÓN DETALLADA (AL FINAL) ---
+        # --- 6. PRODUCTOS QUE SE VENDEN JUNTOS (CANASTA) ---
         st.markdown("---")
-        with st.expander("🔍 Explorador de Inventario Vendido (Detalle Completo)"):
+        st.subheader("🧺 Productos que se Venden Juntos")
+        df_canasta = canasta(df_ventas, (ruta_ventas, ver_ventas), start_date, end_date, sel_alm)
+
+        if df_canasta.empty:
+            st.info("No hay suficientes tickets en el periodo para detectar productos que se compran juntos.")
+        else:
             st.dataframe(
-                df_prod.sort_values('Ventas ($)', ascending=False),
+                df_canasta[['ARTICULO_A', 'ARTICULO_B', 'TICKETS_JUNTOS', 'CONFIANZA_A_B', 'CONFIANZA_B_A', 'LIFT']].head(50),
+                column_config={
+                    "ARTICULO_A": "Producto A",
+                    "ARTICULO_B": "Producto B",
+                    "TICKETS_JUNTOS": st.column_config.NumberColumn("Tickets Juntos", format="%d tkt."),
+                    "CONFIANZA_A_B": st.column_config.ProgressColumn("Lleva B si lleva A", format="%.0f%%", min_value=0, max_value=100),
+                    "CONFIANZA_B_A": st.column_config.ProgressColumn("Lleva A si lleva B", format="%.0f%%", min_value=0, max_value=100),
+                    "LIFT": st.column_config.NumberColumn("Lift", format="%.1fx", help="Cuántas veces más se compran juntos de lo esperado por azar")
+                },
+                use_container_width=True,
+                hide_index=True
+            )
+
+        # --- 7. TABLA DE EXPLORACIÓN DETALLADA (AL FINAL) ---
+        st.markdown("---")
+        with st.expander("🔍 Explorador de Inventario Vendido (Detalle Completo)"):
+            tabla_paginada(
+                df_prod, clave_filtros, key="tabla_inventario",
+                orden='Ventas ($)',
                 column_config={
                     "Ventas ($)": st.column_config.NumberColumn(format="$%.2f"),
                     "Penetración (%)": st.column_config.NumberColumn(format="%.2f%%"),
                     "Unidades": st.column_config.NumberColumn(format="%d u."),
                     "Tickets": st.column_config.NumberColumn(format="%d tkt.")
                 },
-                use_container_width=True,
-                hide_index=True
-            )
\ No newline at end of file
+                nombre_archivo="inventario_vendido.csv"
+            )
+
+
+# TAB 5: CLIENTES (SEGMENTACIÓN RFM PRECALCULADA EN EL PIPELINE)
+    with tab5:
+        df_rfm = leer_precalculado("clientes", "rfm_clientes.csv", fechas=['PRIMERA_COMPRA', 'ULTIMA_COMPRA'])
+        df_rfm_suc = leer_precalculado("clientes", "rfm_por_sucursal.csv")
+
+        if df_rfm is None or df_rfm_suc is None:
+            st.info("Aún no hay segmentación de clientes. Ejecuta el pipeline (`run_pipeline.py`) para generarla.")
+        else:
+            # Orden fijo de segmentos, del mejor al peor
+            orden_seg = ["Campeones", "Leales", "Nuevos", "Potenciales", "En riesgo", "Hibernando", "Perdidos"]
+
+            if sel_alm != "Todos":
+                df_rfm = df_rfm[df_rfm['SUCURSAL_PRINCIPAL'] == sel_alm]
+
+            # --- 1. KPIs DE CARTERA ---
+            r1, r2, r3, r4 = st.columns(4)
+            r1.metric("Clientes Identificados", f"{len(df_rfm):,}", help="Clientes con compras registradas (sin público en general)")
+            r2.metric("Campeones", f"{(df_rfm['SEGMENTO'] == 'Campeones').sum():,}", help="Compran seguido, reciente y con alto monto")
+            r3.metric("En Riesgo de Abandono", f"{df_rfm['RIESGO_ABANDONO'].sum():,}", delta_color="inverse", help="Llevan sin comprar más del doble de su intervalo habitual")
+            r4.metric("Recencia Mediana", f"{df_rfm['RECENCIA_DIAS'].median():.0f} días" if not df_rfm.empty else "-")
+
+            st.markdown("---")
+
+            col_seg, col_suc = st.columns(2)
+
+            with col_seg:
+                seg_counts = df_rfm.groupby('SEGMENTO').agg(Clientes=('CLIENTE', 'count'), Monto=('MONETARIO', 'sum')).reset_index()
+                fig_seg = px.bar(
+                    seg_counts, x='Clientes', y='SEGMENTO', orientation='h',
+                    color='Monto', text_auto='.2s', title="Clientes por Segmento",
+                    category_orders={'SEGMENTO': orden_seg}, color_continuous_scale='Blues',
+                    hover_data={'Monto': ':$,.0f'}
+                )
+                fig_seg.update_traces(textposition='outside')
+                fig_seg.update_layout(coloraxis_showscale=False)
+                st.plotly_chart(fig_seg, use_container_width=True)
+
+            with col_suc:
+                fig_suc = px.bar(
+                    df_rfm_suc, x='SUCURSAL', y='CLIENTES', color='SEGMENTO',
+                    title="Clientes por Tienda y Segmento",
+                    category_orders={'SEGMENTO': orden_seg}
+                )
+                st.plotly_chart(fig_suc, use_container_width=True)
+
+            with st.expander("🚨 Ver Clientes en Riesgo de Abandono"):
+                riesgo = df_rfm[df_rfm['RIESGO_ABANDONO']]
+                if not riesgo.empty:
+                    st.dataframe(
+                        riesgo[['CLIENTE', 'SUCURSAL_PRINCIPAL', 'SEGMENTO', 'ULTIMA_COMPRA', 'RECENCIA_DIAS', 'INTERVALO_PROM', 'FRECUENCIA', 'MONETARIO']],
+                        column_config={
+                            "ULTIMA_COMPRA": st.column_config.DateColumn("Última Compra", format="DD/MM/YYYY"),
+                            "INTERVALO_PROM": st.column_config.NumberColumn("Intervalo Prom. (días)", format="%.0f"),
+                            "MONETARIO": st.column_config.NumberColumn("Monto Histórico", format="$%.2f")
+                        },
+                        use_container_width=True,
+                        hide_index=True
+                    )
+                else:
+                    st.success("No hay clientes frecuentes en riesgo de abandono.")
+
+registrar_render(_inicio_script)
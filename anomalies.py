@@ -0,0 +1,193 @@
+import json
+import os
+import warnings
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from pipeline_stages import escribir_csv_atomico
+from sorted_merge import leer_rango
+
+# --- DETECCIÓN DE DÍAS ATÍPICOS (VENTA, TICKETS Y DIFERENCIA DE CAJA) ---
+# Cada serie diaria (tienda y cajero x métrica) se compara contra el mismo día de la
+# semana de las SEMANAS_BASE semanas previas: mediana como esperado y MAD como escala.
+# Todas las series van en una sola matriz fecha x serie; las ventanas por día de la
+# semana se arman con sliding_window_view, sin ciclos por serie.
+# Incremental como customer_rfm: el estado guarda sólo la cola de días cerrados que
+# necesitan las ventanas, y cada corrida evalúa únicamente los días nuevos.
+
+ARCHIVO_HISTORIA = "anomalias_historia.csv"
+ARCHIVO_META = "anomalias_meta.json"
+ARCHIVO_ANOMALIAS = "anomalias.csv"
+
+SEMANAS_BASE = 8          # Mismo día de la semana en las 8 semanas previas
+MIN_SEMANAS = 4           # Sin al menos 4 referencias no se evalúa
+UMBRAL_DESVIACION = 3.5   # |valor - mediana| / escala robusta
+ESCALA_REL_MIN = 0.05     # La escala nunca es menor al 5% del esperado...
+ESCALA_ABS_MIN = {        # ...ni a estos mínimos (una caja casi siempre cuadra: MAD = 0)
+    'VENTAS': 100.0,
+    'TICKETS': 2.0,
+    'DIFERENCIA': 50.0,
+}
+
+CLAVES = ['NIVEL', 'SUCURSAL', 'CAJERO', 'METRICA']
+COLS_HISTORIA = ['FECHA'] + CLAVES + ['VALOR']
+TODOS = "Todos"  # CAJERO de las series a nivel tienda
+
+# Nivel -> columnas de agrupación
+NIVELES = {
+    'Sucursal': ['SUCURSAL'],
+    'Cajero': ['SUCURSAL', 'CAJERO'],
+}
+
+
+def _diario_cortes(df, claves):
+    return df.groupby(claves + ['FECHA']).agg(
+        VENTAS=('VENTAS_TOTALES_NETAS', 'sum'), DIFERENCIA=('DIFERENCIA', 'sum')
+    )
+
+
+def _diario_ventas(df, claves):
+    folio = df['FOLIO'].where(df['TIPO_MOV'].astype(str).str.upper() == 'VENTA')
+    return df.assign(FOLIO_VENTA=folio).groupby(claves + ['FECHA']).agg(TICKETS=('FOLIO_VENTA', 'nunique'))
+
+
+# Fuente -> (columnas a leer, métricas diarias por nivel)
+FUENTES = {
+    'cortes': (['SUCURSAL', 'CAJERO', 'FECHA', 'VENTAS_TOTALES_NETAS', 'DIFERENCIA'], _diario_cortes),
+    'ventas': (['SUCURSAL', 'CAJERO', 'FECHA', 'FOLIO', 'TIPO_MOV'], _diario_ventas),
+}
+
+
+def valores_diarios(fuente, ruta, desde=None):
+    """Formato largo: FECHA, NIVEL, SUCURSAL, CAJERO, METRICA, VALOR para los días >= desde."""
+    columnas, diario = FUENTES[fuente]
+    if not os.path.exists(ruta):
+        return pd.DataFrame(columns=COLS_HISTORIA)
+    df = leer_rango(ruta, desde, usecols=columnas, parse_dates=['FECHA']).dropna(subset=['FECHA'])
+    if df.empty:
+        return pd.DataFrame(columns=COLS_HISTORIA)
+
+    partes = []
+    for nivel, claves in NIVELES.items():
+        largo = diario(df, claves).reset_index().melt(
+            id_vars=claves + ['FECHA'], var_name='METRICA', value_name='VALOR'
+        )
+        if 'CAJERO' not in claves:
+            largo['CAJERO'] = TODOS
+        partes.append(largo.assign(NIVEL=nivel))
+    return pd.concat(partes, ignore_index=True)[COLS_HISTORIA]
+
+
+def _medianas(ventanas):
+    # Series sin referencias dan "All-NaN slice": quedan como NaN y no se evalúan
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.nanmedian(ventanas, axis=-1)
+
+
+def evaluar(historia, nuevos):
+    """
+    Evalúa los días de `nuevos` contra las semanas previas (de `historia` y de los
+    propios nuevos). Devuelve sólo los días marcados como atípicos.
+    """
+    datos = pd.concat([historia, nuevos], ignore_index=True)
+    matriz = datos.pivot_table(index='FECHA', columns=CLAVES, values='VALOR', aggfunc='sum')
+    matriz = matriz.reindex(pd.date_range(matriz.index.min(), matriz.index.max(), freq='D'))
+    # Sólo las celdas (día, serie) que vienen en `nuevos`: si cortes y ventas cierran en
+    # días distintos, las series de un reporte no se re-evalúan por los días nuevos del otro
+    es_nuevo = nuevos.pivot_table(index='FECHA', columns=CLAVES, values='VALOR', aggfunc='count')
+    es_nuevo = es_nuevo.reindex(index=matriz.index, columns=matriz.columns).notna().to_numpy()
+
+    minimos = np.array([
+        ESCALA_ABS_MIN[m] for m in matriz.columns.get_level_values('METRICA')
+    ])
+    valores = matriz.to_numpy(dtype=float)
+    marcados = []
+
+    for dia in range(7):
+        filas = np.flatnonzero(matriz.index.dayofweek == dia)
+        sub = valores[filas]
+
+        # Fila t -> las SEMANAS_BASE filas anteriores del mismo día de la semana
+        relleno = np.full((SEMANAS_BASE, sub.shape[1]), np.nan)
+        ventanas = sliding_window_view(np.vstack([relleno, sub]), SEMANAS_BASE, axis=0)[:-1]
+
+        nuevo = es_nuevo[filas]
+        evaluar_filas = nuevo.any(axis=1)
+        if not evaluar_filas.any():
+            continue
+        x, ventanas, nuevo = sub[evaluar_filas], ventanas[evaluar_filas], nuevo[evaluar_filas]
+
+        esperado = _medianas(ventanas)
+        mad = _medianas(np.abs(ventanas - esperado[..., None]))
+        escala = np.maximum.reduce([1.4826 * mad, ESCALA_REL_MIN * np.abs(esperado), np.broadcast_to(minimos, x.shape)])
+        desviacion = (x - esperado) / escala
+
+        suficientes = (~np.isnan(ventanas)).sum(axis=-1) >= MIN_SEMANAS
+        t, s = np.nonzero(nuevo & suficientes & ~np.isnan(x) & (np.abs(desviacion) >= UMBRAL_DESVIACION))
+        if len(t):
+            claves = matriz.columns[s].to_frame(index=False)
+            claves.insert(0, 'FECHA', matriz.index[filas[evaluar_filas][t]])
+            claves['VALOR'] = x[t, s]
+            claves['ESPERADO'] = esperado[t, s]
+            claves['DESVIACION'] = np.round(desviacion[t, s], 2)
+            marcados.append(claves)
+
+    columnas = COLS_HISTORIA + ['ESPERADO', 'DESVIACION', 'DIRECCION']
+    if not marcados:
+        return pd.DataFrame(columns=columnas)
+    res = pd.concat(marcados, ignore_index=True)
+    res['DIRECCION'] = np.where(res['DESVIACION'] > 0, 'Alta', 'Baja')
+    return res[columnas]
+
+
+def detectar_anomalias(ruta_cortes, ruta_ventas, dir_salida):
+    """Etapa del pipeline: evalúa los días cerrados nuevos y agrega los atípicos a anomalias.csv."""
+    os.makedirs(dir_salida, exist_ok=True)
+    ruta_historia = os.path.join(dir_salida, ARCHIVO_HISTORIA)
+    ruta_meta = os.path.join(dir_salida, ARCHIVO_META)
+    ruta_anomalias = os.path.join(dir_salida, ARCHIVO_ANOMALIAS)
+
+    # Sin estado se reconstruye todo (y se re-evalúa todo el histórico)
+    meta = {}
+    historia = pd.DataFrame(columns=COLS_HISTORIA)
+    anomalias = None
+    if all(os.path.exists(r) for r in (ruta_historia, ruta_meta, ruta_anomalias)):
+        with open(ruta_meta, encoding='utf-8') as fh:
+            meta = json.load(fh)
+        historia = pd.read_csv(ruta_historia, parse_dates=['FECHA'])
+        anomalias = pd.read_csv(ruta_anomalias, parse_dates=['FECHA'])
+
+    nuevos = []
+    for fuente, ruta in (('cortes', ruta_cortes), ('ventas', ruta_ventas)):
+        desde = pd.Timestamp(meta[fuente]) + pd.Timedelta(days=1) if fuente in meta else None
+        valores = valores_diarios(fuente, ruta, desde)
+        if valores.empty:
+            continue
+
+        # El último día sigue abierto (el pipeline corre varias veces al día): se evalúa mañana
+        dia_abierto = valores['FECHA'].max()
+        cerrados = valores[valores['FECHA'] < dia_abierto]
+        if not cerrados.empty:
+            nuevos.append(cerrados)
+        meta[fuente] = (dia_abierto - pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+
+    if nuevos:
+        nuevos = pd.concat(nuevos, ignore_index=True)
+        marcados = evaluar(historia, nuevos)
+        anomalias = marcados if anomalias is None else pd.concat([anomalias, marcados], ignore_index=True)
+
+        # La historia sólo necesita cubrir la ventana más larga
+        historia = pd.concat([historia, nuevos], ignore_index=True)
+        corte = historia['FECHA'].max() - pd.Timedelta(weeks=SEMANAS_BASE)
+        historia = historia[historia['FECHA'] >= corte]
+
+    if anomalias is None:
+        anomalias = pd.DataFrame(columns=COLS_HISTORIA + ['ESPERADO', 'DESVIACION', 'DIRECCION'])
+
+    escribir_csv_atomico(historia, ruta_historia)
+    escribir_csv_atomico(anomalias.sort_values('FECHA'), ruta_anomalias)
+    with open(ruta_meta + '.tmp', 'w', encoding='utf-8') as fh:
+        json.dump(meta, fh)
+    os.replace(ruta_meta + '.tmp', ruta_meta)
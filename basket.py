@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# --- ANÁLISIS DE CANASTA (PRODUCTOS QUE SE VENDEN JUNTOS) ---
+# Matriz dispersa ticket x SKU (1 si el SKU aparece en el ticket). El producto
+# X^T X da en una sola operación cuántos tickets comparten cada par de SKUs;
+# soporte, confianza y lift salen de esos conteos sin recorrer tickets en Python.
+
+MIN_TICKETS_PAR = 5        # Pares que aparecen juntos en menos tickets son ruido
+MIN_TICKETS_SKU = 5        # SKUs raros se descartan antes de multiplicar (acota memoria)
+
+
+def matriz_incidencia(df_ventas, min_tickets_sku=MIN_TICKETS_SKU):
+    """Devuelve (X ticket x SKU en CSR binaria, claves de SKU, número total de tickets)."""
+    ventas = df_ventas[df_ventas['TIPO_MOV'].astype(str).str.upper() == 'VENTA']
+    # El folio puede repetirse entre tiendas: el ticket es SUCURSAL + FOLIO
+    ticket = ventas['SUCURSAL'].astype(str) + '|' + ventas['FOLIO'].astype(str)
+    filas, tickets = pd.factorize(ticket)
+    cols, skus = pd.factorize(ventas['CLAVE'].astype(str))
+
+    X = sparse.csr_matrix(
+        (np.ones(len(filas), dtype=np.int32), (filas, cols)),
+        shape=(len(tickets), len(skus))
+    )
+    X.data[:] = 1  # Renglones repetidos del mismo SKU cuentan una vez por ticket
+
+    conteo = np.asarray(X.sum(axis=0)).ravel()
+    frecuentes = np.flatnonzero(conteo >= min_tickets_sku)
+    return X[:, frecuentes], skus[frecuentes], len(tickets)
+
+
+def pares_frecuentes(df_ventas, min_tickets_par=MIN_TICKETS_PAR, min_tickets_sku=MIN_TICKETS_SKU):
+    """
+    Una fila por par de SKUs (A, B) con A < B: tickets juntos, soporte, confianza
+    en ambas direcciones y lift. Ordenado por lift descendente.
+    """
+    columnas = ['CLAVE_A', 'CLAVE_B', 'TICKETS_JUNTOS', 'SOPORTE', 'CONFIANZA_A_B', 'CONFIANZA_B_A', 'LIFT']
+    if df_ventas.empty:
+        return pd.DataFrame(columns=columnas)
+
+    X, skus, n_tickets = matriz_incidencia(df_ventas, min_tickets_sku)
+    if X.shape[1] < 2:
+        return pd.DataFrame(columns=columnas)
+
+    X = X.tocsc().astype(np.int32)
+    co = (X.T @ X).tocoo()
+    cuenta_sku = np.asarray(X.sum(axis=0)).ravel()
+
+    # Sólo la mitad superior (A < B) y pares con suficientes tickets
+    m = (co.row < co.col) & (co.data >= min_tickets_par)
+    a, b, juntos = co.row[m], co.col[m], co.data[m].astype(float)
+
+    ca, cb = cuenta_sku[a], cuenta_sku[b]
+    res = pd.DataFrame({
+        'CLAVE_A': skus[a],
+        'CLAVE_B': skus[b],
+        'TICKETS_JUNTOS': juntos.astype(int),
+        'SOPORTE': juntos / n_tickets,
+        'CONFIANZA_A_B': juntos / ca,
+        'CONFIANZA_B_A': juntos / cb,
+        'LIFT': juntos * n_tickets / (ca * cb),
+    })
+    return res.sort_values(['LIFT', 'TICKETS_JUNTOS'], ascending=False).reset_index(drop=True)
@@ -0,0 +1,131 @@
+import pandas as pd
+
+# --- MOTOR DE COMPARACIÓN DE PERIODOS ---
+# Todo sale de una serie diaria continua (una sola agrupación sobre los datos ya
+# cargados). Con sus sumas acumuladas, el total de cualquier rango se obtiene con
+# dos búsquedas binarias, así que agregar comparaciones no vuelve a recorrer
+# ventas ni cortes.
+
+TODAS = "__TODAS__"  # Marca de los renglones de ventas sin filtro de línea
+
+# Nombre -> desplazamiento hacia atrás respecto al periodo actual.
+# "Periodo anterior" depende del largo del rango y se calcula en desplazamiento().
+COMPARACIONES = {
+    "Año anterior": pd.DateOffset(years=1),                       # 29-Feb -> 28-Feb
+    "Año anterior (mismo día de semana)": pd.Timedelta(days=364), # 52 semanas exactas
+    "Periodo anterior": None,
+}
+
+METRICAS = ['VENTA_NETA', 'DIAS', 'TICKETS', 'DEVOLUCIONES']
+
+
+def diario_cortes(df_cortes):
+    d = df_cortes[['SUCURSAL', 'FECHA', 'VENTAS_TOTALES_NETAS']].dropna(subset=['FECHA'])
+    return d.groupby(['SUCURSAL', d['FECHA'].dt.normalize()]).agg(
+        VENTA_NETA=('VENTAS_TOTALES_NETAS', 'sum'),
+        CORTES=('VENTAS_TOTALES_NETAS', 'size'),
+    ).reset_index()
+
+
+def diario_ventas(df_ventas):
+    d = df_ventas[['SUCURSAL', 'LINEA', 'FECHA', 'TIPO_MOV', 'FOLIO', 'IMPORTE_REAL']].dropna(subset=['FECHA'])
+    tipo = d['TIPO_MOV'].astype(str).str.upper()
+    d = d.assign(
+        FECHA=d['FECHA'].dt.normalize(),
+        FOLIO_VENTA=d['FOLIO'].where(tipo == 'VENTA'),
+        DEVOLUCIONES=d['IMPORTE_REAL'].where(tipo == 'DEVOLUCION', 0).abs(),
+    )
+    aggs = dict(TICKETS=('FOLIO_VENTA', 'nunique'), DEVOLUCIONES=('DEVOLUCIONES', 'sum'))
+
+    # Los tickets no se pueden sumar entre líneas (un ticket toca varias),
+    # por eso se guarda aparte el total por sucursal/día.
+    por_linea = d.groupby(['SUCURSAL', 'LINEA', 'FECHA']).agg(**aggs).reset_index()
+    total = d.groupby(['SUCURSAL', 'FECHA']).agg(**aggs).reset_index().assign(LINEA=TODAS)
+    return pd.concat([por_linea, total], ignore_index=True)
+
+
+def serie_diaria(dia_cortes, dia_ventas, sucursal="Todos", linea="Todas"):
+    """Serie diaria continua (sin huecos) con las métricas comparables para los filtros activos."""
+    if sucursal != "Todos":
+        dia_cortes = dia_cortes[dia_cortes['SUCURSAL'] == sucursal]
+        dia_ventas = dia_ventas[dia_ventas['SUCURSAL'] == sucursal]
+    dia_ventas = dia_ventas[dia_ventas['LINEA'] == (TODAS if linea == "Todas" else linea)]
+
+    c = dia_cortes.groupby('FECHA').agg(VENTA_NETA=('VENTA_NETA', 'sum'), DIAS=('CORTES', 'sum'))
+    c['DIAS'] = (c['DIAS'] > 0).astype(int)
+    v = dia_ventas.groupby('FECHA')[['TICKETS', 'DEVOLUCIONES']].sum()
+
+    serie = c.join(v, how='outer')
+    if serie.empty:
+        return pd.DataFrame(columns=METRICAS, index=pd.DatetimeIndex([], name='FECHA'), dtype=float)
+
+    rango = pd.date_range(serie.index.min(), serie.index.max(), freq='D', name='FECHA')
+    return serie.reindex(rango).fillna(0)[METRICAS]
+
+
+def desplazamiento(nombre, inicio, fin):
+    if nombre == "Periodo anterior":
+        return pd.Timedelta(days=(fin - inicio).days + 1)
+    return COMPARACIONES[nombre]
+
+
+def _sumar_rango(acumulado, inicio, fin):
+    """Suma de cada métrica en [inicio, fin] usando la serie acumulada."""
+    idx = acumulado.index
+    i = idx.searchsorted(inicio, side='left')
+    j = idx.searchsorted(fin, side='right') - 1
+    if j < i:
+        return pd.Series(0.0, index=acumulado.columns)
+    total = acumulado.iloc[j]
+    return total - acumulado.iloc[i - 1] if i > 0 else total
+
+
+def comparar(serie, inicio, fin, comparaciones):
+    """
+    Totales y promedios del periodo actual y de cada periodo de referencia.
+    Devuelve un DataFrame con un renglón por periodo ('Actual' + comparaciones).
+    """
+    inicio, fin = pd.Timestamp(inicio), pd.Timestamp(fin)
+    acumulado = serie.cumsum()
+
+    periodos = {"Actual": (inicio, fin)}
+    for nombre in comparaciones:
+        off = desplazamiento(nombre, inicio, fin)
+        periodos[nombre] = (inicio - off, fin - off)
+
+    res = pd.DataFrame({n: _sumar_rango(acumulado, a, b) for n, (a, b) in periodos.items()}).T
+
+    dias = res['DIAS'].where(res['DIAS'] > 0, 1)
+    res['TICKET_PROM'] = (res['VENTA_NETA'] / res['TICKETS']).where(res['TICKETS'] > 0, 0.0)
+    res['VENTA_DIA'] = res['VENTA_NETA'] / dias
+    res['TICKETS_DIA'] = res['TICKETS'] / dias
+    return res
+
+
+def variacion(actual, referencia):
+    return ((actual - referencia) / referencia * 100) if referencia > 0 else 0.0
+
+
+def _recortar(tramo, metrica):
+    # Sin días vacíos al inicio y al final (igual que el resample sobre cortes reales)
+    con_datos = tramo.index[tramo['DIAS'] > 0]
+    if len(con_datos) == 0:
+        return tramo[metrica].iloc[0:0]
+    return tramo.loc[con_datos.min():con_datos.max(), metrica]
+
+
+def serie_comparada(serie, inicio, fin, comparacion, frecuencia, metrica='VENTA_NETA'):
+    """
+    Serie actual y de referencia alineadas sobre las fechas del periodo actual
+    (la referencia se desplaza hacia adelante antes de re-agrupar por frecuencia).
+    """
+    inicio, fin = pd.Timestamp(inicio), pd.Timestamp(fin)
+    off = desplazamiento(comparacion, inicio, fin)
+
+    act = _recortar(serie.loc[inicio:fin], metrica)
+    ref = _recortar(serie.loc[inicio - off:fin - off], metrica)
+    ref.index = ref.index + off
+
+    df_act = act.resample(frecuencia).sum().rename('VENTAS_ACT')
+    df_ref = ref.resample(frecuencia).sum().rename('VENTAS_REF')
+    return pd.concat([df_act, df_ref], axis=1).rename_axis('FECHA').reset_index()
@@ -0,0 +1,207 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+
+from pipeline_stages import escribir_csv_atomico
+from sorted_merge import leer_rango
+
+# --- SEGMENTACIÓN RFM INCREMENTAL POR CLIENTE ---
+# El estado (primera/última compra, frecuencia y monto por CLIENTE x SUCURSAL)
+# sólo acumula días cerrados. Los últimos DIAS_REPROCESO días no se guardan: en cada
+# corrida se vuelven a leer y se suman al vuelo, así los renglones que la extracción
+# trae tarde para esos días sí cuentan. Una sola marca para ventas y facturas: las dos
+# fuentes se leen desde el mismo día para poder cruzarlas.
+# Monto y frecuencia: las ventas de mostrador mandan. La factura de un ticket ya
+# contado no debe sumarse otra vez; como la factura no trae el folio del ticket, las
+# facturas de un cliente en una tienda y día en que ya tiene tickets no se cuentan.
+
+ARCHIVO_ESTADO = "rfm_estado.csv"
+ARCHIVO_META = "rfm_meta.json"
+ARCHIVO_CLIENTES = "rfm_clientes.csv"
+ARCHIVO_SUCURSALES = "rfm_por_sucursal.csv"
+
+VERSION_META = 2           # Un estado de otra versión se reconstruye desde todo el histórico
+DIAS_REPROCESO = 7         # Días recientes que se recalculan en cada corrida (renglones tardíos)
+
+COLS_ESTADO = ['CLIENTE', 'SUCURSAL', 'PRIMERA_COMPRA', 'ULTIMA_COMPRA', 'FRECUENCIA', 'MONETARIO']
+
+# Clientes de mostrador que no representan a una persona/empresa real
+CLIENTES_GENERICOS = {'PUBLICO EN GENERAL', 'PUBLICO GENERAL', 'MOSTRADOR', 'NAN', ''}
+
+DIAS_RIESGO_MIN = 30      # No marcar riesgo de abandono con menos de un mes sin comprar
+FACTOR_RIESGO = 2.0       # Riesgo si la recencia supera 2x su intervalo promedio entre compras
+
+
+def _leer_desde(ruta, columnas, desde):
+    if not os.path.exists(ruta):
+        return None
+    encabezado = pd.read_csv(ruta, nrows=0).columns
+    if 'CLIENTE' not in encabezado:
+        return None
+    # Con el índice del consolidado sólo se leen los grupos de filas desde `desde`
+    df = leer_rango(ruta, desde, usecols=[c for c in columnas if c in encabezado], parse_dates=['FECHA'])
+    df['CLIENTE'] = df['CLIENTE'].astype(str).str.strip()
+    return df[~df['CLIENTE'].str.upper().isin(CLIENTES_GENERICOS)]
+
+
+def _movs_ventas(v):
+    es_venta = v['TIPO_MOV'].astype(str).str.upper() == 'VENTA'
+    return v.assign(FOLIO=v['FOLIO'].where(es_venta)).groupby(['CLIENTE', 'SUCURSAL', 'FECHA']).agg(
+        FRECUENCIA=('FOLIO', 'nunique'), MONETARIO=('IMPORTE_REAL', 'sum')
+    ).reset_index()
+
+
+def _movs_facturas(f):
+    f = f[f['ESTATUS'].astype(str).str.upper() != 'CANCELADA'].drop_duplicates(subset=['FOLIO_INTERNO'])
+    return f.groupby(['CLIENTE', 'SUCURSAL', 'FECHA']).agg(
+        FRECUENCIA=('FOLIO_INTERNO', 'nunique'), MONETARIO=('TOTAL_FACTURA', 'sum')
+    ).reset_index()
+
+
+# Fuente -> (columnas a leer, tickets e importe por CLIENTE x SUCURSAL x día)
+FUENTES = {
+    'ventas': (['CLIENTE', 'SUCURSAL', 'FECHA', 'FOLIO', 'TIPO_MOV', 'IMPORTE_REAL'], _movs_ventas),
+    'facturas': (['CLIENTE', 'SUCURSAL', 'FECHA', 'FOLIO_INTERNO', 'ESTATUS', 'TOTAL_FACTURA'], _movs_facturas),
+}
+
+
+def movimientos_diarios(fuente, ruta, desde=None):
+    columnas, agrupar = FUENTES[fuente]
+    df = _leer_desde(ruta, columnas, desde)
+    if df is None or df.empty:
+        return pd.DataFrame(columns=['CLIENTE', 'SUCURSAL', 'FECHA', 'FRECUENCIA', 'MONETARIO'])
+    return agrupar(df)
+
+
+def combinar(ventas, facturas):
+    """Movimientos diarios de ambas fuentes sin contar dos veces los tickets facturados."""
+    if facturas.empty:
+        return ventas
+    clave = ['CLIENTE', 'SUCURSAL', 'FECHA']
+    ya_contadas = facturas.set_index(clave).index.isin(ventas.set_index(clave).index)
+    return pd.concat([ventas, facturas[~ya_contadas]], ignore_index=True)
+
+
+def acumular(estado, movs):
+    """Une el estado con nuevos movimientos diarios (ambos por CLIENTE x SUCURSAL)."""
+    # Un día sólo con devoluciones resta monto pero no es una compra (no mueve la recencia)
+    movs = movs.assign(FECHA_COMPRA=movs['FECHA'].where(movs['FRECUENCIA'] > 0))
+    nuevos = movs.groupby(['CLIENTE', 'SUCURSAL']).agg(
+        PRIMERA_COMPRA=('FECHA_COMPRA', 'min'), ULTIMA_COMPRA=('FECHA_COMPRA', 'max'),
+        FRECUENCIA=('FRECUENCIA', 'sum'), MONETARIO=('MONETARIO', 'sum'),
+    ).reset_index()
+    if estado.empty:
+        return nuevos[COLS_ESTADO]
+    return pd.concat([estado, nuevos]).groupby(['CLIENTE', 'SUCURSAL']).agg(
+        PRIMERA_COMPRA=('PRIMERA_COMPRA', 'min'), ULTIMA_COMPRA=('ULTIMA_COMPRA', 'max'),
+        FRECUENCIA=('FRECUENCIA', 'sum'), MONETARIO=('MONETARIO', 'sum'),
+    ).reset_index()[COLS_ESTADO]
+
+
+def _puntaje(serie, invertir=False):
+    # Quintiles por rango (1-5); con rank se evitan cortes repetidos de qcut
+    pct = serie.rank(pct=True, method='average')
+    score = np.ceil(pct * 5).clip(1, 5).astype(int)
+    return 6 - score if invertir else score
+
+
+def segmentar(estado, fecha_ref):
+    """Una fila por CLIENTE con recencia, frecuencia, monto, puntajes RFM, segmento y riesgo de abandono."""
+    estado = estado.reset_index(drop=True)
+    c = estado.groupby('CLIENTE').agg(
+        PRIMERA_COMPRA=('PRIMERA_COMPRA', 'min'), ULTIMA_COMPRA=('ULTIMA_COMPRA', 'max'),
+        FRECUENCIA=('FRECUENCIA', 'sum'), MONETARIO=('MONETARIO', 'sum'),
+        SUCURSALES=('SUCURSAL', 'nunique'),
+    ).reset_index()
+    c = c[c['ULTIMA_COMPRA'].notna()]  # Clientes que sólo devolvieron
+
+    # Sucursal donde más compra (para filtrar listas por tienda en el dashboard)
+    principal = estado.loc[estado.groupby('CLIENTE')['MONETARIO'].idxmax(), ['CLIENTE', 'SUCURSAL']]
+    c = c.merge(principal.rename(columns={'SUCURSAL': 'SUCURSAL_PRINCIPAL'}), on='CLIENTE', how='left')
+
+    c['RECENCIA_DIAS'] = (fecha_ref - c['ULTIMA_COMPRA']).dt.days
+    c['R'] = _puntaje(c['RECENCIA_DIAS'], invertir=True)
+    c['F'] = _puntaje(c['FRECUENCIA'])
+    c['M'] = _puntaje(c['MONETARIO'])
+
+    r, f = c['R'], c['F']
+    c['SEGMENTO'] = np.select(
+        [
+            (r >= 4) & (f >= 4),
+            (r >= 4) & (c['FRECUENCIA'] <= 1),
+            (r >= 3) & (f >= 3),
+            (r >= 3),
+            (r <= 2) & (f >= 3),
+            (r == 1),
+        ],
+        ["Campeones", "Nuevos", "Leales", "Potenciales", "En riesgo", "Perdidos"],
+        default="Hibernando"
+    )
+
+    # Riesgo de abandono: lleva sin comprar mucho más que su ritmo habitual
+    vida = (c['ULTIMA_COMPRA'] - c['PRIMERA_COMPRA']).dt.days
+    c['INTERVALO_PROM'] = (vida / (c['FRECUENCIA'] - 1)).where(c['FRECUENCIA'] > 1)
+    c['RIESGO_ABANDONO'] = (
+        (c['FRECUENCIA'] >= 3)
+        & (c['RECENCIA_DIAS'] >= DIAS_RIESGO_MIN)
+        & (c['RECENCIA_DIAS'] > FACTOR_RIESGO * c['INTERVALO_PROM'])
+    )
+    return c.sort_values('MONETARIO', ascending=False)
+
+
+def clientes_por_sucursal(estado, clientes):
+    seg = estado.loc[estado['ULTIMA_COMPRA'].notna(), ['CLIENTE', 'SUCURSAL']].merge(clientes[['CLIENTE', 'SEGMENTO']], on='CLIENTE')
+    return seg.groupby(['SUCURSAL', 'SEGMENTO']).size().rename('CLIENTES').reset_index()
+
+
+def actualizar_rfm(ruta_ventas, ruta_facturas, dir_salida):
+    """Etapa del pipeline: incorpora los días cerrados al estado y publica segmentos y conteos."""
+    os.makedirs(dir_salida, exist_ok=True)
+    ruta_estado = os.path.join(dir_salida, ARCHIVO_ESTADO)
+    ruta_meta = os.path.join(dir_salida, ARCHIVO_META)
+
+    # Sin estado, sin meta o con meta de otra versión se reconstruye desde todo el histórico
+    meta = {'version': VERSION_META}
+    estado = pd.DataFrame(columns=COLS_ESTADO)
+    if os.path.exists(ruta_estado) and os.path.exists(ruta_meta):
+        with open(ruta_meta, encoding='utf-8') as fh:
+            previo = json.load(fh)
+        if previo.get('version') == VERSION_META and 'cerrado' in previo:
+            meta = previo
+            estado = pd.read_csv(ruta_estado, parse_dates=['PRIMERA_COMPRA', 'ULTIMA_COMPRA'])
+
+    desde = pd.Timestamp(meta['cerrado']) + pd.Timedelta(days=1) if 'cerrado' in meta else None
+    fuentes = {
+        fuente: movimientos_diarios(fuente, ruta, desde)
+        for fuente, ruta in (('ventas', ruta_ventas), ('facturas', ruta_facturas))
+    }
+    movs = combinar(fuentes['ventas'], fuentes['facturas'])
+
+    abiertos = movs
+    ultimos = [m['FECHA'].max() for m in fuentes.values() if not m.empty]
+    if ultimos:
+        # Se cierra hasta DIAS_REPROCESO días antes del último día de la fuente más atrasada
+        cerrado = min(ultimos) - pd.Timedelta(days=DIAS_REPROCESO)
+        cerrados = movs[movs['FECHA'] <= cerrado]
+        if not cerrados.empty:
+            estado = acumular(estado, cerrados)
+        abiertos = movs[movs['FECHA'] > cerrado]
+        if desde is None or cerrado >= desde:
+            meta['cerrado'] = cerrado.strftime('%Y-%m-%d')
+
+    escribir_csv_atomico(estado, ruta_estado)
+    with open(ruta_meta + '.tmp', 'w', encoding='utf-8') as fh:
+        json.dump(meta, fh)
+    os.replace(ruta_meta + '.tmp', ruta_meta)
+
+    # Los días abiertos se suman sólo a lo publicado
+    if not abiertos.empty:
+        estado = acumular(estado, abiertos)
+    if estado.empty:
+        raise ValueError("No hay movimientos con CLIENTE para segmentar")
+    fecha_ref = estado['ULTIMA_COMPRA'].max()
+
+    clientes = segmentar(estado, fecha_ref)
+    escribir_csv_atomico(clientes, os.path.join(dir_salida, ARCHIVO_CLIENTES))
+    escribir_csv_atomico(clientes_por_sucursal(estado, clientes), os.path.join(dir_salida, ARCHIVO_SUCURSALES))
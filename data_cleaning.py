@@ -0,0 +1,101 @@
+import logging
+import pandas as pd
+from datetime import datetime
+
+from data_validation import validar, detectar_reporte, COLUMNA_ALERTA_DIFERENCIA
+
+# --- LIMPIEZA COMPARTIDA ENTRE PIPELINE Y DASHBOARD ---
+# La misma normalización que antes vivía dentro de load_data() en Dashboard.py.
+# El pipeline la aplica una vez por lote (etapa "limpiar") y el dashboard la
+# reutiliza al leer archivos subidos a mano.
+
+COLS_MONEDA = [
+    'PRECIO_UNITARIO_FINAL', 'TOTAL_TICKET_PAGADO',
+    'DINERO_RECIBIDO', 'CAMBIO_CALCULADO',
+    'MONTO_DESCUENTO', 'PRECIO_RENGLON_IVA', 'TOTAL_TICKET_IVA',
+    'TOTAL_FACTURA', 'SUBTOTAL_FACTURA', 'IMPUESTOS_FACTURA',
+    'PRECIO_UNITARIO', 'IMPORTE_RENGLON'
+]
+
+# Columnas numéricas propias de Cortes (antes se limpiaban aparte en el dashboard)
+COLS_CORTE_NUM = ['VENTAS_TOT', 'RETIROS', 'SISTEMA_DE_EFECTIVO', 'REAL_CONTADO', 'DIFERENCIA',
+                  'FONDO_INICIAL', 'VENTAS_TOTALES_NETAS', 'SISTEMA_DEBE_HABER',
+                  'PAGO_DEBITO', 'PAGO_CREDITO', 'PAGO_EFECTIVO_CALC']
+
+
+def parse_hour_intelligent(h_str):
+    h_str = str(h_str).strip()
+    try:
+        return datetime.strptime(h_str, '%I:%M %p').hour # AM/PM
+    except:
+        try:
+            return int(h_str.split(':')[0]) # Militar
+        except:
+            return 0
+
+
+def limpiar_dataframe(df):
+    # 1. Normalización de Nombres de Columnas
+    df.columns = df.columns.str.strip()
+
+    # 2. Manejo de Fechas
+    if 'FECHA' in df.columns:
+        df['FECHA'] = pd.to_datetime(df['FECHA'], errors='coerce')
+
+    # 3. Limpieza de Moneda y Números
+    for col in COLS_MONEDA + COLS_CORTE_NUM:
+        if col in df.columns:
+            # Quitamos signos de pesos y comas, convertimos a numérico
+            df[col] = df[col].astype(str).str.replace('$', '', regex=False).str.replace(',', '', regex=False)
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+
+    # Cortes con diferencia fuera de rango (aviso de la validación): el corte cuenta, su diferencia no
+    if COLUMNA_ALERTA_DIFERENCIA in df.columns and 'DIFERENCIA' in df.columns:
+        df['DIFERENCIA'] = df['DIFERENCIA'].mask(df[COLUMNA_ALERTA_DIFERENCIA].astype(bool))
+
+    # 4. Limpieza de Porcentajes
+    if '%_DESCUENTO' in df.columns:
+        df['%_DESCUENTO'] = df['%_DESCUENTO'].astype(str).str.replace('%', '', regex=False)
+        df['%_DESCUENTO'] = pd.to_numeric(df['%_DESCUENTO'], errors='coerce').fillna(0)
+
+    # 5. Lógica de Importe Real para Ventas
+    # Solo aplica si es el archivo de Ventas (tiene TIPO_MOV)
+    if 'TIPO_MOV' in df.columns:
+        # Calculamos importe renglón si no existe explícitamente limpio
+        if 'IMPORTE_RENGLON_CALC' not in df.columns:
+            # Prioridad: Importe Renglon -> Precio Final * Cantidad
+            if 'PRECIO_UNITARIO_FINAL' in df.columns and 'CANTIDAD' in df.columns:
+                df['IMPORTE_RENGLON_CALC'] = df['PRECIO_UNITARIO_FINAL'] * df['CANTIDAD']
+            else:
+                df['IMPORTE_RENGLON_CALC'] = 0.0
+
+        es_devolucion = df['TIPO_MOV'].astype(str).str.upper() == 'DEVOLUCION'
+        df['IMPORTE_REAL'] = df['IMPORTE_RENGLON_CALC'].where(~es_devolucion, -df['IMPORTE_RENGLON_CALC'].abs())
+
+    # 6. Corrección de Hora y Fecha String
+    if 'HORA' in df.columns:
+        df['HORA_NUM'] = df['HORA'].apply(parse_hour_intelligent)
+
+    if 'FECHA' in df.columns:
+        df['FECHA_STR'] = df['FECHA'].dt.strftime('%Y-%m-%d')
+
+    return df
+
+
+def leer_limpio(ruta):
+    """
+    Lee un CSV escrito por la etapa limpiar (ya validado y con tipos): sólo se parsea FECHA.
+    Un archivo que no pasó por el pipeline (sin FECHA_STR) se valida y se limpia aquí;
+    sus filas en cuarentena no se devuelven.
+    """
+    columnas = pd.read_csv(ruta, nrows=0).columns
+    if 'FECHA_STR' in columnas:
+        return pd.read_csv(ruta, parse_dates=['FECHA'])
+
+    df = pd.read_csv(ruta)
+    reporte = detectar_reporte(columnas)
+    if reporte:
+        df, _, resumen = validar(df, reporte)
+        if resumen['cuarentena'] or resumen['avisos']:
+            logging.warning(f"{ruta}: {resumen['cuarentena']} filas descartadas {resumen['motivos']}, avisos {resumen['avisos']}")
+    return limpiar_dataframe(df)
@@ -0,0 +1,97 @@
+import logging
+import os
+import threading
+import pandas as pd
+
+from data_cleaning import leer_limpio
+from snapshot import leer_puntero, leer_arrow, _firma
+
+# --- CACHE DE REPORTES A NIVEL DE PROCESO ---
+# Un solo DataFrame por archivo, compartido por todas las sesiones del proceso
+# (st.cache_data entrega una copia en cada rerun). La fecha de modificación es
+# parte de la clave: cuando el pipeline reescribe un reporte se vuelve a cargar.
+# Los consolidados ya vienen validados y limpios por el pipeline: no se re-limpian.
+# Si el pipeline publicó un snapshot Arrow del reporte (datos/snapshot/), se mapea
+# en memoria en lugar de parsear el CSV: la versión del snapshot es la clave.
+# Sólo si el snapshot es del CSV actual (misma firma): si el CSV se reescribió y la
+# publicación no llegó a correr, se lee el CSV.
+# Los DataFrames devueltos son de sólo lectura por convención: filtrar, no modificar.
+# Un reporte que no se pudo cargar guarda su error con la misma versión: el dashboard
+# lo muestra (st.error) sin volver a parsear el archivo en cada rerun.
+
+DIR_SNAPSHOT = os.path.join("datos", "snapshot")
+
+_CACHE = {}
+_LOCK = threading.Lock()
+
+
+def _buscar_en_snapshot(ruta):
+    dir_snapshot = os.path.join(os.path.dirname(ruta), DIR_SNAPSHOT)
+    for info in leer_puntero(dir_snapshot)['reportes'].values():
+        if info['origen'] == os.path.basename(ruta):
+            if os.path.exists(ruta) and info['firma'] != _firma(ruta):
+                return None
+            return os.path.join(dir_snapshot, info['archivo'])
+    return None
+
+
+def cargar_con_version(ruta):
+    """
+    (DataFrame, versión) del reporte, o (None, None) si no existe. La versión (archivo del
+    snapshot o mtime del CSV) es la del DataFrame devuelto: los st.cache_data que se
+    calculan con él deben llevarla en su clave para no servir resultados de la carga anterior.
+    """
+    arrow = _buscar_en_snapshot(ruta)
+    if arrow is None and not os.path.exists(ruta):
+        return None, None
+
+    version = arrow or os.path.getmtime(ruta)
+    # El candado evita que dos sesiones que llegan juntas parseen el mismo archivo dos veces
+    with _LOCK:
+        previo = _CACHE.get(ruta)
+        if previo is not None and previo[0] == version:
+            if isinstance(previo[1], Exception):
+                raise previo[1]
+            return previo[1], version
+
+        try:
+            df = leer_arrow(arrow) if arrow else leer_limpio(ruta)
+        except Exception as e:
+            _CACHE[ruta] = (version, e)
+            raise
+        _CACHE[ruta] = (version, df)
+        return df, version
+
+
+def cargar_reporte(ruta):
+    return cargar_con_version(ruta)[0]
+
+
+def precalentar(rutas):
+    """
+    Carga los reportes antes de aceptar tráfico. Devuelve ({ruta: filas o None si no existe},
+    {ruta: error}). Un reporte que falla no detiene el arranque: el dashboard muestra el error.
+    """
+    resumen, errores = {}, {}
+    for ruta in rutas:
+        try:
+            df = cargar_reporte(ruta)
+        except Exception as e:
+            logging.error(f"Precarga de {ruta} falló: {e}")
+            resumen[ruta], errores[ruta] = None, str(e)
+            continue
+        resumen[ruta] = None if df is None else len(df)
+    return resumen, errores
+
+
+def filtrar_fechas(df, inicio, fin):
+    """
+    Filas con inicio <= FECHA <= fin (fechas date). Los consolidados del pipeline vienen
+    ordenados por FECHA: entonces son dos búsquedas binarias y un corte, sin recorrer la columna.
+    """
+    fechas = df['FECHA']
+    desde, hasta = pd.Timestamp(inicio), pd.Timestamp(fin) + pd.Timedelta(days=1)
+    if fechas.is_monotonic_increasing:
+        a, b = fechas.searchsorted([desde, hasta], side='left')
+        return df.iloc[a:b]
+    return df[(fechas >= desde) & (fechas < hasta)]
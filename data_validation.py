@@ -0,0 +1,179 @@
+import pandas as pd
+
+# --- VALIDACIÓN DE CALIDAD DE DATOS (LOTE CRUDO, ANTES DE LIMPIAR) ---
+# limpiar_dataframe convierte a 0 / NaT lo que no entiende (errors='coerce', fillna(0)).
+# Antes de eso, la etapa limpiar revisa el lote de cada tienda una sola vez: esquema,
+# tipos, rangos y consistencia entre columnas. Las filas con problemas no se corrigen
+# a ciegas: van a un archivo de cuarentena con el motivo y el resumen queda en el
+# manifiesto del pipeline. Al consolidado (y al dashboard) sólo llegan filas válidas.
+# Los avisos no apartan la fila: se cuentan en el resumen y, si tienen columna, se
+# marcan en ella (ej. la DIFERENCIA de un corte absurda no debe llevarse sus ventas).
+# Todas las reglas son máscaras sobre columnas completas, sin recorrer filas.
+
+COLUMNA_MOTIVO = "MOTIVO_CUARENTENA"
+
+TOLERANCIA_REL = 0.05              # Diferencia aceptada entre un total y la suma de sus partes...
+TOLERANCIA_ABS = 1.0               # ...o en pesos, para que los redondeos de facturas chicas no cuenten
+LIMITE_DIFERENCIA_CORTE = 30000    # |DIFERENCIA| mayor es error de captura (antes se filtraba en el dashboard)
+COLUMNA_ALERTA_DIFERENCIA = "ALERTA_DIFERENCIA"
+COLUMNA_ALERTA_RENGLONES = "ALERTA_RENGLONES"
+DESCUENTO_MAX = 100
+
+TIPOS_MOV = {'VENTA', 'DEVOLUCION'}
+
+# Columna que distingue a cada reporte (archivos que no pasaron por el pipeline)
+COLUMNA_DISTINTIVA = {'ventas': 'TIPO_MOV', 'cortes': 'FOLIO_CORTE', 'facturas': 'FOLIO_INTERNO'}
+
+# Columnas obligatorias (deben existir y venir con valor) y numéricas (si traen valor, debe ser número)
+ESQUEMAS = {
+    'ventas': {
+        'requeridas': ['SUCURSAL', 'FECHA', 'HORA', 'FOLIO', 'TIPO_MOV', 'CLAVE', 'CANTIDAD', 'PRECIO_UNITARIO_FINAL'],
+        'numericas': ['CANTIDAD', 'PRECIO_UNITARIO_FINAL', '%_DESCUENTO', 'MONTO_DESCUENTO'],
+    },
+    'cortes': {
+        'requeridas': ['SUCURSAL', 'FECHA', 'FOLIO_CORTE', 'CAJERO', 'DIFERENCIA'],
+        'numericas': ['FONDO_INICIAL', 'VENTAS_TOTALES_NETAS', 'RETIROS', 'SISTEMA_DEBE_HABER', 'REAL_CONTADO',
+                      'DIFERENCIA', 'PAGO_DEBITO', 'PAGO_CREDITO', 'PAGO_EFECTIVO_CALC'],
+    },
+    'facturas': {
+        'requeridas': ['SUCURSAL', 'FECHA', 'FOLIO_INTERNO', 'ESTATUS', 'IMPORTE_RENGLON',
+                       'SUBTOTAL_FACTURA', 'IMPUESTOS_FACTURA', 'TOTAL_FACTURA'],
+        'numericas': ['CANTIDAD', 'PRECIO_UNITARIO', 'IMPORTE_RENGLON', 'SUBTOTAL_FACTURA', 'IMPUESTOS_FACTURA', 'TOTAL_FACTURA'],
+    },
+}
+
+
+def _vacio(serie):
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie.isna()
+    return serie.isna() | (serie.astype(str).str.strip() == '')
+
+
+def a_numero(serie):
+    # Misma normalización que limpiar_dataframe ($, comas, %) pero sin rellenar con 0
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie
+    texto = serie.astype(str).str.strip().str.replace(r'[$,%]', '', regex=True)
+    return pd.to_numeric(texto, errors='coerce')
+
+
+def hora_valida(serie):
+    # Los dos formatos que entiende parse_hour_intelligent: "08:15 PM" y "20:15[:ss]"
+    texto = serie.astype(str).str.strip()
+    ampm = pd.to_datetime(texto, format='%I:%M %p', errors='coerce')
+    militar = pd.to_numeric(texto.str.split(':').str[0], errors='coerce')
+    return ampm.notna() | militar.between(0, 23)
+
+
+def _cuadra(a, b):
+    # Sin valor en alguno de los lados ya se reporta como "vacío" / "no numérico"
+    return ((a - b).abs() <= (TOLERANCIA_REL * b.abs()).clip(lower=TOLERANCIA_ABS)) | a.isna() | b.isna()
+
+
+# --- REGLAS POR REPORTE (motivo -> máscara de filas que fallan) ---
+def _reglas_ventas(df, num):
+    tipo = df['TIPO_MOV'].astype(str).str.strip().str.upper()
+    es_venta = tipo == 'VENTA'
+    fallas = {
+        "TIPO_MOV desconocido": ~tipo.isin(TIPOS_MOV) & ~_vacio(df['TIPO_MOV']),
+        "CANTIDAD en cero": num['CANTIDAD'] == 0,
+        "precio negativo en venta": es_venta & (num['PRECIO_UNITARIO_FINAL'] < 0),
+        "HORA inválida": ~hora_valida(df['HORA']) & ~_vacio(df['HORA']),
+    }
+    if '%_DESCUENTO' in num:
+        fallas[f"descuento mayor a {DESCUENTO_MAX}%"] = num['%_DESCUENTO'] > DESCUENTO_MAX
+    return fallas
+
+
+def _reglas_cortes(df, num):
+    return {f"{col} negativo": num[col] < 0 for col in ('FONDO_INICIAL', 'RETIROS') if col in num}
+
+
+def _reglas_facturas(df, num):
+    subtotal, impuestos, total = num['SUBTOTAL_FACTURA'], num['IMPUESTOS_FACTURA'], num['TOTAL_FACTURA']
+    return {
+        "TOTAL_FACTURA negativo": total < 0,
+        "TOTAL_FACTURA no cuadra con SUBTOTAL + IMPUESTOS": ~_cuadra(subtotal + impuestos, total),
+    }
+
+
+REGLAS = {
+    'ventas': _reglas_ventas,
+    'cortes': _reglas_cortes,
+    'facturas': _reglas_facturas,
+}
+
+
+# --- AVISOS POR REPORTE (motivo -> (columna que lo marca o None, máscara)) ---
+def _avisos_cortes(df, num):
+    # El corte se conserva (sus ventas cuentan); la diferencia queda vacía al limpiar
+    fuera = num['DIFERENCIA'].abs() > LIMITE_DIFERENCIA_CORTE
+    return {f"DIFERENCIA fuera de ±{LIMITE_DIFERENCIA_CORTE:,}": (COLUMNA_ALERTA_DIFERENCIA, fuera)}
+
+
+def _avisos_facturas(df, num):
+    # IMPORTE_RENGLON viene sin IVA (los renglones suman el SUBTOTAL, no el TOTAL).
+    # El encabezado se toma de la primera fila del folio, igual que drop_duplicates en el dashboard.
+    folio = df['FOLIO_INTERNO']
+    suma_renglones = num['IMPORTE_RENGLON'].groupby(folio).transform('sum')
+    subtotal_folio = num['SUBTOTAL_FACTURA'].groupby(folio).transform('first')
+    # La factura cuenta en el total facturado; la columna permite encontrarla en el consolidado
+    return {"renglones no suman el SUBTOTAL_FACTURA": (COLUMNA_ALERTA_RENGLONES, ~_cuadra(suma_renglones, subtotal_folio))}
+
+
+AVISOS = {
+    'cortes': _avisos_cortes,
+    'facturas': _avisos_facturas,
+}
+
+
+def detectar_reporte(columnas):
+    columnas = {str(c).strip() for c in columnas}
+    return next((r for r, col in COLUMNA_DISTINTIVA.items() if col in columnas), None)
+
+
+def validar(df, reporte):
+    """
+    Separa un lote crudo en (válidas, cuarentena, resumen). Las válidas salen con las
+    columnas numéricas del esquema ya convertidas; la cuarentena conserva el texto
+    original más COLUMNA_MOTIVO. Los avisos se cuentan sobre las válidas y, si tienen
+    columna, se agregan como booleano. Si faltan columnas del esquema el lote completo
+    es inválido: ValueError (la etapa falla y lo que depende de ella se bloquea).
+    """
+    df = df.rename(columns=str.strip)
+    esquema = ESQUEMAS[reporte]
+    faltantes = [c for c in esquema['requeridas'] if c not in df.columns]
+    if faltantes:
+        raise ValueError(f"Esquema de {reporte} incompleto, faltan columnas: {faltantes}")
+
+    fallas = {f"{c} vacío": _vacio(df[c]) for c in esquema['requeridas']}
+    fallas["FECHA inválida"] = pd.to_datetime(df['FECHA'], errors='coerce').isna() & ~_vacio(df['FECHA'])
+
+    num = {}
+    for col in esquema['numericas']:
+        if col in df.columns:
+            num[col] = a_numero(df[col])
+            fallas[f"{col} no numérico"] = num[col].isna() & ~_vacio(df[col])
+    fallas.update(REGLAS[reporte](df, num))
+
+    # Un renglón puede fallar varias reglas: se concatenan todos sus motivos
+    motivo = pd.Series('', index=df.index, dtype=object)
+    for nombre, mascara in fallas.items():
+        motivo = motivo.mask(mascara, motivo + nombre + '; ')
+    mala = motivo != ''
+
+    cuarentena = df[mala].assign(**{COLUMNA_MOTIVO: motivo[mala].str[:-2]})
+    avisos = AVISOS[reporte](df, num) if reporte in AVISOS else {}
+    validas = df[~mala].assign(**{col: serie[~mala] for col, serie in num.items()})
+    for columna, mascara in avisos.values():
+        if columna:
+            validas[columna] = mascara[~mala].fillna(False).astype(bool)
+
+    resumen = {
+        'filas': len(df),
+        'validas': int((~mala).sum()),
+        'cuarentena': int(mala.sum()),
+        'motivos': {nombre: int(m.sum()) for nombre, m in fallas.items() if m.any()},
+        'avisos': {nombre: int(m[~mala].sum()) for nombre, (_, m) in avisos.items() if m[~mala].any()},
+    }
+    return validas, cuarentena, resumen
@@ -0,0 +1,120 @@
+import os
+import numpy as np
+import pandas as pd
+
+from pipeline_stages import escribir_csv_atomico
+
+# --- PERFIL DE DESCUENTOS Y MANIPULACIÓN DE PRECIOS (CAJERO x SKU x DÍA) ---
+# No hay precio de lista en la extracción: el precio de referencia de cada SKU es la
+# mediana de lo que se cobró "limpio" (sin descuento, sin precio modificado, > 0) en
+# esa tienda ese mes; si el mes no tiene ventas limpias se usa el último mes que sí
+# (merge_asof) y, al final, la mediana del SKU en todas las tiendas.
+# Con esa referencia cada renglón tiene su desviación e ingreso perdido, y todo se
+# resume en una sola pasada de groupby por SUCURSAL x CAJERO x CLAVE x FECHA.
+
+ARCHIVO_PERFIL = "descuentos_cajero_sku_dia.csv"
+ARCHIVO_REFERENCIA = "precios_referencia.csv"
+
+UMBRAL_DESCUENTO = 15      # Mismo criterio que "Descuentos > 15%" del dashboard
+# Cubetas de la distribución de descuentos (%), cerradas a la derecha
+CUBETAS_DESCUENTO = {
+    'DESC_0': (-np.inf, 0),
+    'DESC_0_10': (0, 10),
+    'DESC_10_15': (10, UMBRAL_DESCUENTO),
+    'DESC_15_30': (UMBRAL_DESCUENTO, 30),
+    'DESC_30_MAS': (30, np.inf),
+}
+
+COLUMNAS = ['SUCURSAL', 'FECHA', 'CAJERO', 'CLAVE', 'ARTICULO', 'LINEA', 'TIPO_MOV', 'CANTIDAD',
+            'PRECIO_UNITARIO_FINAL', '%_DESCUENTO', 'MODIF_PRECIO']
+
+
+def precios_referencia(ventas):
+    """Mediana del precio limpio por SUCURSAL x CLAVE x MES."""
+    limpio = ventas[
+        (ventas['%_DESCUENTO'] <= 0) & ~ventas['MANIPULADO'] & (ventas['PRECIO_UNITARIO_FINAL'] > 0)
+    ]
+    return limpio.groupby(['SUCURSAL', 'CLAVE', 'MES']).agg(
+        PRECIO_REF=('PRECIO_UNITARIO_FINAL', 'median'),
+        RENGLONES_REF=('PRECIO_UNITARIO_FINAL', 'size'),
+    ).reset_index()
+
+
+def asignar_referencia(ventas, referencia):
+    # Último mes con referencia de la misma tienda y SKU (incluido el propio)
+    con_ref = pd.merge_asof(
+        ventas.sort_values('MES'), referencia.sort_values('MES')[['SUCURSAL', 'CLAVE', 'MES', 'PRECIO_REF']],
+        on='MES', by=['SUCURSAL', 'CLAVE'], direction='backward'
+    )
+    global_sku = referencia.groupby('CLAVE')['PRECIO_REF'].median()
+    con_ref['PRECIO_REF'] = con_ref['PRECIO_REF'].fillna(con_ref['CLAVE'].map(global_sku))
+    return con_ref
+
+
+def perfil(ventas):
+    """Una fila por SUCURSAL x CAJERO x CLAVE x FECHA con al menos un renglón con descuento o fuera de precio."""
+    v = ventas
+    ref = v['PRECIO_REF']
+    precio = v['PRECIO_UNITARIO_FINAL']
+    desc = v['%_DESCUENTO']
+
+    columnas = {
+        'UNIDADES': v['CANTIDAD'],
+        'VENTA': precio * v['CANTIDAD'],
+        'DESC_PROM': desc,
+        'DESC_MAX': desc,
+        'DESVIACION_PROM': (precio - ref) / ref * 100,
+        'DESVIACION_MIN': (precio - ref) / ref * 100,
+        'INGRESO_PERDIDO': ((ref - precio).clip(lower=0) * v['CANTIDAD']).fillna(0),
+        'MANIPULADOS': v['MANIPULADO'].astype(int),
+        'PRECIO_CERO': (precio == 0).astype(int),
+        'DESC_ALTO': (desc > UMBRAL_DESCUENTO).astype(int),
+    }
+    for nombre, (bajo, alto) in CUBETAS_DESCUENTO.items():
+        columnas[nombre] = ((desc > bajo) & (desc <= alto)).astype(int)
+
+    claves = ['SUCURSAL', 'CAJERO', 'CLAVE', 'FECHA']
+    base = pd.DataFrame(columnas).assign(**{c: v[c] for c in claves + ['ARTICULO', 'LINEA']})
+
+    aggs = {
+        'ARTICULO': ('ARTICULO', 'first'), 'LINEA': ('LINEA', 'first'),
+        'RENGLONES': ('UNIDADES', 'size'), 'UNIDADES': ('UNIDADES', 'sum'), 'VENTA': ('VENTA', 'sum'),
+        'DESC_PROM': ('DESC_PROM', 'mean'), 'DESC_MAX': ('DESC_MAX', 'max'),
+        'DESVIACION_PROM': ('DESVIACION_PROM', 'mean'), 'DESVIACION_MIN': ('DESVIACION_MIN', 'min'),
+        'INGRESO_PERDIDO': ('INGRESO_PERDIDO', 'sum'),
+        'MANIPULADOS': ('MANIPULADOS', 'sum'), 'PRECIO_CERO': ('PRECIO_CERO', 'sum'), 'DESC_ALTO': ('DESC_ALTO', 'sum'),
+    }
+    aggs.update({c: (c, 'sum') for c in CUBETAS_DESCUENTO})
+    res = base.groupby(claves, sort=False).agg(**aggs).reset_index()
+
+    # Sólo lo que tiene algo que auditar; los días a precio normal no aportan al perfil
+    incidencia = (
+        (res['INGRESO_PERDIDO'] > 0) | (res['MANIPULADOS'] > 0) | (res['PRECIO_CERO'] > 0)
+        | (res['RENGLONES'] > res['DESC_0'])
+    )
+    res = res[incidencia].sort_values(['FECHA', 'SUCURSAL', 'CAJERO'])
+    numericas = res.select_dtypes('number').columns
+    res[numericas] = res[numericas].round(2)
+    return res
+
+
+def perfilar_descuentos(ruta_ventas, dir_salida):
+    """Etapa del pipeline: precios de referencia y perfil de descuentos por cajero x SKU x día."""
+    encabezado = pd.read_csv(ruta_ventas, nrows=0).columns
+    faltantes = [c for c in COLUMNAS if c not in encabezado]
+    if faltantes:
+        raise ValueError(f"Faltan columnas para el perfil de descuentos: {faltantes}")
+
+    ventas = pd.read_csv(ruta_ventas, usecols=COLUMNAS, parse_dates=['FECHA'])
+    ventas = ventas[(ventas['TIPO_MOV'].astype(str).str.upper() == 'VENTA') & ventas['FECHA'].notna()]
+    ventas = ventas.assign(
+        CLAVE=ventas['CLAVE'].astype(str),
+        MES=ventas['FECHA'].dt.to_period('M').dt.to_timestamp(),
+        MANIPULADO=ventas['MODIF_PRECIO'].astype(str).str.upper().str.contains('SI', na=False),
+    )
+
+    referencia = precios_referencia(ventas)
+    ventas = asignar_referencia(ventas, referencia)
+
+    escribir_csv_atomico(referencia, os.path.join(dir_salida, ARCHIVO_REFERENCIA))
+    escribir_csv_atomico(perfil(ventas), os.path.join(dir_salida, ARCHIVO_PERFIL))
@@ -5,9 +5,28 @@ echo 1. INICIANDO STREAMLIT (Puerto 8501)
 echo ==================================================
 esto @echo off
 :: 1. Iniciar Streamlit en una ventana
-start cmd /k ""C:\Users\JOSE\AppData\Local\Programs\Python\Python312\python.exe" -m streamlit run Dashboard.py --server.port 8501"
-echo Esperando 8 segundos a que cargue el servidor...
-timeout /t 8
+:: Se borra la senal anterior para no abrir el tunel con un servidor viejo
+if exist dashboard_listo.json del dashboard_listo.json
+start cmd /k ""C:\Users\JOSE\AppData\Local\Programs\Python\Python312\python.exe" startup.py --port 8501"
+echo Esperando a que el servidor precargue los datos (dashboard_listo.json)...
+:: Maximo 180 s (startup.py se rinde a los 120 s y escribe "listo": false)
+set /a espera=0
+:esperar
+timeout /t 1 /nobreak >nul
+if exist dashboard_listo.json goto revisar
+set /a espera+=1
+if %espera% lss 180 goto esperar
+echo AVISO: el servidor no confirmo en 180 s. Se abre el tunel de todos modos; revisa ejecucion_log.txt
+goto tunel
+:revisar
+findstr /c:"\"listo\": false" dashboard_listo.json >nul
+if not errorlevel 1 (
+    echo AVISO: el servidor no respondio a tiempo. Se abre el tunel de todos modos; revisa ejecucion_log.txt
+) else (
+    echo Servidor listo.
+)
+findstr /c:"errores_precarga" dashboard_listo.json >nul && echo AVISO: hubo reportes que no se pudieron cargar; el dashboard muestra el error.
+:tunel
 echo.
 echo ==================================================
 echo 2. INICIANDO NGROK (Tunel Remoto)
@@ -0,0 +1,152 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+from pipeline_stages import escribir_csv_atomico
+
+# --- PRONÓSTICO POR LOTES DE TODAS LAS SERIES SUCURSAL x LÍNEA ---
+# Todas las series diarias se apilan en una matriz (series x días). El suavizado
+# exponencial con estacionalidad semanal recorre los días una sola vez y actualiza
+# todas las series y todas las combinaciones de parámetros con operaciones numpy;
+# no hay un ciclo de Python por serie. Cada serie se queda con el modelo de menor
+# error a un paso (incluido el estacional ingenuo: "mismo día de la semana pasada").
+
+HORIZONTE_DIAS = 28
+HISTORIA_DIAS = 730            # Años anteriores no aportan al nivel actual y sólo cuestan tiempo
+HISTORIA_PUBLICADA_DIAS = 56   # Días reales que se guardan junto al pronóstico para graficar
+TEMPORADA = 7                  # Estacionalidad por día de la semana
+CALENTAMIENTO = 2 * TEMPORADA  # Días que no cuentan para el error (inicialización)
+
+ALPHAS = np.array([0.05, 0.1, 0.2, 0.3, 0.5])
+GAMMAS = np.array([0.05, 0.1, 0.2])
+
+SERIES_POR_PROCESO = 1000      # Por debajo de esto no vale la pena levantar procesos
+Z_80, Z_95 = 1.2816, 1.9600
+
+
+def _suavizado_estacional(y, alpha, gamma):
+    """
+    Holt-Winters aditivo sin tendencia, forma de corrección de error.
+    y: (S, T). alpha, gamma: (K,). Devuelve nivel (S, K), estacionalidad (S, K, 7) y SSE (S, K).
+    """
+    S, T = y.shape
+    K = alpha.shape[0]
+
+    nivel = np.repeat(y[:, :TEMPORADA].mean(axis=1, keepdims=True), K, axis=1)
+    estac = np.repeat((y[:, :TEMPORADA] - nivel[:, :1])[:, None, :], K, axis=1)
+    sse = np.zeros((S, K))
+
+    for t in range(T):
+        d = t % TEMPORADA
+        err = y[:, t:t + 1] - (nivel + estac[:, :, d])
+        if t >= CALENTAMIENTO:
+            sse += err ** 2
+        nivel = nivel + alpha * err
+        estac[:, :, d] = estac[:, :, d] + gamma * err
+
+    return nivel, estac, sse
+
+
+def pronosticar_bloque(y, horizonte=HORIZONTE_DIAS):
+    """
+    Ajusta y pronostica un bloque de series. y: (S, T) con T >= 3 semanas.
+    Devuelve (pronóstico (S, H), sigma por paso (S, H), modelo elegido (S,)).
+    """
+    S, T = y.shape
+    alpha = np.repeat(ALPHAS, len(GAMMAS))
+    gamma = np.tile(GAMMAS, len(ALPHAS))
+    nivel, estac, sse = _suavizado_estacional(y, alpha, gamma)
+
+    # Estacional ingenuo como candidato adicional (columna K)
+    err_ingenuo = y[:, CALENTAMIENTO:] - y[:, CALENTAMIENTO - TEMPORADA:T - TEMPORADA]
+    sse = np.concatenate([sse, (err_ingenuo ** 2).sum(axis=1, keepdims=True)], axis=1)
+
+    mejor = sse.argmin(axis=1)
+    n = T - CALENTAMIENTO
+    sigma = np.sqrt(sse[np.arange(S), mejor] / n)
+
+    h = np.arange(1, horizonte + 1)
+    dias = (T + h - 1) % TEMPORADA
+    es_ets = mejor < len(alpha)
+    k = np.where(es_ets, mejor, 0)
+
+    pron_ets = nivel[np.arange(S), k][:, None] + estac[np.arange(S), k][:, dias]
+    ultima_semana = y[:, T - TEMPORADA:]
+    pron_ingenuo = ultima_semana[:, (h - 1) % TEMPORADA]
+    pron = np.where(es_ets[:, None], pron_ets, pron_ingenuo)
+
+    # Varianza a h pasos: ETS crece con alpha, el ingenuo con las semanas recorridas
+    crec_ets = np.sqrt(1 + (h[None, :] - 1) * alpha[k][:, None] ** 2)
+    crec_ingenuo = np.sqrt((h[None, :] - 1) // TEMPORADA + 1)
+    sigma_h = sigma[:, None] * np.where(es_ets[:, None], crec_ets, crec_ingenuo)
+
+    modelo = np.where(es_ets, [f"ETS a={a:.2f} g={g:.2f}" for a, g in zip(alpha[k], gamma[k])], "Estacional ingenuo")
+    return pron, sigma_h, modelo
+
+
+def matriz_series(df_ventas):
+    """Pivot (series x días) de IMPORTE_REAL con niveles Tienda x Línea, totales por tienda, por línea y global."""
+    d = df_ventas.dropna(subset=['FECHA'])
+    diario = d.groupby(['SUCURSAL', 'LINEA', d['FECHA'].dt.normalize()])['IMPORTE_REAL'].sum()
+
+    base = diario.unstack('FECHA', fill_value=0.0)
+    fin = base.columns.max()
+    dias = pd.date_range(max(base.columns.min(), fin - pd.Timedelta(days=HISTORIA_DIAS - 1)), fin, freq='D', name='FECHA')
+    base = base.reindex(columns=dias, fill_value=0.0)
+
+    # Mismos valores "Todos"/"Todas" que usan los filtros del dashboard
+    por_tienda = base.groupby(level='SUCURSAL').sum()
+    por_tienda.index = pd.MultiIndex.from_product([por_tienda.index, ["Todas"]], names=['SUCURSAL', 'LINEA'])
+    por_linea = base.groupby(level='LINEA').sum()
+    por_linea.index = pd.MultiIndex.from_product([["Todos"], por_linea.index], names=['SUCURSAL', 'LINEA'])
+    total = pd.DataFrame([base.sum()], index=pd.MultiIndex.from_tuples([("Todos", "Todas")], names=['SUCURSAL', 'LINEA']))
+
+    return pd.concat([base, por_tienda, por_linea, total])
+
+
+def pronosticar_ventas(ruta_ventas, ruta_salida, horizonte=HORIZONTE_DIAS, procesos=None):
+    """Etapa del pipeline: pronóstico e intervalos 80/95% para cada Tienda x Línea (y sus totales)."""
+    df = pd.read_csv(ruta_ventas, usecols=['SUCURSAL', 'LINEA', 'FECHA', 'IMPORTE_REAL'], parse_dates=['FECHA'])
+    matriz = matriz_series(df)
+    y = matriz.to_numpy(dtype=float)
+
+    if y.shape[1] < CALENTAMIENTO + TEMPORADA:
+        raise ValueError(f"Se necesitan al menos {CALENTAMIENTO + TEMPORADA} días de historia para pronosticar")
+
+    # Bloques de series en paralelo; cada bloque ya es vectorizado
+    procesos = procesos or os.cpu_count() or 1
+    n_bloques = min(procesos, max(1, len(y) // SERIES_POR_PROCESO))
+    bloques = np.array_split(y, n_bloques)
+    if n_bloques == 1:
+        resultados = [pronosticar_bloque(bloques[0], horizonte)]
+    else:
+        with ProcessPoolExecutor(max_workers=n_bloques) as pool:
+            resultados = list(pool.map(pronosticar_bloque, bloques, [horizonte] * n_bloques))
+
+    pron = np.vstack([r[0] for r in resultados])
+    sigma = np.vstack([r[1] for r in resultados])
+    modelo = np.concatenate([r[2] for r in resultados])
+
+    fechas = pd.date_range(matriz.columns[-1] + pd.Timedelta(days=1), periods=horizonte, freq='D')
+    idx = matriz.index
+    S, H = pron.shape
+
+    salida = pd.DataFrame({
+        'SUCURSAL': np.repeat(idx.get_level_values('SUCURSAL'), H),
+        'LINEA': np.repeat(idx.get_level_values('LINEA'), H),
+        'FECHA': np.tile(fechas, S),
+        'TIPO': 'PRONOSTICO',
+        'VENTA': np.clip(pron, 0, None).ravel(),
+        'LI_80': np.clip(pron - Z_80 * sigma, 0, None).ravel(),
+        'LS_80': (pron + Z_80 * sigma).ravel(),
+        'LI_95': np.clip(pron - Z_95 * sigma, 0, None).ravel(),
+        'LS_95': (pron + Z_95 * sigma).ravel(),
+        'MODELO': np.repeat(modelo, H),
+    })
+
+    # Últimas semanas reales, para que el dashboard grafique sin releer ventas
+    reciente = matriz.iloc[:, -HISTORIA_PUBLICADA_DIAS:].stack().rename('VENTA').reset_index()
+    reciente['TIPO'] = 'REAL'
+
+    escribir_csv_atomico(pd.concat([reciente, salida], ignore_index=True), ruta_salida)
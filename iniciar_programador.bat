@@ -0,0 +1,20 @@
+@echo off
+title Programador del Pipeline (Daemon)
+echo ==================================================
+echo INICIANDO PROGRAMADOR DE ACTUALIZACION CONTINUA
+echo Cortes cada 15 min, Ventas y Facturas cada hora
+echo ==================================================
+echo.
+
+:: 1. Entrar a la carpeta del proyecto
+cd /d "C:\Users\JOSE\Downloads\Streamlit App"
+
+:: 2. Ejecutar el orquestador en modo daemon (reemplaza la tarea programada semanal)
+echo NO CIERRES ESTA VENTANA.
+echo.
+
+"C:\Users\JOSE\AppData\Local\Programs\Python\Python312\python.exe" run_pipeline.py --daemon
+
+echo.
+echo Si ves este mensaje, el programador se detuvo. Revisa ejecucion_log.txt
+pause
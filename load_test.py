@@ -0,0 +1,292 @@
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+# --- PRUEBA DE CARGA: N SESIONES SIMULTÁNEAS SOBRE Dashboard.py ---
+# Uso: python load_test.py --sesiones 10 --duracion 120 --pausa 3
+# Cada sesión es un AppTest de Streamlit (sin navegador) corriendo en su propio hilo,
+# igual que el servidor real ejecuta cada sesión en un hilo del mismo proceso (caches,
+# GIL y memoria compartidos). Las sesiones cambian fechas, Tienda, Línea, la agrupación
+# de Tiempo y los controles de Productos con pausas aleatorias (exponenciales) entre
+# acciones. Los datos son sintéticos y se generan en una carpeta temporal.
+
+DASHBOARD = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Dashboard.py")
+TIENDAS = ["Tienda 1", "Tienda 2", "Tienda 3", "Tienda 4"]
+
+
+# --- DATOS SINTÉTICOS ---
+def generar_datos(carpeta, tickets=100000, dias=730, semilla=0):
+    """Escribe Reporte_Ventas_Historico / Cortes / Facturas con las columnas que usa el dashboard."""
+    rng = np.random.default_rng(semilla)
+    fin = pd.Timestamp.now().normalize()
+    fechas = pd.date_range(fin - pd.Timedelta(days=dias - 1), fin, freq='D')
+
+    # Ventas: ~4 renglones por ticket
+    renglones = rng.integers(1, 8, tickets)
+    n = int(renglones.sum())
+    t_fecha = rng.choice(fechas, tickets)
+    t_tienda = rng.choice(TIENDAS, tickets)
+    t_tipo = np.where(rng.random(tickets) < 0.03, 'DEVOLUCION', 'VENTA')
+    t_hora = [f"{h}:{m:02d}:00" for h, m in zip(rng.integers(8, 21, tickets), rng.integers(0, 60, tickets))]
+    idx = np.repeat(np.arange(tickets), renglones)
+
+    clave = rng.zipf(1.4, n) % 3000
+    precio = (clave % 97 + 5).astype(float)
+    desc = np.where(rng.random(n) < 0.1, rng.uniform(0, 30, n), 0.0)
+    ventas = pd.DataFrame({
+        'SUCURSAL': t_tienda[idx],
+        'FECHA': pd.DatetimeIndex(t_fecha[idx]).strftime('%Y-%m-%d'),
+        'HORA': np.array(t_hora)[idx],
+        'FOLIO': [f"Folio {i}" for i in idx],
+        'TIPO_MOV': t_tipo[idx],
+        'CLAVE': [f"SKU{c}" for c in clave],
+        'ARTICULO': [f"Prod {c}" for c in clave],
+        'LINEA': [f"Linea {c % 15}" for c in clave],
+        'CANTIDAD': rng.integers(1, 5, n).astype(float),
+        'PRECIO_UNITARIO_FINAL': np.round(precio * (1 - desc / 100), 2),
+        '%_DESCUENTO': np.round(desc, 1),
+        'MONTO_DESCUENTO': np.round(precio * desc / 100, 2),
+        'MODIF_PRECIO': np.where(rng.random(n) < 0.02, 'SI', 'NO'),
+        'CAJERO': [f"Cajero {c}" for c in rng.integers(1, 9, n)],
+        'CLIENTE': [f"Cliente {c}" for c in rng.integers(1, 5000, n)],
+    })
+    ventas.to_csv(os.path.join(carpeta, "Reporte_Ventas_Historico.csv"), index=False)
+
+    # Cortes: dos por tienda y día
+    nc = len(fechas) * len(TIENDAS) * 2
+    venta = rng.gamma(4, 2500, nc)
+    cortes = pd.DataFrame({
+        'SUCURSAL': np.tile(np.repeat(TIENDAS, 2), len(fechas)),
+        'FECHA': np.repeat(fechas.strftime('%Y-%m-%d'), len(TIENDAS) * 2),
+        'HORA': np.tile(["14:00:00", "20:30:00"], len(fechas) * len(TIENDAS)),
+        'FOLIO_CORTE': [f"Corte {i}" for i in range(nc)],
+        'CAJA': "Caja 1",
+        'CAJERO': [f"Cajero {c}" for c in rng.integers(1, 9, nc)],
+        'FONDO_INICIAL': np.round(rng.uniform(1000, 2000, nc), 2),
+        'VENTAS_TOTALES_NETAS': np.round(venta, 2),
+        'RETIROS': np.round(venta * rng.uniform(0, 0.5, nc), 2),
+        'SISTEMA_DEBE_HABER': 0.0,
+        'REAL_CONTADO': 0.0,
+        'DIFERENCIA': np.round(rng.normal(0, 40, nc), 2),
+        'PAGO_DEBITO': np.round(venta * 0.15, 2),
+        'PAGO_CREDITO': np.round(venta * 0.05, 2),
+        'PAGO_EFECTIVO_CALC': np.round(venta * 0.8, 2),
+        'FUE_MODIFICADO': np.where(rng.random(nc) < 0.02, 'SI', 'NO'),
+        'USUARIO_MODIF': "Admin 1",
+        'FECHA_MODIF': "",
+    })
+    cortes.to_csv(os.path.join(carpeta, "Reporte_Cortes_Detallado.csv"), index=False)
+
+    # Facturas: una fracción de los tickets
+    nf = max(1, tickets // 20)
+    total = np.round(rng.gamma(2, 400, nf), 2)
+    subtotal = np.round(total / 1.16, 2)   # Los renglones van sin IVA: suman el SUBTOTAL
+    facturas = pd.DataFrame({
+        'SUCURSAL': rng.choice(TIENDAS, nf),
+        'FECHA': pd.DatetimeIndex(rng.choice(fechas, nf)).strftime('%Y-%m-%d'),
+        'FOLIO_INTERNO': [f"Fact {i}" for i in range(nf)],
+        'UUID_FISCAL': [f"UUID {i}" for i in range(nf)],
+        'ESTATUS': np.where(rng.random(nf) < 0.05, 'CANCELADA', 'VIGENTE'),
+        'CLIENTE': [f"Cliente {c}" for c in rng.integers(1, 5000, nf)],
+        'RFC': "INFORMACION_PROTEGIDA",
+        'ARTICULO': "Prod 1",
+        'CANTIDAD': 1.0,
+        'PRECIO_UNITARIO': subtotal,
+        'IMPORTE_RENGLON': subtotal,
+        'SUBTOTAL_FACTURA': subtotal,
+        'IMPUESTOS_FACTURA': np.round(total - subtotal, 2),
+        'TOTAL_FACTURA': total,
+        'USO_CFDI': "G03",
+        'METODO_PAGO': "PUE",
+    })
+    facturas.to_csv(os.path.join(carpeta, "Reporte_Facturas_Detallado.csv"), index=False)
+
+    return fechas.min().date(), fechas.max().date()
+
+
+# --- ACCIONES DE UNA SESIÓN ---
+def _por_etiqueta(widgets, etiqueta):
+    return next(w for w in widgets if w.label == etiqueta)
+
+
+def accion_fechas(at, rng, rango):
+    inicio, fin = rango
+    largo = rng.randint(7, 90)
+    a = inicio + timedelta(days=rng.randint(0, max(0, (fin - inicio).days - largo)))
+    at.sidebar.date_input[0].set_value((a, min(fin, a + timedelta(days=largo))))
+
+
+def accion_tienda(at, rng, rango):
+    w = _por_etiqueta(at.sidebar.selectbox, "Tienda")
+    w.set_value(rng.choice(w.options))
+
+
+def accion_linea(at, rng, rango):
+    w = _por_etiqueta(at.sidebar.selectbox, "Línea")
+    w.set_value(rng.choice(w.options))
+
+
+def accion_agrupacion(at, rng, rango):
+    at.selectbox(key="agrupar_tiempo_v3").set_value(rng.choice(["Día", "Semana", "Mes"]))
+
+
+def accion_productos(at, rng, rango):
+    control = rng.choice(["metrica", "cantidad", "rotacion"])
+    if control == "metrica":
+        _por_etiqueta(at.radio, "Métrica de éxito:").set_value(rng.choice(["Importe ($)", "Unidades (#)", "Frecuencia (Tickets)"]))
+    elif control == "cantidad":
+        _por_etiqueta(at.select_slider, "Cantidad de productos:").set_value(rng.choice([5, 10, 15, 20, 30, 50]))
+    else:
+        w = _por_etiqueta(at.toggle, "Ver productos de baja rotación")
+        w.set_value(not w.value)
+
+
+# Acción -> peso (qué tan seguido la hace un gerente real)
+ACCIONES = {
+    "fechas": (accion_fechas, 3),
+    "tienda": (accion_tienda, 3),
+    "linea": (accion_linea, 2),
+    "agrupacion": (accion_agrupacion, 1),
+    "productos": (accion_productos, 2),
+}
+
+
+def sesion(n, fin, pausa, rango, resultados, timeout):
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(n)
+    at = AppTest.from_file(DASHBOARD, default_timeout=timeout)
+    nombres = list(ACCIONES)
+    pesos = [ACCIONES[a][1] for a in nombres]
+
+    accion = "inicio"
+    while True:
+        t = time.perf_counter()
+        error = None
+        try:
+            at.run()
+            if at.exception:
+                error = at.exception[0].value
+        except Exception as e:
+            error = str(e)
+        resultados.append({
+            'sesion': n, 'accion': accion,
+            'latencia_s': time.perf_counter() - t, 'error': error,
+        })
+
+        if time.time() >= fin:
+            break
+        time.sleep(min(rng.expovariate(1 / pausa), max(0.0, fin - time.time())))
+        accion = rng.choices(nombres, weights=pesos)[0]
+        try:
+            ACCIONES[accion][0](at, rng, rango)
+        except (StopIteration, IndexError, KeyError) as e:
+            # El widget no existe en este render (ej. sin datos para el filtro): solo rerun
+            accion = f"{accion} (sin widget: {e})"
+
+
+# --- MÉTRICAS DEL PROCESO ---
+def memoria_mb():
+    """RSS actual del proceso en MB (psutil si está instalado; si no, /proc en Linux)."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2**20
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/status') as f:
+            for linea in f:
+                if linea.startswith('VmRSS:'):
+                    return int(linea.split()[1]) / 1024
+    except OSError:
+        pass
+    return float('nan')
+
+
+def resumir(resultados, sesiones, segundos, cpu_s, mem_base, mem_pico):
+    df = pd.DataFrame(resultados)
+    df['tipo'] = df['accion'].str.split(' ').str[0]
+    ok = df[df['error'].isna()]
+
+    def pct(s):
+        return {f"p{q}": round(float(np.percentile(s, q)), 3) for q in (50, 95, 99)} if len(s) else {}
+
+    return {
+        'sesiones': sesiones,
+        'duracion_s': round(segundos, 1),
+        'reruns': len(df),
+        'errores': int(df['error'].notna().sum()),
+        'reruns_por_s': round(len(df) / segundos, 2),
+        'latencia_s': pct(ok['latencia_s']),
+        'latencia_por_accion_s': {a: pct(g['latencia_s']) for a, g in ok.groupby('tipo')},
+        'cpu_s_total': round(cpu_s, 2),
+        'cpu_s_por_sesion': round(cpu_s / sesiones, 2),
+        'cpu_s_por_rerun': round(cpu_s / max(1, len(df)), 3),
+        'uso_cpu_pct': round(100 * cpu_s / segundos, 1),
+        'memoria_base_mb': round(mem_base, 1),
+        'memoria_pico_mb': round(mem_pico, 1),
+        'memoria_por_sesion_mb': round((mem_pico - mem_base) / sesiones, 1),
+        'ejemplos_error': df['error'].dropna().unique()[:5].tolist(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga del dashboard con sesiones simuladas")
+    parser.add_argument("--sesiones", type=int, default=5)
+    parser.add_argument("--duracion", type=float, default=60, help="Segundos de prueba")
+    parser.add_argument("--pausa", type=float, default=3, help="Pausa promedio entre acciones (s)")
+    parser.add_argument("--tickets", type=int, default=100000, help="Tickets sintéticos a generar")
+    parser.add_argument("--dias", type=int, default=730)
+    parser.add_argument("--timeout", type=float, default=120, help="Máximo por rerun (s)")
+    parser.add_argument("--salida", help="Guardar el resumen en JSON")
+    args = parser.parse_args()
+
+    # El dashboard lee los reportes del directorio de trabajo
+    carpeta = tempfile.mkdtemp(prefix="carga_dashboard_")
+    print(f"Generando datos sintéticos en {carpeta} ...")
+    rango = generar_datos(carpeta, args.tickets, args.dias)
+    os.chdir(carpeta)
+    sys.path.insert(0, os.path.dirname(DASHBOARD))
+
+    # Calentamiento: primera carga de datos fuera de la medición
+    from streamlit.testing.v1 import AppTest
+    from streamlit.testing.v1.util import patch_config_options
+    AppTest.from_file(DASHBOARD, default_timeout=args.timeout).run()
+
+    mem_base = memoria_mb()
+    mem_pico = mem_base
+    resultados = []
+    fin = time.time() + args.duracion
+    cpu0, t0 = time.process_time(), time.perf_counter()
+
+    hilos = [
+        threading.Thread(target=sesion, args=(n, fin, args.pausa, rango, resultados, args.timeout), daemon=True)
+        for n in range(args.sesiones)
+    ]
+    # AppTest activa global.appTest sólo durante cada run y lo restaura al terminar: con varias
+    # sesiones en paralelo una lo apagaría a media ejecución de otra. Se deja activo toda la prueba.
+    with patch_config_options({"global.appTest": True}):
+        for h in hilos:
+            h.start()
+        while any(h.is_alive() for h in hilos):
+            mem_pico = max(mem_pico, memoria_mb())
+            time.sleep(0.5)
+
+    resumen = resumir(resultados, args.sesiones, time.perf_counter() - t0, time.process_time() - cpu0, mem_base, mem_pico)
+    print(json.dumps(resumen, indent=2, ensure_ascii=False))
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(resumen, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
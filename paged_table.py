@@ -0,0 +1,96 @@
+import io
+import math
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# --- TABLAS DE DETALLE PAGINADAS DEL LADO DEL SERVIDOR ---
+# El orden y la búsqueda se resuelven aquí y se guardan como arreglo de etiquetas
+# del índice (una vez por tabla, columna y texto buscado); al navegador sólo viaja
+# la página visible. La descarga CSV se arma en bloques hasta que se pide.
+
+TAMANOS_PAGINA = [25, 50, 100, 250]
+FILAS_POR_BLOQUE_CSV = 50000
+
+
+@st.cache_data(max_entries=64)
+def _orden(_df, clave, columna, descendente):
+    # Etiquetas (no posiciones): el llamador puede pasar el mismo contenido en otro orden
+    return _df.sort_values(columna, ascending=not descendente, kind='stable', na_position='last').index.to_numpy()
+
+
+@st.cache_data(max_entries=64)
+def _coincidencias(_df, clave, texto):
+    cols = [c for c in _df.columns if pd.api.types.is_string_dtype(_df[c]) or _df[c].dtype == object]
+    mascara = np.zeros(len(_df), dtype=bool)
+    for c in cols:
+        mascara |= _df[c].astype(str).str.contains(texto, case=False, regex=False).to_numpy(dtype=bool)
+    return pd.Series(mascara, index=_df.index)
+
+
+@st.cache_data(max_entries=64)
+def _seleccion(_df, clave, columna, descendente, texto):
+    etiquetas = _orden(_df, clave, columna, descendente)
+    if texto:
+        etiquetas = etiquetas[_coincidencias(_df, clave, texto).loc[etiquetas].to_numpy()]
+    return etiquetas
+
+
+def _csv_en_bloques(df, etiquetas):
+    buffer = io.BytesIO()
+    for i in range(0, len(etiquetas), FILAS_POR_BLOQUE_CSV):
+        bloque = df.loc[etiquetas[i:i + FILAS_POR_BLOQUE_CSV]]
+        # utf-8-sig para que Excel respete los acentos
+        buffer.write(bloque.to_csv(index=False, header=(i == 0)).encode('utf-8-sig' if i == 0 else 'utf-8'))
+    buffer.seek(0)
+    return buffer
+
+
+def _reiniciar_pagina(key):
+    st.session_state[f"{key}_pagina"] = 1
+
+
+def tabla_paginada(df, clave, key, orden=None, descendente=True, column_config=None, nombre_archivo="detalle.csv"):
+    """
+    Reemplazo de st.dataframe para tablas largas. `clave` identifica el contenido de df
+    (ruta y filtros que lo generaron); mientras no cambie, el orden y las búsquedas
+    salen del cache. `key` distingue los controles de cada tabla en la página.
+    """
+    if not df.index.is_unique:
+        df = df.reset_index(drop=True)
+    # El cache no ve el DataFrame: dos tablas con los mismos filtros se separan por su key
+    clave = (key, clave, len(df))
+    columnas = list(df.columns)
+
+    c_buscar, c_orden, c_dir, c_tam = st.columns([3, 2, 1, 1])
+    texto = c_buscar.text_input("Buscar", key=f"{key}_buscar", placeholder="Texto en cualquier columna...",
+                                on_change=_reiniciar_pagina, args=(key,)).strip()
+    columna = c_orden.selectbox("Ordenar por", columnas, index=columnas.index(orden) if orden in columnas else 0,
+                                key=f"{key}_orden", on_change=_reiniciar_pagina, args=(key,))
+    direccion = c_dir.selectbox("Dirección", ["Desc.", "Asc."], index=0 if descendente else 1,
+                                key=f"{key}_dir", on_change=_reiniciar_pagina, args=(key,))
+    tam = c_tam.selectbox("Filas", TAMANOS_PAGINA, index=1, key=f"{key}_tam", on_change=_reiniciar_pagina, args=(key,))
+
+    etiquetas = _seleccion(df, clave, columna, direccion == "Desc.", texto)
+    total = len(etiquetas)
+    paginas = max(1, math.ceil(total / tam))
+
+    # Si cambiaron los filtros de arriba la página guardada puede ya no existir
+    if st.session_state.get(f"{key}_pagina", 1) > paginas:
+        st.session_state[f"{key}_pagina"] = 1
+
+    visible = df.loc[etiquetas[(st.session_state.get(f"{key}_pagina", 1) - 1) * tam:][:tam]]
+    st.dataframe(visible, column_config=column_config, use_container_width=True, hide_index=True)
+
+    c_pag, c_info, c_desc = st.columns([1, 2, 1])
+    pagina = c_pag.number_input("Página", min_value=1, max_value=paginas, step=1, key=f"{key}_pagina")
+    inicio = (pagina - 1) * tam
+    c_info.caption(f"Mostrando {min(inicio + 1, total):,}–{min(inicio + tam, total):,} de {total:,} registros · página {pagina} de {paginas}")
+    c_desc.download_button(
+        "⬇️ Descargar CSV",
+        data=lambda: _csv_en_bloques(df, etiquetas),
+        file_name=nombre_archivo,
+        mime="text/csv",
+        key=f"{key}_csv",
+        disabled=total == 0
+    )
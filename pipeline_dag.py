@@ -0,0 +1,182 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, List, Optional
+
+# --- MOTOR DEL PIPELINE COMO GRAFO DE ETAPAS (DAG) ---
+# Cada etapa declara sus archivos de entrada/salida y de qué etapas depende.
+# Antes de ejecutar una etapa se calcula un hash del contenido de sus entradas;
+# si coincide con el de la última ejecución exitosa (guardado en el manifiesto)
+# y sus salidas siguen existiendo, la etapa se omite.
+# Si la acción devuelve un dict (ej. el resumen de validación de limpiar), se
+# guarda en el manifiesto junto al estado de la etapa.
+# Las etapas `siempre` (extracción de Firebird) no se pueden omitir por hash: su
+# entrada real es la base de datos viva. El ahorro empieza en la etapa siguiente:
+# si la extracción dejó el mismo CSV crudo, limpiar y todo lo que sigue se omiten.
+
+VERSION_MANIFIESTO = 1
+TAM_BLOQUE_HASH = 1024 * 1024
+
+
+@dataclass
+class Etapa:
+    nombre: str
+    accion: Callable[[], None]
+    entradas: List[str] = field(default_factory=list)
+    salidas: List[str] = field(default_factory=list)
+    depende_de: List[str] = field(default_factory=list)
+    grupo: Optional[str] = None     # Reporte al que pertenece (define su cadencia). None = etapa global
+    siempre: bool = False           # Entrada real que no es un archivo (ej. extracción de Firebird): nunca se omite
+
+
+# --- MANIFIESTO (ESTADO PERSISTENTE ENTRE EJECUCIONES) ---
+def cargar_manifiesto(ruta):
+    if os.path.exists(ruta):
+        try:
+            with open(ruta, encoding='utf-8') as f:
+                manifiesto = json.load(f)
+            if manifiesto.get('version') == VERSION_MANIFIESTO:
+                return manifiesto
+        except (OSError, ValueError) as e:
+            logging.warning(f"Manifiesto ilegible, se reconstruye desde cero: {e}")
+    return {'version': VERSION_MANIFIESTO, 'etapas': {}, 'archivos': {}, 'grupos': {}}
+
+
+def guardar_manifiesto(manifiesto, ruta):
+    # Escritura atómica para no dejar un JSON a medias si el proceso se interrumpe
+    tmp = ruta + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifiesto, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, ruta)
+
+
+# --- HASH DE CONTENIDO ---
+def hash_archivo(ruta, manifiesto):
+    """Hash SHA-256 del contenido. Se reutiliza el valor guardado si tamaño y mtime no cambiaron."""
+    if not os.path.exists(ruta):
+        return 'AUSENTE'
+
+    st_info = os.stat(ruta)
+    previo = manifiesto['archivos'].get(ruta)
+    if previo and previo['tam'] == st_info.st_size and previo['mtime_ns'] == st_info.st_mtime_ns:
+        return previo['sha256']
+
+    h = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(TAM_BLOQUE_HASH), b''):
+            h.update(bloque)
+
+    digest = h.hexdigest()
+    manifiesto['archivos'][ruta] = {'tam': st_info.st_size, 'mtime_ns': st_info.st_mtime_ns, 'sha256': digest}
+    return digest
+
+
+def hash_entradas(etapa, manifiesto):
+    partes = [etapa.nombre] + [f"{ruta}={hash_archivo(ruta, manifiesto)}" for ruta in sorted(etapa.entradas)]
+    return hashlib.sha256('\n'.join(partes).encode('utf-8')).hexdigest()
+
+
+# --- ORDEN TOPOLÓGICO ---
+def orden_topologico(etapas):
+    por_nombre = {e.nombre: e for e in etapas}
+    pendientes = {e.nombre: [d for d in e.depende_de if d in por_nombre] for e in etapas}
+    orden = []
+
+    while pendientes:
+        listas = [n for n, deps in pendientes.items() if not deps]
+        if not listas:
+            raise ValueError(f"Ciclo de dependencias entre etapas: {sorted(pendientes)}")
+        for nombre in listas:
+            orden.append(por_nombre[nombre])
+            del pendientes[nombre]
+        for deps in pendientes.values():
+            deps[:] = [d for d in deps if d not in listas]
+
+    return orden
+
+
+# --- EJECUCIÓN ---
+def ejecutar_dag(etapas, ruta_manifiesto, grupos=None, forzar=False):
+    """
+    Ejecuta las etapas de los grupos indicados (todas si grupos es None) más las
+    etapas globales. Devuelve un dict {nombre: estado} con OK / OMITIDA / ERROR / BLOQUEADA.
+    """
+    manifiesto = cargar_manifiesto(ruta_manifiesto)
+    seleccion = [e for e in etapas if grupos is None or e.grupo is None or e.grupo in grupos]
+    estados = {}
+
+    for etapa in orden_topologico(seleccion):
+        if any(estados.get(d) in ('ERROR', 'BLOQUEADA') for d in etapa.depende_de):
+            estados[etapa.nombre] = 'BLOQUEADA'
+            logging.error(f"Etapa {etapa.nombre} bloqueada por un error en una etapa previa.")
+            continue
+
+        firma = hash_entradas(etapa, manifiesto)
+        previo = manifiesto['etapas'].get(etapa.nombre, {})
+        salidas_ok = all(os.path.exists(s) for s in etapa.salidas)
+
+        if not (forzar or etapa.siempre) and previo.get('hash') == firma and previo.get('estado') == 'OK' and salidas_ok:
+            estados[etapa.nombre] = 'OMITIDA'
+            logging.info(f"OMITIDA: {etapa.nombre} (entradas sin cambios).")
+            continue
+
+        inicio = time.time()
+        resultado = None
+        try:
+            resultado = etapa.accion()
+            estados[etapa.nombre] = 'OK'
+            logging.info(f"ÉXITO: {etapa.nombre} ({time.time() - inicio:.1f} s).")
+        except Exception as e:
+            estados[etapa.nombre] = 'ERROR'
+            logging.error(f"ERROR en {etapa.nombre}: {str(e)}")
+
+        manifiesto['etapas'][etapa.nombre] = {
+            'hash': firma,
+            'estado': estados[etapa.nombre],
+            'fin': datetime.now().isoformat(timespec='seconds'),
+            'duracion_s': round(time.time() - inicio, 2),
+        }
+        if isinstance(resultado, dict):
+            manifiesto['etapas'][etapa.nombre]['resultado'] = resultado
+        # Guardamos tras cada etapa: si el proceso muere, lo ya hecho no se repite
+        guardar_manifiesto(manifiesto, ruta_manifiesto)
+
+    guardar_manifiesto(manifiesto, ruta_manifiesto)
+    return estados
+
+
+# --- PROGRAMADOR (DAEMON) ---
+def ejecutar_programador(etapas, ruta_manifiesto, cadencias_min, revision_s=30):
+    """
+    Bucle infinito: cada grupo (reporte) se ejecuta con su propia cadencia en minutos.
+    La hora de la última corrida se guarda en el manifiesto para respetar la cadencia tras un reinicio.
+    """
+    logging.info(f"--- Programador iniciado. Cadencias (min): {cadencias_min} ---")
+
+    while True:
+        try:
+            manifiesto = cargar_manifiesto(ruta_manifiesto)
+            ahora = time.time()
+            vencidos = [
+                g for g, minutos in cadencias_min.items()
+                if ahora - manifiesto['grupos'].get(g, 0) >= minutos * 60
+            ]
+
+            if vencidos:
+                logging.info(f"--- Ciclo programado para: {', '.join(vencidos)} ---")
+                ejecutar_dag(etapas, ruta_manifiesto, grupos=vencidos)
+
+                manifiesto = cargar_manifiesto(ruta_manifiesto)
+                for g in vencidos:
+                    manifiesto['grupos'][g] = ahora
+                guardar_manifiesto(manifiesto, ruta_manifiesto)
+        except Exception:
+            # Un ciclo fallido (disco, manifiesto bloqueado...) no tumba al programador:
+            # los grupos vencidos no se marcan y se reintentan en la próxima revisión
+            logging.exception("ERROR en el ciclo del programador; se reintenta en la próxima revisión.")
+
+        time.sleep(revision_s)
@@ -0,0 +1,51 @@
+import logging
+import os
+import pandas as pd
+
+from data_cleaning import limpiar_dataframe
+from data_validation import validar
+from sorted_merge import fusionar_ordenado
+
+# --- ETAPAS DEL PIPELINE: LIMPIAR -> CONSOLIDAR ---
+# La extracción (notebooks por tienda) vive en run_pipeline.py; aquí sólo
+# transformaciones de archivo a archivo, para que el DAG pueda hashear sus entradas.
+
+
+def escribir_csv_atomico(df, ruta):
+    # El dashboard puede estar leyendo el archivo: escribimos aparte y reemplazamos
+    os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+    tmp = ruta + '.tmp'
+    df.to_csv(tmp, index=False)
+    os.replace(tmp, ruta)
+
+
+def ordenar_por_fecha(df):
+    # Shard de una tienda: por día y, dentro del día, por hora (HORA_NUM separa 9:xx de 10:xx)
+    claves = [c for c in ('FECHA', 'HORA_NUM', 'HORA') if c in df.columns]
+    if 'FECHA' not in claves:
+        return df
+    return df.sort_values(claves, kind='stable', na_position='last')
+
+
+def limpiar(ruta_crudo, ruta_limpio, reporte, ruta_cuarentena):
+    # Validación antes de limpiar: lo que no pasa se aparta con su motivo en vez de volverse 0 / NaT
+    validas, cuarentena, resumen = validar(pd.read_csv(ruta_crudo), reporte)
+    escribir_csv_atomico(cuarentena, ruta_cuarentena)
+    if resumen['cuarentena']:
+        logging.warning(f"CUARENTENA: {resumen['cuarentena']} de {resumen['filas']} filas de {ruta_crudo} ({resumen['motivos']})")
+    if resumen['avisos']:
+        logging.warning(f"AVISOS en {ruta_crudo}: {resumen['avisos']}")
+
+    df = limpiar_dataframe(validas)
+    escribir_csv_atomico(ordenar_por_fecha(df), ruta_limpio)
+    return resumen  # El DAG lo guarda en el manifiesto
+
+
+def consolidar(rutas_limpias, ruta_salida):
+    # Mezcla de los shards ordenados: el consolidado queda ordenado por FECHA y con índice
+    rutas = [r for r in rutas_limpias if os.path.exists(r)]
+    if not rutas:
+        raise FileNotFoundError(f"No hay archivos limpios para consolidar en {ruta_salida}")
+    os.makedirs(os.path.dirname(ruta_salida) or '.', exist_ok=True)
+    fusionar_ordenado(rutas, ruta_salida)
+
@@ -1,12 +1,47 @@
 import papermill as pm
 import os
+import argparse
 import logging
 from datetime import datetime
+from functools import partial
+
+from pipeline_dag import Etapa, ejecutar_dag, ejecutar_programador
+from pipeline_stages import limpiar, consolidar
+from customer_rfm import actualizar_rfm, ARCHIVO_CLIENTES, ARCHIVO_SUCURSALES
+from forecasting import pronosticar_ventas
+from anomalies import detectar_anomalias, ARCHIVO_ANOMALIAS
+from discounts import perfilar_descuentos, ARCHIVO_PERFIL, ARCHIVO_REFERENCIA
+from snapshot import publicar_snapshot, ARCHIVO_PUNTERO
+from sorted_merge import ruta_indice
 
 # Configuración de Rutas
 BASE_DIR = r"C:\Users\JOSE\Downloads\Streamlit App"
 NOTEBOOKS_DIR = os.path.join(BASE_DIR, "lectura_informacion")
 LOG_FILE = os.path.join(BASE_DIR, "ejecucion_log.txt")
+DATOS_DIR = os.path.join(BASE_DIR, "datos")
+MANIFIESTO = os.path.join(BASE_DIR, "estado_pipeline.json")
+
+# Archivos consolidados que consume Dashboard.py
+REPORTES = {
+    "ventas": "Reporte_Ventas_Historico.csv",
+    "cortes": "Reporte_Cortes_Detallado.csv",
+    "facturas": "Reporte_Facturas_Detallado.csv",
+}
+
+# Cadencia de cada reporte en modo --daemon (minutos)
+CADENCIAS_MIN = {
+    "cortes": 15,
+    "ventas": 60,
+    "facturas": 60,
+}
+
+# Orden de ejecución definido por ti
+NOTEBOOKS = [
+    "Conexion_Base_Tienda1.ipynb",
+    "Conexion_Base_Tienda2.ipynb",
+    "Conexion_Base_Tienda3.ipynb",
+    "Conexion_Base_Tienda4.ipynb"
+]
 
 # Configurar Logging
 logging.basicConfig(
@@ -15,16 +50,17 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
-def ejecutar_notebook(nombre_notebook):
+def ejecutar_notebook(nombre_notebook, parametros=None, sufijo=""):
     path_input = os.path.join(NOTEBOOKS_DIR, nombre_notebook)
     # Crea una versión ejecutada para auditoría (opcional)
-    path_output = os.path.join(NOTEBOOKS_DIR, f"Ejecutado_{nombre_notebook}")
-    
+    path_output = os.path.join(NOTEBOOKS_DIR, f"Ejecutado_{sufijo}{nombre_notebook}")
+
     try:
         print(f"Ejecutando: {nombre_notebook}...")
         pm.execute_notebook(
             path_input,
             path_output,
+            parameters=parametros or {},
             cwd=NOTEBOOKS_DIR # Asegura que el notebook vea sus carpetas locales
         )
         logging.info(f"ÉXITO: {nombre_notebook} ejecutado correctamente.")
@@ -34,26 +70,147 @@ def ejecutar_notebook(nombre_notebook):
         print(f"Error crítico en {nombre_notebook}. Revisa el log.")
         return False
 
+def extraer(nombre_notebook, reporte, ruta_salida):
+    # Papermill inyecta `reporte` y `ruta_salida`: el notebook sólo consulta ese
+    # reporte y escribe su resultado crudo (una tienda) en ruta_salida.
+    os.makedirs(os.path.dirname(ruta_salida), exist_ok=True)
+    ok = ejecutar_notebook(
+        nombre_notebook,
+        parametros={"reporte": reporte, "ruta_salida": ruta_salida},
+        sufijo=f"{reporte}_"
+    )
+    if not ok:
+        raise RuntimeError(f"Falló la extracción de {reporte} en {nombre_notebook}")
+
+def construir_etapas():
+    """
+    extraer (por tienda) -> limpiar (validación + shard ordenado por FECHA) -> consolidar (mezcla
+    ordenada), para cada reporte; después las etapas que leen los consolidados (RFM, pronóstico,
+    anomalías, descuentos y snapshot). Cada una agrega al grano que necesita (cajero, línea, cliente):
+    no hay un agregado diario común que valga la pena escribir aparte.
+    """
+    etapas = []
+
+    for reporte, archivo in REPORTES.items():
+        limpios = []
+        nombres_limpiar = []
+
+        for notebook in NOTEBOOKS:
+            tienda = os.path.splitext(notebook)[0].replace("Conexion_Base_", "")
+            ruta_crudo = os.path.join(DATOS_DIR, "crudo", reporte, f"{tienda}.csv")
+            ruta_limpio = os.path.join(DATOS_DIR, "limpio", reporte, f"{tienda}.csv")
+            ruta_cuarentena = os.path.join(DATOS_DIR, "cuarentena", reporte, f"{tienda}.csv")
+
+            # La extracción siempre corre (la fuente es la base viva); si trae lo mismo,
+            # el hash del CSV crudo hace que limpiar y lo que sigue se omitan
+            etapas.append(Etapa(
+                nombre=f"extraer_{reporte}_{tienda}",
+                accion=partial(extraer, notebook, reporte, ruta_crudo),
+                salidas=[ruta_crudo],
+                grupo=reporte,
+                siempre=True
+            ))
+            etapas.append(Etapa(
+                nombre=f"limpiar_{reporte}_{tienda}",
+                accion=partial(limpiar, ruta_crudo, ruta_limpio, reporte, ruta_cuarentena),
+                entradas=[ruta_crudo],
+                salidas=[ruta_limpio, ruta_cuarentena],
+                depende_de=[f"extraer_{reporte}_{tienda}"],
+                grupo=reporte
+            ))
+            limpios.append(ruta_limpio)
+            nombres_limpiar.append(f"limpiar_{reporte}_{tienda}")
+
+        ruta_consolidado = os.path.join(BASE_DIR, archivo)
+        etapas.append(Etapa(
+            nombre=f"consolidar_{reporte}",
+            accion=partial(consolidar, limpios, ruta_consolidado),
+            entradas=limpios,
+            salidas=[ruta_consolidado, ruta_indice(ruta_consolidado)],
+            depende_de=nombres_limpiar,
+            grupo=reporte
+        ))
+
+    # --- ETAPAS GLOBALES (dependen de varios reportes) ---
+    ruta_ventas = os.path.join(BASE_DIR, REPORTES["ventas"])
+    ruta_facturas = os.path.join(BASE_DIR, REPORTES["facturas"])
+    dir_clientes = os.path.join(DATOS_DIR, "clientes")
+    etapas.append(Etapa(
+        nombre="clientes_rfm",
+        accion=partial(actualizar_rfm, ruta_ventas, ruta_facturas, dir_clientes),
+        entradas=[ruta_ventas, ruta_facturas],
+        salidas=[os.path.join(dir_clientes, ARCHIVO_CLIENTES), os.path.join(dir_clientes, ARCHIVO_SUCURSALES)],
+        depende_de=["consolidar_ventas", "consolidar_facturas"]
+    ))
+
+    ruta_pronostico = os.path.join(DATOS_DIR, "pronosticos", "pronostico_ventas.csv")
+    etapas.append(Etapa(
+        nombre="pronosticar_ventas",
+        accion=partial(pronosticar_ventas, ruta_ventas, ruta_pronostico),
+        entradas=[ruta_ventas],
+        salidas=[ruta_pronostico],
+        depende_de=["consolidar_ventas"],
+        grupo="ventas"
+    ))
+
+    ruta_cortes = os.path.join(BASE_DIR, REPORTES["cortes"])
+    dir_anomalias = os.path.join(DATOS_DIR, "anomalias")
+    etapas.append(Etapa(
+        nombre="detectar_anomalias",
+        accion=partial(detectar_anomalias, ruta_cortes, ruta_ventas, dir_anomalias),
+        entradas=[ruta_cortes, ruta_ventas],
+        salidas=[os.path.join(dir_anomalias, ARCHIVO_ANOMALIAS)],
+        depende_de=["consolidar_cortes", "consolidar_ventas"]
+    ))
+
+    dir_descuentos = os.path.join(DATOS_DIR, "descuentos")
+    etapas.append(Etapa(
+        nombre="perfilar_descuentos",
+        accion=partial(perfilar_descuentos, ruta_ventas, dir_descuentos),
+        entradas=[ruta_ventas],
+        salidas=[os.path.join(dir_descuentos, ARCHIVO_PERFIL), os.path.join(dir_descuentos, ARCHIVO_REFERENCIA)],
+        depende_de=["consolidar_ventas"],
+        grupo="ventas"
+    ))
+
+    # Snapshot Arrow que mapean en memoria los procesos del dashboard
+    consolidados = {reporte: os.path.join(BASE_DIR, archivo) for reporte, archivo in REPORTES.items()}
+    dir_snapshot = os.path.join(DATOS_DIR, "snapshot")
+    etapas.append(Etapa(
+        nombre="publicar_snapshot",
+        accion=partial(publicar_snapshot, consolidados, dir_snapshot),
+        entradas=list(consolidados.values()),
+        salidas=[os.path.join(dir_snapshot, ARCHIVO_PUNTERO)],
+        depende_de=[f"consolidar_{reporte}" for reporte in REPORTES]
+    ))
+
+    return etapas
+
 def main():
-    # Orden de ejecución definido por ti
-    pipeline = [
-        "Conexion_Base_Tienda1.ipynb",
-        "Conexion_Base_Tienda2.ipynb",
-        "Conexion_Base_Tienda3.ipynb",
-        "Conexion_Base_Tienda4.ipynb"
-    ]
-    
+    parser = argparse.ArgumentParser(description="Pipeline de actualización del Dashboard")
+    parser.add_argument("--daemon", action="store_true", help="Queda corriendo y ejecuta cada reporte según CADENCIAS_MIN")
+    parser.add_argument("--forzar", action="store_true", help="Ignora los hashes y re-ejecuta todas las etapas")
+    args = parser.parse_args()
+
+    etapas = construir_etapas()
+
+    if args.daemon:
+        ejecutar_programador(etapas, MANIFIESTO, CADENCIAS_MIN)
+        return
+
     start_time = datetime.now()
     logging.info("--- Iniciando proceso de actualización semanal ---")
-    
-    for notebook in pipeline:
-        success = ejecutar_notebook(notebook)
-        if not success:
-            logging.error("Pipeline detenido debido a un error previo.")
-            break
+
+    estados = ejecutar_dag(etapas, MANIFIESTO, forzar=args.forzar)
+
+    fallidas = [n for n, e in estados.items() if e in ('ERROR', 'BLOQUEADA')]
+    if fallidas:
+        logging.error(f"Pipeline con etapas fallidas o bloqueadas: {', '.join(fallidas)}")
+        print("Pipeline terminado con errores. Revisa el log.")
     else:
-        logging.info("--- Pipeline finalizado con éxito total ---")
+        omitidas = sum(1 for e in estados.values() if e == 'OMITIDA')
+        logging.info(f"--- Pipeline finalizado con éxito total ({omitidas} etapas omitidas, {datetime.now() - start_time}) ---")
         print("Proceso completado exitosamente.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,100 @@
+import json
+import os
+from datetime import datetime
+import pandas as pd
+import pyarrow as pa
+
+from data_cleaning import leer_limpio
+
+# --- SNAPSHOT COLUMNAR COMPARTIDO (ARROW IPC) ---
+# El pipeline publica cada reporte ya limpio como archivo Arrow IPC sin compresión.
+# Los procesos del dashboard lo abren con memory_map: no hay parseo, y las páginas
+# del archivo las comparte el sistema operativo entre todos los procesos.
+# actual.json apunta a la versión vigente de cada reporte y se reemplaza de forma
+# atómica; los archivos de la versión anterior se conservan una publicación más
+# porque algún proceso puede seguir leyéndolos.
+
+ARCHIVO_PUNTERO = "actual.json"
+FORMATO = 2    # 2: datos validados (cuarentena / avisos). Un snapshot de otro formato se republica
+
+
+def _firma(ruta):
+    st_info = os.stat(ruta)
+    return f"{st_info.st_size}-{st_info.st_mtime_ns}"
+
+
+def leer_puntero(dir_snapshot):
+    ruta = os.path.join(dir_snapshot, ARCHIVO_PUNTERO)
+    if not os.path.exists(ruta):
+        return {'version': None, 'reportes': {}}
+    with open(ruta, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def escribir_arrow(df, ruta):
+    # Un solo bloque por columna: to_pandas puede usar los buffers sin concatenar
+    tabla = pa.Table.from_pandas(df, preserve_index=False).combine_chunks()
+    tmp = ruta + '.tmp'
+    with pa.OSFile(tmp, 'wb') as sink, pa.ipc.new_file(sink, tabla.schema) as writer:
+        writer.write_table(tabla)
+    os.replace(tmp, ruta)
+
+
+def _texto_como_arrow(tipo):
+    # Cadenas respaldadas por el buffer mapeado, sin crear objetos str de Python
+    if pa.types.is_string(tipo) or pa.types.is_large_string(tipo):
+        return pd.ArrowDtype(tipo)
+    return None
+
+
+def leer_arrow(ruta):
+    """DataFrame sobre el archivo mapeado en memoria (numéricos y fechas sin copia cuando no hay nulos)."""
+    fuente = pa.memory_map(ruta, 'r')
+    tabla = pa.ipc.open_file(fuente).read_all()
+    return tabla.to_pandas(split_blocks=True, types_mapper=_texto_como_arrow)
+
+
+def publicar_snapshot(reportes, dir_snapshot):
+    """
+    Etapa del pipeline. reportes: {nombre: ruta_csv_consolidado}.
+    Sólo reescribe los reportes cuyo CSV cambió desde la publicación anterior.
+    """
+    os.makedirs(dir_snapshot, exist_ok=True)
+    previo = leer_puntero(dir_snapshot)
+    version = datetime.now().strftime('%Y%m%d%H%M%S')
+    nuevo = {'version': version, 'publicado': datetime.now().isoformat(timespec='seconds'), 'reportes': {}}
+
+    for nombre, ruta in reportes.items():
+        if not os.path.exists(ruta):
+            continue
+
+        firma = _firma(ruta)
+        anterior = previo['reportes'].get(nombre)
+        if anterior and anterior['firma'] == firma and anterior.get('formato') == FORMATO and os.path.exists(os.path.join(dir_snapshot, anterior['archivo'])):
+            nuevo['reportes'][nombre] = anterior
+            continue
+
+        df = leer_limpio(ruta)
+        archivo = f"{nombre}-{version}.arrow"
+        escribir_arrow(df, os.path.join(dir_snapshot, archivo))
+        nuevo['reportes'][nombre] = {
+            'archivo': archivo,
+            'origen': os.path.basename(ruta),
+            'firma': firma,
+            'formato': FORMATO,
+            'filas': len(df),
+        }
+
+    tmp = os.path.join(dir_snapshot, ARCHIVO_PUNTERO + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(nuevo, f, indent=2)
+    os.replace(tmp, os.path.join(dir_snapshot, ARCHIVO_PUNTERO))
+
+    # Limpieza: se conservan los archivos de esta versión y de la anterior
+    vigentes = {r['archivo'] for p in (previo, nuevo) for r in p['reportes'].values()}
+    for archivo in os.listdir(dir_snapshot):
+        if archivo.endswith('.arrow') and archivo not in vigentes:
+            try:
+                os.remove(os.path.join(dir_snapshot, archivo))
+            except OSError:
+                pass  # En Windows un archivo mapeado no se puede borrar; se intenta en la próxima publicación
@@ -0,0 +1,205 @@
+import io
+import json
+import os
+import pandas as pd
+
+# --- CONSOLIDACIÓN POR MEZCLA ORDENADA (K-WAY MERGE) DE LOS SHARDS POR TIENDA ---
+# Cada tienda deja su archivo limpio ordenado por FECHA. La mezcla lee todos en
+# bloques y en cada vuelta escribe lo que ya es seguro (filas con FECHA < la menor
+# de las últimas fechas en memoria), así la memoria depende del tamaño de bloque y
+# no del histórico. El resultado es el mismo que concatenar los shards y ordenar
+# estable por FECHA. El texto de cada celda pasa tal cual (dtype=str).
+# Junto al CSV se escribe un índice con grupos de filas: byte de inicio y FECHA
+# mínima/máxima de cada grupo. leer_rango() lo usa para saltar directo a las fechas
+# pedidas en lugar de parsear el archivo completo.
+
+COLUMNA_ORDEN = "FECHA"
+FILAS_BLOQUE = 20000       # Filas por lectura de cada shard (acota la memoria)
+FILAS_POR_GRUPO = 20000    # Filas por grupo del índice
+SUFIJO_INDICE = ".indice.json"
+
+_F = "__FECHA_ORDEN__"
+
+
+def ruta_indice(ruta):
+    return ruta + SUFIJO_INDICE
+
+
+class _Shard:
+    """Lector por bloques de un archivo limpio; separa las filas sin fecha (van al final)."""
+
+    def __init__(self, ruta, columnas):
+        self.ruta = ruta
+        self.columnas = columnas
+        self.lector = pd.read_csv(ruta, dtype=str, keep_default_na=False, chunksize=FILAS_BLOQUE)
+        self.ultima = None
+        self.sin_fecha = []
+        self.agotado = False
+
+    def siguiente(self):
+        for bloque in self.lector:
+            bloque = bloque.reindex(columns=self.columnas, fill_value='')
+            bloque[_F] = pd.to_datetime(bloque[COLUMNA_ORDEN], errors='coerce')
+            nulas = bloque[_F].isna()
+            if nulas.any():
+                self.sin_fecha.append(bloque[nulas])
+                bloque = bloque[~nulas]
+            if bloque.empty:
+                continue
+            if not bloque[_F].is_monotonic_increasing or (self.ultima is not None and bloque[_F].iloc[0] < self.ultima):
+                raise ValueError(f"{self.ruta} no está ordenado por {COLUMNA_ORDEN}")
+            self.ultima = bloque[_F].iloc[-1]
+            return bloque
+        self.agotado = True
+        return None
+
+
+class _EscritorIndexado:
+    """Escribe el CSV en grupos de FILAS_POR_GRUPO filas y registra byte y fechas de cada uno."""
+
+    def __init__(self, ruta, columnas):
+        self.ruta = ruta
+        self.tmp = ruta + '.tmp'
+        self.f = open(self.tmp, 'wb')
+        self.f.write(pd.DataFrame(columns=columnas).to_csv(index=False).encode('utf-8'))
+        self.pendiente = []
+        self.n_pendiente = 0
+        self.grupos = []
+        self.filas = 0
+
+    def agregar(self, df):
+        self.pendiente.append(df)
+        self.n_pendiente += len(df)
+        while self.n_pendiente >= FILAS_POR_GRUPO:
+            todo = pd.concat(self.pendiente)
+            self._escribir_grupo(todo.iloc[:FILAS_POR_GRUPO])
+            resto = todo.iloc[FILAS_POR_GRUPO:]
+            self.pendiente, self.n_pendiente = [resto], len(resto)
+
+    def _escribir_grupo(self, df):
+        if df.empty:
+            return
+        inicio = self.f.tell()
+        self.f.write(df.drop(columns=_F).to_csv(index=False, header=False).encode('utf-8'))
+        fechas = df[_F].dropna()
+        self.grupos.append({
+            'byte_inicio': inicio,
+            'byte_fin': self.f.tell(),
+            'fila_inicio': self.filas,
+            'filas': len(df),
+            'fecha_min': fechas.min().isoformat() if len(fechas) else None,
+            'fecha_max': fechas.max().isoformat() if len(fechas) else None,
+        })
+        self.filas += len(df)
+
+    def cerrar(self):
+        if self.pendiente:
+            self._escribir_grupo(pd.concat(self.pendiente))
+        self.f.close()
+        os.replace(self.tmp, self.ruta)
+        indice = {
+            'columna': COLUMNA_ORDEN,
+            'filas': self.filas,
+            'bytes': os.path.getsize(self.ruta),
+            'grupos': self.grupos,
+        }
+        tmp = ruta_indice(self.ruta) + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as fh:
+            json.dump(indice, fh)
+        os.replace(tmp, ruta_indice(self.ruta))
+        return indice
+
+
+def fusionar_ordenado(rutas, ruta_salida):
+    """Mezcla shards ordenados por FECHA en un solo CSV ordenado más su índice de grupos."""
+    columnas = []
+    for r in rutas:
+        for c in pd.read_csv(r, nrows=0).columns:
+            if c not in columnas:
+                columnas.append(c)
+
+    shards = [_Shard(r, columnas) for r in rutas]
+    escritor = _EscritorIndexado(ruta_salida, columnas)
+
+    activos = {}
+    for i, s in enumerate(shards):
+        bloque = s.siguiente()
+        if bloque is not None:
+            activos[i] = bloque
+
+    while activos:
+        # Nada que falte por leer puede ser anterior a la menor de las últimas fechas en
+        # memoria. Las filas de esa misma fecha esperan: el siguiente bloque de la tienda
+        # puede traer más de ese día y deben salir antes que las de las tiendas siguientes.
+        ultimas = [b[_F].iloc[-1] for i, b in activos.items() if not shards[i].agotado]
+        limite = min(ultimas) if ultimas else None
+        listos = []
+        for i in list(activos):
+            b = activos[i]
+            n = len(b) if limite is None else b[_F].searchsorted(limite, side='left')
+            listos.append(b.iloc[:n])
+            resto = b.iloc[n:]
+            if not shards[i].agotado and (resto.empty or resto[_F].iloc[-1] == limite):
+                siguiente = shards[i].siguiente()
+                if siguiente is not None:
+                    resto = pd.concat([resto, siguiente])
+            if resto.empty:
+                del activos[i]
+            else:
+                activos[i] = resto
+        # Estable: a igual fecha se respeta el orden de tienda y, dentro de ella, la hora
+        escritor.agregar(pd.concat(listos).sort_values(_F, kind='stable'))
+
+    for s in shards:
+        for b in s.sin_fecha:
+            escritor.agregar(b)
+    return escritor.cerrar()
+
+
+def leer_indice(ruta):
+    """Índice del CSV, o None si no existe o no corresponde a la versión actual del archivo."""
+    ri = ruta_indice(ruta)
+    if not (os.path.exists(ruta) and os.path.exists(ri)):
+        return None
+    with open(ri, encoding='utf-8') as fh:
+        indice = json.load(fh)
+    return indice if indice.get('bytes') == os.path.getsize(ruta) else None
+
+
+def leer_rango(ruta, desde=None, hasta=None, **kwargs):
+    """
+    Como pd.read_csv(ruta, **kwargs) filtrado a desde <= FECHA <= hasta. Con índice
+    sólo se leen los grupos que pueden tener esas fechas; sin índice se lee todo.
+    """
+    kwargs.setdefault('parse_dates', [COLUMNA_ORDEN])
+    indice = leer_indice(ruta)
+    desde = pd.Timestamp(desde) if desde is not None else None
+    hasta = pd.Timestamp(hasta) if hasta is not None else None
+
+    if indice is None or not indice['grupos']:
+        df = pd.read_csv(ruta, **kwargs)
+    else:
+        grupos = [
+            g for g in indice['grupos']
+            if g['fecha_min'] is not None
+            and (desde is None or pd.Timestamp(g['fecha_max']) >= desde)
+            and (hasta is None or pd.Timestamp(g['fecha_min']) <= hasta)
+        ]
+        with open(ruta, 'rb') as f:
+            encabezado = f.readline()
+            if not grupos:
+                datos = b''
+            else:
+                # Los grupos son consecutivos en el archivo: una sola lectura
+                f.seek(grupos[0]['byte_inicio'])
+                datos = f.read(grupos[-1]['byte_fin'] - grupos[0]['byte_inicio'])
+        df = pd.read_csv(io.BytesIO(encabezado + datos), **kwargs)
+
+    # Los grupos de los extremos traen fechas de más
+    fechas = pd.to_datetime(df[COLUMNA_ORDEN], errors='coerce')
+    mascara = pd.Series(True, index=df.index)
+    if desde is not None:
+        mascara &= fechas >= desde
+    if hasta is not None:
+        mascara &= fechas <= hasta
+    return df[mascara]
@@ -0,0 +1,144 @@
+import importlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import urllib.request
+
+# --- ARRANQUE RÁPIDO DEL DASHBOARD ---
+# Uso: python startup.py [--port 8501]
+# 1. Precarga los reportes en el cache del proceso (data_store) ANTES de abrir el puerto.
+# 2. Levanta Streamlit en este mismo proceso, así Dashboard.py encuentra los datos ya cargados.
+# 3. Cuando el servidor responde /_stcore/health escribe dashboard_listo.json; el .bat espera
+#    ese archivo en lugar de dormir un tiempo fijo. Si no responde a tiempo el archivo se
+#    escribe igual con "listo": false. Un reporte que no carga no detiene el arranque: queda
+#    en "errores_precarga" y el dashboard lo muestra.
+# 4. Importa plotly en segundo plano; Dashboard.py lo usa a través de ModuloDiferido.
+
+INICIO_PROCESO = time.time()
+
+ARCHIVO_LISTO = "dashboard_listo.json"
+LOG_FILE = "ejecucion_log.txt"
+REPORTES = ["Reporte_Ventas_Historico.csv", "Reporte_Cortes_Detallado.csv", "Reporte_Facturas_Detallado.csv"]
+MODULOS_GRAFICAS = ["plotly.express", "plotly.graph_objects"]
+
+_estado = {"primer_render_registrado": False}
+
+
+def _logger():
+    logger = logging.getLogger("dashboard")
+    if not logger.handlers:
+        handler = logging.FileHandler(os.path.join(os.getcwd(), LOG_FILE), encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+    return logger
+
+
+class ModuloDiferido:
+    """Importa el módulo real hasta el primer acceso a un atributo (ej. px.bar)."""
+
+    def __init__(self, nombre):
+        self._nombre = nombre
+        self._modulo = None
+
+    def __getattr__(self, attr):
+        if self._modulo is None:
+            self._modulo = importlib.import_module(self._nombre)
+        return getattr(self._modulo, attr)
+
+
+def _escribir_listo(datos):
+    tmp = ARCHIVO_LISTO + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(datos, f, indent=2)
+    os.replace(tmp, ARCHIVO_LISTO)
+
+
+def registrar_render(inicio_script):
+    """
+    Llamar al final de Dashboard.py. Registra el primer render completo de cada sesión
+    y, la primera vez en el proceso, el tiempo desde el arranque hasta ese primer render.
+    """
+    import streamlit as st
+
+    if st.session_state.get("_render_registrado"):
+        return
+    st.session_state["_render_registrado"] = True
+
+    script_s = time.perf_counter() - inicio_script
+    logger = _logger()
+    logger.info(f"Dashboard: primer render de sesión en {script_s:.2f} s")
+
+    if not _estado["primer_render_registrado"]:
+        _estado["primer_render_registrado"] = True
+        desde_arranque = time.time() - INICIO_PROCESO
+        logger.info(f"Dashboard: primer render del proceso a {desde_arranque:.1f} s del arranque")
+        if os.path.exists(ARCHIVO_LISTO):
+            with open(ARCHIVO_LISTO, encoding="utf-8") as f:
+                datos = json.load(f)
+            datos.update({"primer_render_s": round(desde_arranque, 2), "primer_render_script_s": round(script_s, 2)})
+            _escribir_listo(datos)
+
+
+def _esperar_servidor(puerto, tiempos, limite_s=120):
+    url = f"http://localhost:{puerto}/_stcore/health"
+    while time.time() - INICIO_PROCESO < limite_s:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as r:
+                if r.status == 200:
+                    break
+        except OSError:
+            pass
+        time.sleep(0.2)
+    else:
+        _logger().error(f"Dashboard: el servidor no respondió en {limite_s} s")
+        _escribir_listo({"listo": False, "pid": os.getpid(), "puerto": puerto,
+                         "error": f"el servidor no respondió en {limite_s} s", **tiempos})
+        return
+
+    tiempos["servidor_s"] = round(time.time() - INICIO_PROCESO, 2)
+    _escribir_listo({"listo": True, "pid": os.getpid(), "puerto": puerto, **tiempos})
+    _logger().info(f"Dashboard listo en el puerto {puerto}: {tiempos}")
+
+    # Las librerías de gráficas se importan ya con el servidor arriba
+    for nombre in MODULOS_GRAFICAS:
+        importlib.import_module(nombre)
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Arranque del dashboard con precarga de datos")
+    parser.add_argument("--port", type=int, default=8501)
+    args = parser.parse_args()
+
+    # Dashboard.py hace `import startup`: que reciba este mismo módulo (mismo INICIO_PROCESO)
+    sys.modules.setdefault("startup", sys.modules[__name__])
+
+    if os.path.exists(ARCHIVO_LISTO):
+        os.remove(ARCHIVO_LISTO)
+
+    # 1. Precarga (pandas se importa aquí, no en el primer visitante)
+    import data_store
+    inicio = time.time()
+    filas, errores = data_store.precalentar([os.path.join(os.getcwd(), r) for r in REPORTES])
+    tiempos = {"precarga_s": round(time.time() - inicio, 2)}
+    _logger().info(f"Dashboard: precarga de datos en {tiempos['precarga_s']} s ({filas})")
+    if errores:
+        _logger().error(f"Dashboard: reportes que no se pudieron precargar: {errores}")
+        tiempos["errores_precarga"] = {os.path.basename(r): e for r, e in errores.items()}
+
+    # 2. Señal de listo en segundo plano
+    threading.Thread(target=_esperar_servidor, args=(args.port, tiempos), daemon=True).start()
+
+    # 3. Streamlit en este mismo proceso
+    from streamlit.web import cli as stcli
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Dashboard.py")
+    sys.argv = ["streamlit", "run", script, "--server.port", str(args.port), "--server.headless", "true"]
+    sys.exit(stcli.main())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import anomalies
+from anomalies import (evaluar, detectar_anomalias, CLAVES, COLS_HISTORIA, SEMANAS_BASE, MIN_SEMANAS,
+                       UMBRAL_DESVIACION, ESCALA_REL_MIN, ESCALA_ABS_MIN)
+
+INICIO = pd.Timestamp('2025-01-06')
+
+
+def _largo(dias, semilla=0):
+    # Formato de historia: algunas series con huecos y días atípicos inyectados
+    rng = np.random.default_rng(semilla)
+    filas = []
+    for suc in ['Tienda 1', 'Tienda 2']:
+        for cajero in ['Todos', 'Cajero 1']:
+            for metrica, base in (('VENTAS', 20000.0), ('TICKETS', 150.0), ('DIFERENCIA', 0.0)):
+                for d in range(dias):
+                    if rng.random() < 0.1:
+                        continue
+                    valor = base * (1 + 0.1 * (d % 7)) + rng.normal(0, max(base * 0.05, 20))
+                    if rng.random() < 0.05:
+                        valor *= rng.choice([0.2, 3.0]) if base else 0
+                        valor += rng.choice([-1, 1]) * 2000 * (not base)
+                    filas.append((INICIO + pd.Timedelta(days=d), 'Cajero' if cajero != 'Todos' else 'Sucursal',
+                                  suc, cajero, metrica, valor))
+    return pd.DataFrame(filas, columns=COLS_HISTORIA)
+
+
+def _evaluar_fuerza_bruta(historia, nuevos):
+    datos = pd.concat([historia, nuevos], ignore_index=True)
+    valores = {(r.FECHA, *[getattr(r, c) for c in CLAVES]): r.VALOR for r in datos.itertuples()}
+    res = {}
+    for r in nuevos.itertuples():
+        claves = tuple(getattr(r, c) for c in CLAVES)
+        refs = np.array([valores.get((r.FECHA - pd.Timedelta(weeks=k), *claves), np.nan)
+                         for k in range(1, SEMANAS_BASE + 1)])
+        refs = refs[~np.isnan(refs)]
+        if len(refs) < MIN_SEMANAS:
+            continue
+        esperado = np.median(refs)
+        mad = np.median(np.abs(refs - esperado))
+        escala = max(1.4826 * mad, ESCALA_REL_MIN * abs(esperado), ESCALA_ABS_MIN[r.METRICA])
+        desviacion = (r.VALOR - esperado) / escala
+        if abs(desviacion) >= UMBRAL_DESVIACION:
+            res[(r.FECHA, *claves)] = (esperado, round(desviacion, 2))
+    return res
+
+
+@pytest.mark.parametrize("dias_historia", [0, 40, 90])
+def test_evaluar_igual_a_fuerza_bruta(dias_historia):
+    datos = _largo(120)
+    corte = INICIO + pd.Timedelta(days=dias_historia)
+    historia, nuevos = datos[datos['FECHA'] < corte], datos[datos['FECHA'] >= corte]
+
+    res = evaluar(historia, nuevos)
+    obtenido = {(r.FECHA, *[getattr(r, c) for c in CLAVES]): (r.ESPERADO, r.DESVIACION) for r in res.itertuples()}
+    esperado = _evaluar_fuerza_bruta(historia, nuevos)
+
+    assert obtenido.keys() == esperado.keys()
+    assert len(esperado) > 0
+    for k, (esp, desv) in esperado.items():
+        assert obtenido[k][0] == pytest.approx(esp)
+        assert obtenido[k][1] == pytest.approx(desv, abs=0.011)
+    assert set(res['DIRECCION']) <= {'Alta', 'Baja'}
+    assert ((res['DIRECCION'] == 'Alta') == (res['DESVIACION'] > 0)).all()
+
+
+def _reportes(dias, semilla=1):
+    rng = np.random.default_rng(semilla)
+    fechas = pd.date_range(INICIO, periods=dias, freq='D')
+    n = dias * 4
+    venta = rng.gamma(20, 500, n) * np.where(rng.random(n) < 0.03, 4, 1)
+    cortes = pd.DataFrame({
+        'SUCURSAL': np.tile(['Tienda 1', 'Tienda 1', 'Tienda 2', 'Tienda 2'], dias),
+        'CAJERO': np.tile(['Cajero 1', 'Cajero 2', 'Cajero 1', 'Cajero 3'], dias),
+        'FECHA': np.repeat(fechas, 4),
+        'VENTAS_TOTALES_NETAS': venta.round(2),
+        'DIFERENCIA': np.where(rng.random(n) < 0.03, 900, rng.normal(0, 10, n)).round(2),
+    })
+    m = dias * 60
+    ventas = pd.DataFrame({
+        'SUCURSAL': rng.choice(['Tienda 1', 'Tienda 2'], m),
+        'CAJERO': rng.choice(['Cajero 1', 'Cajero 2', 'Cajero 3'], m),
+        'FECHA': np.sort(rng.choice(fechas, m)),
+        'FOLIO': rng.integers(1, 40, m).astype(str),
+        'TIPO_MOV': np.where(rng.random(m) < 0.05, 'DEVOLUCION', 'VENTA'),
+    })
+    return cortes, ventas
+
+
+def _leer_anomalias(carpeta):
+    df = pd.read_csv(carpeta / anomalies.ARCHIVO_ANOMALIAS, parse_dates=['FECHA'])
+    return df.sort_values(['FECHA'] + CLAVES).reset_index(drop=True)
+
+
+def test_incremental_igual_a_completo(tmp_path):
+    cortes, ventas = _reportes(150)
+    rc, rv = tmp_path / "cortes.csv", tmp_path / "ventas.csv"
+
+    # Corridas con el reporte creciendo; la de ventas va un día atrás de la de cortes
+    inc = tmp_path / "incremental"
+    for dias in [30, 64, 65, 100, 131, 150]:
+        fin = INICIO + pd.Timedelta(days=dias)
+        cortes[cortes['FECHA'] < fin].to_csv(rc, index=False)
+        ventas[ventas['FECHA'] < fin - pd.Timedelta(days=1)].to_csv(rv, index=False)
+        detectar_anomalias(str(rc), str(rv), str(inc))
+
+    completo = tmp_path / "completo"
+    detectar_anomalias(str(rc), str(rv), str(completo))
+
+    a, b = _leer_anomalias(inc), _leer_anomalias(completo)
+    assert len(b) > 0
+    pd.testing.assert_frame_equal(a, b)
+    # El último día de cada reporte sigue abierto: no se evalúa
+    assert a['FECHA'].max() < cortes['FECHA'].max()
@@ -0,0 +1,62 @@
+from collections import Counter
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from basket import pares_frecuentes
+
+
+def _ventas(n=3000, semilla=3):
+    rng = np.random.default_rng(semilla)
+    return pd.DataFrame({
+        'SUCURSAL': rng.choice(['Tienda 1', 'Tienda 2'], n),
+        'FOLIO': rng.integers(1, 400, n).astype(str),     # Folios repetidos entre tiendas
+        'CLAVE': rng.choice([f"SKU{i}" for i in range(25)], n, p=np.linspace(2, 0.1, 25) / np.linspace(2, 0.1, 25).sum()),
+        'TIPO_MOV': rng.choice(['VENTA', 'venta', 'DEVOLUCION'], n, p=[0.6, 0.3, 0.1]),
+    })
+
+
+def _pares_fuerza_bruta(df, min_par, min_sku):
+    ventas = df[df['TIPO_MOV'].str.upper() == 'VENTA']
+    tickets = ventas.groupby(['SUCURSAL', 'FOLIO'])['CLAVE'].agg(set)
+    cuenta_sku = Counter(sku for t in tickets for sku in t)
+    frecuentes = {s for s, c in cuenta_sku.items() if c >= min_sku}
+    pares = Counter(frozenset(p) for t in tickets for p in combinations(sorted(t & frecuentes), 2))
+    return {p: c for p, c in pares.items() if c >= min_par}, cuenta_sku, len(tickets)
+
+
+@pytest.mark.parametrize("min_par,min_sku", [(5, 5), (1, 1), (20, 60)])
+def test_pares_igual_a_fuerza_bruta(min_par, min_sku):
+    df = _ventas()
+    res = pares_frecuentes(df, min_par, min_sku)
+    esperado, cuenta_sku, n_tickets = _pares_fuerza_bruta(df, min_par, min_sku)
+
+    obtenido = {frozenset((a, b)): c for a, b, c in zip(res['CLAVE_A'], res['CLAVE_B'], res['TICKETS_JUNTOS'])}
+    assert obtenido == esperado
+    assert len(res) == len(esperado)      # Cada par una sola vez
+
+    for fila in res.itertuples():
+        ca, cb = cuenta_sku[fila.CLAVE_A], cuenta_sku[fila.CLAVE_B]
+        assert fila.SOPORTE == pytest.approx(fila.TICKETS_JUNTOS / n_tickets)
+        assert fila.CONFIANZA_A_B == pytest.approx(fila.TICKETS_JUNTOS / ca)
+        assert fila.CONFIANZA_B_A == pytest.approx(fila.TICKETS_JUNTOS / cb)
+        assert fila.LIFT == pytest.approx(fila.TICKETS_JUNTOS * n_tickets / (ca * cb))
+    assert res['LIFT'].is_monotonic_decreasing
+
+
+def test_renglones_repetidos_cuentan_una_vez():
+    df = pd.DataFrame({
+        'SUCURSAL': ['T'] * 6,
+        'FOLIO': ['1', '1', '1', '2', '2', '3'],
+        'CLAVE': ['A', 'A', 'B', 'A', 'B', 'A'],
+        'TIPO_MOV': ['VENTA'] * 6,
+    })
+    res = pares_frecuentes(df, 1, 1)
+    assert res[['TICKETS_JUNTOS', 'SOPORTE']].values.tolist() == [[2, 2 / 3]]
+
+
+def test_vacio():
+    vacio = pd.DataFrame(columns=['SUCURSAL', 'FOLIO', 'CLAVE', 'TIPO_MOV'])
+    assert pares_frecuentes(vacio).empty
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from comparisons import COMPARACIONES, diario_cortes, diario_ventas, serie_diaria, comparar, serie_comparada
+
+TIENDAS = ['Tienda 1', 'Tienda 2']
+
+
+@pytest.fixture(scope='module')
+def datos():
+    rng = np.random.default_rng(3)
+    # Con huecos: días sin cortes ni ventas
+    fechas = pd.date_range('2023-01-01', '2024-12-31')
+    fechas = fechas[rng.random(len(fechas)) < 0.8]
+    nc, nv = 1500, 6000
+    cortes = pd.DataFrame({
+        'SUCURSAL': rng.choice(TIENDAS, nc),
+        'FECHA': rng.choice(fechas, nc),
+        'VENTAS_TOTALES_NETAS': np.round(rng.uniform(500, 5000, nc), 2),
+    })
+    ventas = pd.DataFrame({
+        'SUCURSAL': rng.choice(TIENDAS, nv),
+        'LINEA': rng.choice(['Linea 1', 'Linea 2', 'Linea 3'], nv),
+        'FECHA': rng.choice(fechas, nv),
+        'TIPO_MOV': np.where(rng.random(nv) < 0.1, 'DEVOLUCION', 'VENTA'),
+        'FOLIO': [f"F{i}" for i in rng.integers(0, 2500, nv)],
+        'IMPORTE_REAL': np.round(rng.uniform(10, 300, nv), 2),
+    })
+    ventas['IMPORTE_REAL'] = ventas['IMPORTE_REAL'].where(ventas['TIPO_MOV'] == 'VENTA', -ventas['IMPORTE_REAL'])
+    return cortes, ventas
+
+
+def _fuerza_bruta(cortes, ventas, inicio, fin, sucursal, linea):
+    c = cortes[(cortes['FECHA'] >= inicio) & (cortes['FECHA'] <= fin)]
+    v = ventas[(ventas['FECHA'] >= inicio) & (ventas['FECHA'] <= fin)]
+    if sucursal != "Todos":
+        c, v = c[c['SUCURSAL'] == sucursal], v[v['SUCURSAL'] == sucursal]
+    if linea != "Todas":
+        v = v[v['LINEA'] == linea]
+    tickets = sum(g.loc[g['TIPO_MOV'] == 'VENTA', 'FOLIO'].nunique() for _, g in v.groupby(['SUCURSAL', 'FECHA']))
+    return {
+        'VENTA_NETA': c['VENTAS_TOTALES_NETAS'].sum(),
+        'DIAS': c['FECHA'].nunique(),
+        'TICKETS': tickets,
+        'DEVOLUCIONES': v.loc[v['TIPO_MOV'] == 'DEVOLUCION', 'IMPORTE_REAL'].abs().sum(),
+    }
+
+
+@pytest.mark.parametrize('sucursal,linea', [("Todos", "Todas"), ("Tienda 2", "Todas"), ("Tienda 1", "Linea 3")])
+def test_comparar_contra_fuerza_bruta(datos, sucursal, linea):
+    cortes, ventas = datos
+    serie = serie_diaria(diario_cortes(cortes), diario_ventas(ventas), sucursal, linea)
+
+    rng = np.random.default_rng(11)
+    for _ in range(10):
+        inicio = pd.Timestamp('2024-01-01') + pd.Timedelta(days=int(rng.integers(0, 300)))
+        fin = inicio + pd.Timedelta(days=int(rng.integers(0, 60)))
+        res = comparar(serie, inicio, fin, list(COMPARACIONES))
+
+        periodos = {
+            "Actual": (inicio, fin),
+            "Año anterior": (inicio - pd.DateOffset(years=1), fin - pd.DateOffset(years=1)),
+            "Año anterior (mismo día de semana)": (inicio - pd.Timedelta(days=364), fin - pd.Timedelta(days=364)),
+            "Periodo anterior": (inicio - (fin - inicio) - pd.Timedelta(days=1), inicio - pd.Timedelta(days=1)),
+        }
+        for nombre, (a, b) in periodos.items():
+            esperado = _fuerza_bruta(cortes, ventas, a, b, sucursal, linea)
+            for metrica, valor in esperado.items():
+                assert res.loc[nombre, metrica] == pytest.approx(valor), (nombre, metrica, a, b)
+
+
+def test_rango_fuera_de_la_serie(datos):
+    cortes, ventas = datos
+    serie = serie_diaria(diario_cortes(cortes), diario_ventas(ventas))
+    res = comparar(serie, '2030-01-01', '2030-01-31', ["Año anterior"])
+    assert (res.loc["Actual", ['VENTA_NETA', 'TICKETS']] == 0).all()
+    assert res.loc["Actual", 'TICKET_PROM'] == 0
+
+
+def test_serie_comparada_alinea_la_referencia(datos):
+    cortes, ventas = datos
+    serie = serie_diaria(diario_cortes(cortes), diario_ventas(ventas))
+    df = serie_comparada(serie, '2024-03-01', '2024-03-31', "Año anterior (mismo día de semana)", 'D')
+
+    c = cortes.groupby('FECHA')['VENTAS_TOTALES_NETAS'].sum()
+    # Los días vacíos de las orillas se recortan: quedan como NaN en la otra serie
+    for r in df.fillna(0).itertuples():
+        assert r.VENTAS_ACT == pytest.approx(c.get(r.FECHA, 0.0))
+        assert r.VENTAS_REF == pytest.approx(c.get(r.FECHA - pd.Timedelta(days=364), 0.0))
@@ -0,0 +1,134 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import customer_rfm
+from customer_rfm import actualizar_rfm, ARCHIVO_CLIENTES
+
+
+def _ventas(n, rng, fechas):
+    return pd.DataFrame({
+        'CLIENTE': rng.choice([f"Cliente {i}" for i in range(25)] + ['PUBLICO EN GENERAL'], n),
+        'SUCURSAL': rng.choice(['Tienda 1', 'Tienda 2'], n),
+        'FECHA': rng.choice(fechas, n),
+        'FOLIO': [f"F{i}" for i in rng.integers(0, n // 2, n)],
+        'TIPO_MOV': np.where(rng.random(n) < 0.1, 'DEVOLUCION', 'VENTA'),
+        'IMPORTE_REAL': np.round(rng.uniform(10, 500, n), 2),
+    })
+
+
+def _facturas(n, rng, fechas):
+    return pd.DataFrame({
+        'CLIENTE': rng.choice([f"Cliente {i}" for i in range(25)], n),
+        'SUCURSAL': rng.choice(['Tienda 1', 'Tienda 2'], n),
+        'FECHA': rng.choice(fechas, n),
+        'FOLIO_INTERNO': [f"Fact {i}" for i in range(n)],
+        'ESTATUS': np.where(rng.random(n) < 0.1, 'CANCELADA', 'VIGENTE'),
+        'TOTAL_FACTURA': np.round(rng.uniform(100, 2000, n), 2),
+    })
+
+
+def _escribir(carpeta, ventas, facturas):
+    rv, rf = os.path.join(carpeta, 'ventas.csv'), os.path.join(carpeta, 'facturas.csv')
+    ventas.sort_values('FECHA').to_csv(rv, index=False)
+    facturas.sort_values('FECHA').to_csv(rf, index=False)
+    return rv, rf
+
+
+def _clientes(carpeta):
+    df = pd.read_csv(os.path.join(carpeta, ARCHIVO_CLIENTES), parse_dates=['PRIMERA_COMPRA', 'ULTIMA_COMPRA'])
+    return df.sort_values('CLIENTE').reset_index(drop=True)
+
+
+def _fuerza_bruta(ventas, facturas):
+    """Renglón por renglón: {cliente: (primera, última, frecuencia, monto)}."""
+    dias = {}  # (cliente, sucursal, fecha) -> [folios de venta, monto, tiene_ventas]
+    for r in ventas.itertuples():
+        if r.CLIENTE.upper() in customer_rfm.CLIENTES_GENERICOS:
+            continue
+        d = dias.setdefault((r.CLIENTE, r.SUCURSAL, r.FECHA), [set(), 0.0, True])
+        if r.TIPO_MOV == 'VENTA':
+            d[0].add(r.FOLIO)
+        d[1] += r.IMPORTE_REAL
+    for r in facturas.itertuples():
+        clave = (r.CLIENTE, r.SUCURSAL, r.FECHA)
+        if r.ESTATUS == 'CANCELADA' or (clave in dias and dias[clave][2]):
+            continue  # El día ya tiene tickets: la factura no se vuelve a contar
+        d = dias.setdefault(clave, [set(), 0.0, False])
+        d[0].add(r.FOLIO_INTERNO)
+        d[1] += r.TOTAL_FACTURA
+
+    res = {}
+    for (cliente, _, fecha), (folios, monto, _) in dias.items():
+        p, u, f, m = res.get(cliente, (None, None, 0, 0.0))
+        if folios:
+            p = fecha if p is None else min(p, fecha)
+            u = fecha if u is None else max(u, fecha)
+        res[cliente] = (p, u, f + len(folios), m + monto)
+    return {c: v for c, v in res.items() if v[1] is not None}
+
+
+@pytest.fixture
+def datos():
+    rng = np.random.default_rng(7)
+    fechas = pd.date_range('2024-01-01', '2024-03-31').strftime('%Y-%m-%d').to_numpy()
+    return _ventas(3000, rng, fechas), _facturas(300, rng, fechas)
+
+
+def test_completo_contra_fuerza_bruta(tmp_path, datos):
+    ventas, facturas = datos
+    rv, rf = _escribir(tmp_path, ventas, facturas)
+    actualizar_rfm(rv, rf, str(tmp_path / 'salida'))
+
+    obtenido = _clientes(tmp_path / 'salida')
+    esperado = _fuerza_bruta(ventas, facturas)
+    assert set(obtenido['CLIENTE']) == set(esperado)
+    for r in obtenido.itertuples():
+        p, u, f, m = esperado[r.CLIENTE]
+        assert (r.PRIMERA_COMPRA, r.ULTIMA_COMPRA) == (pd.Timestamp(p), pd.Timestamp(u))
+        assert r.FRECUENCIA == f
+        assert r.MONETARIO == pytest.approx(m)
+
+
+def test_incremental_igual_a_completo(tmp_path, datos):
+    ventas, facturas = datos
+    carpeta_inc, salida_inc = tmp_path / 'inc', str(tmp_path / 'inc' / 'salida')
+    os.makedirs(carpeta_inc)
+
+    # Corridas sucesivas con el histórico creciendo; en cada una llegan renglones tarde
+    # (dentro de la ventana de reproceso) para días que ya se habían visto
+    cortes = ['2024-01-20', '2024-02-10', '2024-02-11', '2024-03-05', '2024-03-31']
+    for i, hasta in enumerate(cortes):
+        limite = pd.Timestamp(hasta) - pd.Timedelta(days=customer_rfm.DIAS_REPROCESO - 1)
+        v = ventas[ventas['FECHA'] <= hasta]
+        tarde = (pd.to_datetime(v['FECHA']) >= limite) & (v.index % 3 == 0)
+        if i < len(cortes) - 1:
+            v = v[~tarde]  # Estos renglones aparecen hasta la corrida siguiente
+        rv, rf = _escribir(carpeta_inc, v, facturas[facturas['FECHA'] <= hasta])
+        actualizar_rfm(rv, rf, salida_inc)
+
+    rv, rf = _escribir(tmp_path, ventas, facturas)
+    actualizar_rfm(rv, rf, str(tmp_path / 'completo'))
+
+    pd.testing.assert_frame_equal(_clientes(salida_inc), _clientes(tmp_path / 'completo'), check_exact=False)
+
+
+def test_devolucion_no_mueve_recencia(tmp_path):
+    ventas = pd.DataFrame({
+        'CLIENTE': ['Cliente A', 'Cliente A', 'Cliente B'],
+        'SUCURSAL': ['Tienda 1'] * 3,
+        'FECHA': ['2024-01-05', '2024-02-20', '2024-02-20'],
+        'FOLIO': ['F1', 'F2', 'F3'],
+        'TIPO_MOV': ['VENTA', 'DEVOLUCION', 'DEVOLUCION'],
+        'IMPORTE_REAL': [300.0, -100.0, -50.0],
+    })
+    facturas = pd.DataFrame(columns=['CLIENTE', 'SUCURSAL', 'FECHA', 'FOLIO_INTERNO', 'ESTATUS', 'TOTAL_FACTURA'])
+    rv, rf = _escribir(tmp_path, ventas, facturas)
+    actualizar_rfm(rv, rf, str(tmp_path / 'salida'))
+
+    c = _clientes(tmp_path / 'salida')
+    assert list(c['CLIENTE']) == ['Cliente A']  # B sólo devolvió: no es cliente activo
+    assert c.loc[0, 'ULTIMA_COMPRA'] == pd.Timestamp('2024-01-05')
+    assert c.loc[0, 'MONETARIO'] == pytest.approx(200.0)
@@ -0,0 +1,107 @@
+import os
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_store
+from data_store import cargar_con_version, filtrar_fechas, precalentar
+from snapshot import publicar_snapshot
+
+
+@pytest.fixture(autouse=True)
+def cache_vacio(monkeypatch):
+    monkeypatch.setattr(data_store, '_CACHE', {})
+
+
+def _consolidado(n, semilla=0):
+    # Forma de lo que escribe la etapa limpiar: FECHA + FECHA_STR, ya ordenado
+    rng = np.random.default_rng(semilla)
+    fecha = pd.Timestamp('2025-01-01') + pd.to_timedelta(np.sort(rng.integers(0, 90, n)), unit='D')
+    return pd.DataFrame({
+        'FECHA': fecha,
+        'FECHA_STR': fecha.strftime('%Y-%m-%d'),
+        'SUCURSAL': rng.choice(['Tienda 1', 'Tienda 2'], n),
+        'IMPORTE_REAL': rng.uniform(0, 100, n).round(2),
+    })
+
+
+def test_filtrar_fechas_igual_a_mascara():
+    rng = np.random.default_rng(1)
+    ordenado = _consolidado(2000)
+    desordenado = ordenado.sample(frac=1, random_state=1)
+    for _ in range(20):
+        a, b = sorted(rng.integers(-5, 95, 2))
+        inicio = (pd.Timestamp('2025-01-01') + pd.Timedelta(days=int(a))).date()
+        fin = (pd.Timestamp('2025-01-01') + pd.Timedelta(days=int(b))).date()
+        for df in (ordenado, desordenado):
+            fechas = df['FECHA'].dt.date
+            esperado = df[(fechas >= inicio) & (fechas <= fin)]
+            pd.testing.assert_frame_equal(filtrar_fechas(df, inicio, fin), esperado)
+
+
+def test_cargar_con_version_recarga_al_cambiar_mtime(tmp_path):
+    ruta = str(tmp_path / "Reporte_Ventas_Consolidado.csv")
+    assert cargar_con_version(ruta) == (None, None)
+
+    _consolidado(50).to_csv(ruta, index=False)
+    df1, v1 = cargar_con_version(ruta)
+    df1b, v1b = cargar_con_version(ruta)
+    assert df1b is df1 and v1b == v1          # Misma versión: el mismo objeto, sin re-leer
+
+    # Mismo número de filas, contenido distinto, mtime posterior
+    _consolidado(50, semilla=9).to_csv(ruta, index=False)
+    os.utime(ruta, (v1 + 10, v1 + 10))
+    df2, v2 = cargar_con_version(ruta)
+    assert v2 != v1 and df2 is not df1
+    pd.testing.assert_frame_equal(df2, pd.read_csv(ruta, parse_dates=['FECHA']))
+
+
+def test_snapshot_tiene_prioridad_sobre_csv(tmp_path):
+    ruta = str(tmp_path / "Reporte_Ventas_Consolidado.csv")
+    _consolidado(80).to_csv(ruta, index=False)
+    dir_snapshot = str(tmp_path / data_store.DIR_SNAPSHOT)
+    publicar_snapshot({'ventas': ruta}, dir_snapshot)
+
+    df, version = cargar_con_version(ruta)
+    assert version.startswith(dir_snapshot) and version.endswith('.arrow')
+    esperado = pd.read_csv(ruta, parse_dates=['FECHA'])
+    assert len(df) == len(esperado)
+    assert df['IMPORTE_REAL'].to_numpy() == pytest.approx(esperado['IMPORTE_REAL'].to_numpy())
+    assert (df['FECHA'].to_numpy() == esperado['FECHA'].to_numpy()).all()
+    assert filtrar_fechas(df, date(2025, 2, 1), date(2025, 2, 28))['FECHA'].dt.month.eq(2).all()
+
+
+def test_snapshot_viejo_no_tapa_un_csv_nuevo(tmp_path):
+    ruta = str(tmp_path / "Reporte_Ventas_Consolidado.csv")
+    _consolidado(80).to_csv(ruta, index=False)
+    publicar_snapshot({'ventas': ruta}, str(tmp_path / data_store.DIR_SNAPSHOT))
+    assert cargar_con_version(ruta)[1].endswith('.arrow')
+
+    # El pipeline reescribió el consolidado pero la publicación del snapshot no corrió
+    _consolidado(120, semilla=4).to_csv(ruta, index=False)
+    df, version = cargar_con_version(ruta)
+    assert version == os.path.getmtime(ruta) and len(df) == 120
+
+    # Sin CSV (sólo snapshot) se sigue usando el snapshot
+    os.remove(ruta)
+    df, version = cargar_con_version(ruta)
+    assert version.endswith('.arrow') and len(df) == 80
+
+
+def test_precarga_no_se_detiene_por_un_reporte_invalido(tmp_path):
+    buena = str(tmp_path / "Reporte_Cortes_Detallado.csv")
+    _consolidado(30).to_csv(buena, index=False)
+    # Ventas sin pasar por el pipeline y con el esquema incompleto: validar lanza ValueError
+    mala = str(tmp_path / "Reporte_Ventas_Historico.csv")
+    pd.DataFrame({'SUCURSAL': ['T1'], 'FECHA': ['2025-01-01'], 'TIPO_MOV': ['VENTA']}).to_csv(mala, index=False)
+    falta = str(tmp_path / "no_existe.csv")
+
+    filas, errores = precalentar([mala, buena, falta])
+    assert filas == {mala: None, buena: 30, falta: None}
+    assert list(errores) == [mala] and "incompleto" in errores[mala]
+
+    # El error queda en cache con la versión del archivo: se repite sin re-leer
+    with pytest.raises(ValueError, match="incompleto"):
+        cargar_con_version(mala)
@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_cleaning import leer_limpio, limpiar_dataframe
+from data_validation import (validar, detectar_reporte, COLUMNA_MOTIVO, COLUMNA_ALERTA_DIFERENCIA,
+                             COLUMNA_ALERTA_RENGLONES, LIMITE_DIFERENCIA_CORTE)
+
+
+def _ventas_crudas():
+    # Texto como llega de la extracción; la columna MOTIVO es lo que se espera
+    filas = [
+        ("Tienda 1", "2025-06-01", "08:15 PM", "F1", "VENTA", "SKU1", "2", "$1,250.50", "0%", ""),
+        ("Tienda 1", "2025-06-01", "20:15:00", "F2", "DEVOLUCION", "SKU1", "1", "-10", "0", ""),
+        ("Tienda 1", "2025-06-01", "09:00", "F3", "venta", "SKU2", "1", "10", "15", ""),
+        ("Tienda 1", "2025-06-01", "09:00", "F4", "TRASPASO", "SKU2", "1", "10", "0", "TIPO_MOV desconocido"),
+        ("Tienda 1", "2025-06-01", "09:00", "F5", "VENTA", "SKU2", "0", "10", "0", "CANTIDAD en cero"),
+        ("Tienda 1", "2025-06-01", "09:00", "F6", "VENTA", "SKU2", "1", "-5", "0", "precio negativo en venta"),
+        ("Tienda 1", "2025-06-01", "25:00", "F7", "VENTA", "SKU2", "1", "10", "0", "HORA inválida"),
+        ("Tienda 1", "2025-06-01", "09:00", "F8", "VENTA", "SKU2", "1", "10", "150%", "descuento mayor a 100%"),
+        ("Tienda 1", "no es fecha", "09:00", "F9", "VENTA", "SKU2", "dos", "10", "0",
+         "FECHA inválida; CANTIDAD no numérico"),
+        ("", "2025-06-01", "09:00", "F10", "VENTA", " ", "1", "10", "0", "SUCURSAL vacío; CLAVE vacío"),
+    ]
+    columnas = ['SUCURSAL', 'FECHA', 'HORA', 'FOLIO', 'TIPO_MOV', 'CLAVE', 'CANTIDAD', 'PRECIO_UNITARIO_FINAL',
+                '%_DESCUENTO', 'MOTIVO']
+    return pd.DataFrame(filas, columns=columnas, dtype=object)
+
+
+def test_motivos_de_cuarentena():
+    crudo = _ventas_crudas()
+    validas, cuarentena, resumen = validar(crudo.drop(columns='MOTIVO'), 'ventas')
+
+    esperado = crudo.loc[crudo['MOTIVO'] != '', 'MOTIVO']
+    assert cuarentena[COLUMNA_MOTIVO].to_dict() == esperado.to_dict()
+    assert validas.index.tolist() == crudo.index[crudo['MOTIVO'] == ''].tolist()
+    assert resumen['filas'] == len(crudo)
+    assert (resumen['validas'], resumen['cuarentena']) == (len(validas), len(cuarentena))
+    assert resumen['motivos']['CANTIDAD en cero'] == 1 and resumen['motivos']['SUCURSAL vacío'] == 1
+
+    # La cuarentena conserva el texto original; las válidas salen con los numéricos convertidos
+    assert cuarentena.loc[8, 'CANTIDAD'] == "dos"
+    assert validas['CANTIDAD'].tolist() == [2, 1, 1]
+    assert validas['PRECIO_UNITARIO_FINAL'].tolist() == [1250.5, -10, 10]
+    assert validas['%_DESCUENTO'].tolist() == [0, 0, 15]
+    limpio = limpiar_dataframe(validas)
+    assert limpio['IMPORTE_REAL'].tolist() == [2501.0, -10.0, 10.0]
+
+
+def test_columna_faltante_invalida_el_lote():
+    with pytest.raises(ValueError, match="HORA"):
+        validar(_ventas_crudas().drop(columns=['MOTIVO', 'HORA']), 'ventas')
+
+
+def test_detectar_reporte():
+    assert detectar_reporte([' TIPO_MOV', 'FECHA']) == 'ventas'
+    assert detectar_reporte(['FOLIO_CORTE']) == 'cortes'
+    assert detectar_reporte(['FOLIO_INTERNO']) == 'facturas'
+    assert detectar_reporte(['FECHA', 'IMPORTE']) is None
+
+
+def test_corte_con_diferencia_absurda_conserva_sus_ventas():
+    rng = np.random.default_rng(0)
+    diferencia = rng.normal(0, 100, 50).round(2)
+    diferencia[[3, 17]] = [LIMITE_DIFERENCIA_CORTE + 1, -5e6]
+    cortes = pd.DataFrame({
+        'SUCURSAL': "Tienda 1", 'FECHA': "2025-06-01", 'FOLIO_CORTE': [f"C{i}" for i in range(50)],
+        'CAJERO': "Cajero 1", 'VENTAS_TOTALES_NETAS': "1,000.00", 'DIFERENCIA': diferencia.astype(str),
+        'FONDO_INICIAL': np.where(np.arange(50) == 40, "-1", "500"),
+    })
+    validas, cuarentena, resumen = validar(cortes, 'cortes')
+
+    assert cuarentena['FOLIO_CORTE'].tolist() == ["C40"]
+    assert resumen['avisos'] == {f"DIFERENCIA fuera de ±{LIMITE_DIFERENCIA_CORTE:,}": 2}
+    assert validas.index[validas[COLUMNA_ALERTA_DIFERENCIA]].tolist() == [3, 17]
+
+    limpio = limpiar_dataframe(validas)
+    assert len(limpio) == 49 and limpio['VENTAS_TOTALES_NETAS'].eq(1000).all()
+    assert limpio['DIFERENCIA'].isna().tolist() == limpio[COLUMNA_ALERTA_DIFERENCIA].tolist()
+    fuera_de_alerta = ~limpio[COLUMNA_ALERTA_DIFERENCIA]
+    assert limpio.loc[fuera_de_alerta, 'DIFERENCIA'].sum() == pytest.approx(
+        np.delete(diferencia, [3, 17, 40]).sum())
+
+
+def test_facturas_cuadre_y_aviso_de_renglones():
+    # Por folio: encabezado repetido en cada renglón, renglones sin IVA
+    facturas = pd.DataFrame({
+        'SUCURSAL': "Tienda 1", 'FECHA': "2025-06-01", 'ESTATUS': "VIGENTE",
+        'FOLIO_INTERNO':     ["A", "A", "B", "C", "C", "D", "E"],
+        'IMPORTE_RENGLON':   [60, 40, 100, 50, 20, 10, 100],
+        'SUBTOTAL_FACTURA':  [100, 100, 100, 100, 100, 10, 100],
+        'IMPUESTOS_FACTURA': [16, 16, 16, 16, 16, 1.6, 16],
+        'TOTAL_FACTURA':     [116, 116, 116, 116, 116, 11.6, 150],
+    }).astype(str)
+    validas, cuarentena, resumen = validar(facturas, 'facturas')
+
+    # E no cuadra el total: cuarentena. C no suma sus renglones: aviso por renglón, sin apartarlo
+    assert cuarentena['FOLIO_INTERNO'].tolist() == ["E"]
+    assert validas['FOLIO_INTERNO'].tolist() == ["A", "A", "B", "C", "C", "D"]
+    assert resumen['avisos'] == {"renglones no suman el SUBTOTAL_FACTURA": 2}
+    assert validas.loc[validas[COLUMNA_ALERTA_RENGLONES], 'FOLIO_INTERNO'].tolist() == ["C", "C"]
+    assert validas['TOTAL_FACTURA'].dtype.kind == 'f'
+
+
+def test_leer_limpio_valida_archivos_fuera_del_pipeline(tmp_path):
+    crudo = _ventas_crudas().drop(columns='MOTIVO')
+    ruta = tmp_path / "subido.csv"
+    crudo.to_csv(ruta, index=False)
+
+    df = leer_limpio(str(ruta))
+    assert df['FOLIO'].tolist() == ["F1", "F2", "F3"]
+    assert df['IMPORTE_REAL'].tolist() == [2501.0, -10.0, 10.0]
+
+    # Un consolidado del pipeline (con FECHA_STR) se lee tal cual
+    df.to_csv(ruta, index=False)
+    releido = leer_limpio(str(ruta))
+    assert releido['FOLIO'].tolist() == ["F1", "F2", "F3"] and releido['FECHA'].dtype.kind == 'M'
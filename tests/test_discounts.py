@@ -0,0 +1,119 @@
+import math
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from discounts import perfilar_descuentos, ARCHIVO_PERFIL, ARCHIVO_REFERENCIA, UMBRAL_DESCUENTO, CUBETAS_DESCUENTO
+
+
+def _ventas(n=1500, semilla=0):
+    rng = np.random.default_rng(semilla)
+    clave = rng.choice(['SKU1', 'SKU2', 'SKU3', 'SKU4'], n)
+    lista = pd.Series(clave).map({'SKU1': 10.0, 'SKU2': 25.0, 'SKU3': 40.0, 'SKU4': 99.0}).to_numpy()
+    suc = rng.choice(['Tienda 1', 'Tienda 2'], n)
+    dia = rng.integers(0, 120, n)
+    # SKU4 nunca se vende limpio (sin referencia); Tienda 2 no vende limpio antes de marzo
+    # (toma la mediana global del SKU) y deja de hacerlo en abril (arrastra la de marzo)
+    sin_limpio = (clave == 'SKU4') | ((suc == 'Tienda 2') & ((dia < 59) | (dia >= 90)))
+    desc = np.where((rng.random(n) < 0.3) | sin_limpio, rng.choice([5.0, 12.0, 20.0, 50.0], n), 0.0)
+    modif = np.where(rng.random(n) < 0.05, 'SI', 'NO')
+    precio = np.round(lista * (1 - desc / 100) * np.where(modif == 'SI', 0.5, 1) * rng.choice([1, 1.02, 0.98], n), 2)
+    precio[rng.random(n) < 0.02] = 0.0
+    return pd.DataFrame({
+        'SUCURSAL': suc,
+        'FECHA': (pd.Timestamp('2025-01-01') + pd.to_timedelta(dia, unit='D')).strftime('%Y-%m-%d'),
+        'CAJERO': rng.choice(['Cajero 1', 'Cajero 2'], n),
+        'CLAVE': clave,
+        'ARTICULO': pd.Series(clave).str.replace('SKU', 'Prod '),
+        'LINEA': "Linea 1",
+        'TIPO_MOV': np.where(rng.random(n) < 0.05, 'DEVOLUCION', 'VENTA'),
+        'CANTIDAD': rng.integers(1, 4, n).astype(float),
+        'PRECIO_UNITARIO_FINAL': precio,
+        '%_DESCUENTO': desc,
+        'MODIF_PRECIO': modif,
+    })
+
+
+def _fuerza_bruta(df):
+    df = df[df['TIPO_MOV'] == 'VENTA'].rename(columns={'%_DESCUENTO': 'DESC'})
+    df['MES'] = df['FECHA'].str[:7]
+
+    limpios = defaultdict(list)
+    for r in df.itertuples():
+        if r.DESC <= 0 and r.MODIF_PRECIO != 'SI' and r.PRECIO_UNITARIO_FINAL > 0:
+            limpios[(r.SUCURSAL, r.CLAVE, r.MES)].append(r.PRECIO_UNITARIO_FINAL)
+    ref_mes = {k: float(np.median(v)) for k, v in limpios.items()}
+    global_sku = defaultdict(list)
+    for (_, clave, _), p in ref_mes.items():
+        global_sku[clave].append(p)
+
+    def referencia(suc, clave, mes):
+        previos = [m for (s, c, m) in ref_mes if s == suc and c == clave and m <= mes]
+        if previos:
+            return ref_mes[(suc, clave, max(previos))]
+        return float(np.median(global_sku[clave])) if global_sku[clave] else math.nan
+
+    grupos = defaultdict(list)
+    for r in df.itertuples():
+        grupos[(r.SUCURSAL, r.CAJERO, r.CLAVE, r.FECHA)].append(
+            (r.CANTIDAD, r.PRECIO_UNITARIO_FINAL, r.DESC, r.MODIF_PRECIO == 'SI', referencia(r.SUCURSAL, r.CLAVE, r.MES)))
+
+    res = {}
+    for k, filas in grupos.items():
+        perdido = sum(max(ref - p, 0) * c for c, p, _, _, ref in filas if not math.isnan(ref))
+        manip = sum(m for *_, m, _ in filas)
+        cero = sum(p == 0 for _, p, *_ in filas)
+        con_desc = sum(d > 0 for _, _, d, _, _ in filas)
+        if not (perdido > 0 or manip or cero or con_desc):
+            continue
+        desv = [(p - ref) / ref * 100 for _, p, _, _, ref in filas if not math.isnan(ref)]
+        fila = {
+            'RENGLONES': len(filas),
+            'UNIDADES': sum(c for c, *_ in filas),
+            'VENTA': sum(c * p for c, p, *_ in filas),
+            'DESC_PROM': np.mean([d for _, _, d, _, _ in filas]),
+            'DESC_MAX': max(d for _, _, d, _, _ in filas),
+            'DESVIACION_PROM': np.mean(desv) if desv else math.nan,
+            'DESVIACION_MIN': min(desv) if desv else math.nan,
+            'INGRESO_PERDIDO': perdido,
+            'MANIPULADOS': manip,
+            'PRECIO_CERO': cero,
+            'DESC_ALTO': sum(d > UMBRAL_DESCUENTO for _, _, d, _, _ in filas),
+        }
+        for nombre, (bajo, alto) in CUBETAS_DESCUENTO.items():
+            fila[nombre] = sum(bajo < d <= alto for _, _, d, _, _ in filas)
+        res[k] = fila
+    return ref_mes, res
+
+
+def test_perfil_igual_a_fuerza_bruta(tmp_path):
+    df = _ventas()
+    ruta = tmp_path / "ventas.csv"
+    df.to_csv(ruta, index=False)
+    perfilar_descuentos(str(ruta), str(tmp_path))
+
+    ref_mes, esperado = _fuerza_bruta(df)
+
+    referencia = pd.read_csv(tmp_path / ARCHIVO_REFERENCIA, parse_dates=['MES'])
+    obtenida = {(r.SUCURSAL, r.CLAVE, r.MES.strftime('%Y-%m')): r.PRECIO_REF for r in referencia.itertuples()}
+    assert obtenida == pytest.approx(ref_mes)
+
+    perfil = pd.read_csv(tmp_path / ARCHIVO_PERFIL)
+    assert {(r.SUCURSAL, r.CAJERO, r.CLAVE, r.FECHA[:10]) for r in perfil.itertuples()} == set(esperado)
+    assert (perfil['CLAVE'] == 'SKU4').any() and perfil.loc[perfil['CLAVE'] == 'SKU4', 'DESVIACION_PROM'].isna().all()
+    for r in perfil.to_dict('records'):
+        fila = esperado[(r['SUCURSAL'], r['CAJERO'], r['CLAVE'], r['FECHA'][:10])]
+        for col, valor in fila.items():
+            if isinstance(valor, float) and math.isnan(valor):
+                assert math.isnan(r[col]), col
+            else:
+                assert r[col] == pytest.approx(valor, abs=0.006), col
+
+
+def test_faltan_columnas(tmp_path):
+    ruta = tmp_path / "ventas.csv"
+    _ventas(20).drop(columns=['MODIF_PRECIO']).to_csv(ruta, index=False)
+    with pytest.raises(ValueError, match="MODIF_PRECIO"):
+        perfilar_descuentos(str(ruta), str(tmp_path))
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import forecasting
+from forecasting import _suavizado_estacional, pronosticar_bloque, matriz_series, TEMPORADA, CALENTAMIENTO
+
+
+def _suavizado_escalar(y, alpha, gamma):
+    # Una serie y un par de parámetros a la vez, con ciclos de Python
+    nivel = y[:TEMPORADA].mean()
+    estac = list(y[:TEMPORADA] - nivel)
+    sse = 0.0
+    for t, valor in enumerate(y):
+        d = t % TEMPORADA
+        err = valor - (nivel + estac[d])
+        if t >= CALENTAMIENTO:
+            sse += err ** 2
+        nivel += alpha * err
+        estac[d] += gamma * err
+    return nivel, estac, sse
+
+
+def test_suavizado_vectorizado_igual_a_escalar():
+    rng = np.random.default_rng(5)
+    y = rng.gamma(3, 100, (6, 60)) + np.tile(np.arange(TEMPORADA) * 20.0, 9)[:60]
+    alpha, gamma = np.array([0.1, 0.3]), np.array([0.05, 0.2])
+    nivel, estac, sse = _suavizado_estacional(y, alpha, gamma)
+
+    for s in range(len(y)):
+        for k in range(len(alpha)):
+            n, e, q = _suavizado_escalar(y[s], alpha[k], gamma[k])
+            assert nivel[s, k] == pytest.approx(n)
+            assert estac[s, k] == pytest.approx(e)
+            assert sse[s, k] == pytest.approx(q)
+
+
+def test_serie_periodica_se_pronostica_exacta():
+    patron = np.array([10.0, 20, 30, 40, 50, 60, 70])
+    y = np.tile(patron, 8)[None, :]
+    pron, sigma, _ = pronosticar_bloque(y, horizonte=14)
+    assert pron[0] == pytest.approx(np.tile(patron, 2))
+    assert sigma[0] == pytest.approx(0.0, abs=1e-9)
+
+
+def test_intervalos_crecen_con_el_horizonte():
+    rng = np.random.default_rng(1)
+    y = rng.normal(500, 50, (4, 70))
+    _, sigma, _ = pronosticar_bloque(y, horizonte=21)
+    assert (np.diff(sigma, axis=1) >= -1e-12).all()
+
+
+def test_matriz_series_totales(monkeypatch):
+    monkeypatch.setattr(forecasting, 'HISTORIA_DIAS', 30)
+    rng = np.random.default_rng(2)
+    n = 800
+    df = pd.DataFrame({
+        'SUCURSAL': rng.choice(['Tienda 1', 'Tienda 2'], n),
+        'LINEA': rng.choice(['Linea 1', 'Linea 2', 'Linea 3'], n),
+        'FECHA': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 45, n), unit='D'),
+        'IMPORTE_REAL': rng.uniform(-50, 500, n),
+    })
+    m = matriz_series(df)
+
+    # Sólo los últimos HISTORIA_DIAS días, continuos
+    assert len(m.columns) == 30 and m.columns[-1] == df['FECHA'].max()
+    recorte = df[df['FECHA'] >= m.columns[0]]
+    for (suc, lin), fila in m.iterrows():
+        sel = recorte
+        if suc != "Todos":
+            sel = sel[sel['SUCURSAL'] == suc]
+        if lin != "Todas":
+            sel = sel[sel['LINEA'] == lin]
+        esperado = sel.groupby('FECHA')['IMPORTE_REAL'].sum().reindex(m.columns, fill_value=0.0)
+        assert fila.to_numpy() == pytest.approx(esperado.to_numpy())
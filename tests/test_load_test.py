@@ -0,0 +1,37 @@
+import os
+
+import pandas as pd
+import pytest
+
+from data_validation import validar
+from load_test import generar_datos, TIENDAS
+
+ARCHIVOS = {
+    'ventas': "Reporte_Ventas_Historico.csv",
+    'cortes': "Reporte_Cortes_Detallado.csv",
+    'facturas': "Reporte_Facturas_Detallado.csv",
+}
+
+
+@pytest.fixture(scope='module')
+def carpeta(tmp_path_factory):
+    carpeta = tmp_path_factory.mktemp("carga")
+    generar_datos(str(carpeta), tickets=3000, dias=60, semilla=1)
+    return carpeta
+
+
+@pytest.mark.parametrize("reporte", list(ARCHIVOS))
+def test_datos_sinteticos_pasan_validacion(carpeta, reporte):
+    # Si el generador no respeta las reglas, la prueba de carga mide un dashboard sin datos
+    df = pd.read_csv(os.path.join(carpeta, ARCHIVOS[reporte]))
+    validas, cuarentena, resumen = validar(df, reporte)
+    assert resumen['cuarentena'] == 0, resumen['motivos']
+    assert resumen['avisos'] == {}
+    assert len(validas) == len(df)
+
+
+def test_rango_y_tiendas(carpeta):
+    cortes = pd.read_csv(os.path.join(carpeta, ARCHIVOS['cortes']), parse_dates=['FECHA'])
+    assert cortes['FECHA'].nunique() == 60
+    assert sorted(cortes['SUCURSAL'].unique()) == sorted(TIENDAS)
+    assert (cortes.groupby(['SUCURSAL', 'FECHA']).size() == 2).all()
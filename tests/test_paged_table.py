@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+import paged_table
+from paged_table import _seleccion, _csv_en_bloques
+
+
+@pytest.fixture(autouse=True)
+def sin_cache():
+    st.cache_data.clear()
+
+
+def _detalle(n=500, semilla=0):
+    rng = np.random.default_rng(semilla)
+    df = pd.DataFrame({
+        'FECHA': pd.Timestamp('2025-01-01') + pd.to_timedelta(rng.integers(0, 30, n), unit='D'),
+        'SUCURSAL': rng.choice(['Tienda Centro', 'Tienda Norte', 'Sucursal Ñuñoa'], n),
+        'ARTICULO': rng.choice(['Café', 'Azúcar', 'Leche', None], n),
+        'IMPORTE': np.where(rng.random(n) < 0.05, np.nan, rng.uniform(0, 100, n).round(2)),
+    })
+    # Índice desordenado y no consecutivo, como queda después de filtrar
+    return df.set_axis(rng.permutation(n) * 3 + 7)
+
+
+@pytest.mark.parametrize("columna", ['FECHA', 'SUCURSAL', 'IMPORTE'])
+@pytest.mark.parametrize("descendente", [True, False])
+@pytest.mark.parametrize("texto", ['', 'tienda', 'AZÚ', 'no existe'])
+def test_seleccion_igual_a_sort_y_contains(columna, descendente, texto):
+    df = _detalle()
+    etiquetas = _seleccion(df, ('detalle', columna, descendente, texto), columna, descendente, texto)
+
+    esperado = df.sort_values(columna, ascending=not descendente, kind='stable', na_position='last')
+    if texto:
+        mascara = esperado[['SUCURSAL', 'ARTICULO']].apply(
+            lambda c: c.astype(str).str.lower().str.contains(texto.lower(), regex=False)).any(axis=1)
+        esperado = esperado[mascara]
+    assert etiquetas.tolist() == esperado.index.tolist()
+
+
+def test_csv_en_bloques_igual_a_to_csv(monkeypatch):
+    monkeypatch.setattr(paged_table, 'FILAS_POR_BLOQUE_CSV', 37)
+    df = _detalle()
+    etiquetas = _seleccion(df, 'csv', 'IMPORTE', True, 'a')
+    esperado = df.loc[etiquetas].to_csv(index=False).encode('utf-8-sig')
+    assert _csv_en_bloques(df, etiquetas).getvalue() == esperado
+    assert _csv_en_bloques(df, etiquetas[:0]).getvalue() == b''
+
+
+def _app():
+    import numpy as np
+    import pandas as pd
+    from paged_table import tabla_paginada
+    df = pd.DataFrame({'N': np.arange(130), 'TEXTO': [f"fila {i}" for i in range(130)]})
+    tabla_paginada(df, 'app', key="t", orden='N', descendente=False)
+
+
+def test_pagina_visible():
+    at = AppTest.from_function(_app).run()
+    assert not at.exception
+    assert at.dataframe[0].value['N'].tolist() == list(range(50))
+
+    at.number_input(key="t_pagina").set_value(3).run()
+    assert at.dataframe[0].value['N'].tolist() == list(range(100, 130))
+    assert "101–130 de 130" in at.caption[0].value
+
+    # Buscar vuelve a la primera página
+    at.text_input(key="t_buscar").input("fila 12").run()
+    assert at.dataframe[0].value['N'].tolist() == [12] + list(range(120, 130))
+    assert at.number_input(key="t_pagina").value == 1
+
+
+def _app_dos_tablas():
+    import pandas as pd
+    from paged_table import tabla_paginada
+    # Mismos filtros y mismo número de filas, contenido e índices distintos
+    alertas = pd.DataFrame({'FECHA': ['2025-06-01', '2025-06-02'], 'FOLIO': ['C1', 'C2']}, index=[10, 11])
+    devoluciones = pd.DataFrame({'FECHA': ['2025-06-03', '2025-06-04'], 'FOLIO': ['D1', 'D2']}, index=[20, 21])
+    tabla_paginada(alertas, 'filtros', key="tabla_alertas", orden='FECHA')
+    tabla_paginada(devoluciones, 'filtros', key="tabla_devoluciones", orden='FECHA')
+
+
+def test_tablas_con_la_misma_clave_no_comparten_orden():
+    at = AppTest.from_function(_app_dos_tablas).run()
+    assert not at.exception
+    assert at.dataframe[0].value['FOLIO'].tolist() == ['C2', 'C1']
+    assert at.dataframe[1].value['FOLIO'].tolist() == ['D2', 'D1']
@@ -0,0 +1,87 @@
+import json
+import os
+
+import pytest
+
+import pipeline_dag
+from pipeline_dag import Etapa, ejecutar_dag, ejecutar_programador
+
+
+def _escribir(ruta, texto):
+    with open(ruta, 'w', encoding='utf-8') as f:
+        f.write(texto)
+
+
+def _etapas(tmp_path, llamadas):
+    entrada, medio, salida = (str(tmp_path / n) for n in ('entrada.txt', 'medio.txt', 'salida.txt'))
+
+    def paso(origen, destino, nombre):
+        llamadas.append(nombre)
+        with open(origen, encoding='utf-8') as f:
+            _escribir(destino, f.read().upper())
+        return {'filas': 1}
+
+    return entrada, [
+        Etapa('a', lambda: paso(entrada, medio, 'a'), entradas=[entrada], salidas=[medio]),
+        Etapa('b', lambda: paso(medio, salida, 'b'), entradas=[medio], salidas=[salida], depende_de=['a']),
+    ]
+
+
+def test_omite_con_entradas_iguales_y_reejecuta_al_cambiar(tmp_path):
+    llamadas = []
+    entrada, etapas = _etapas(tmp_path, llamadas)
+    manifiesto = str(tmp_path / 'estado.json')
+    _escribir(entrada, 'uno')
+
+    assert ejecutar_dag(etapas, manifiesto) == {'a': 'OK', 'b': 'OK'}
+    assert ejecutar_dag(etapas, manifiesto) == {'a': 'OMITIDA', 'b': 'OMITIDA'}
+    _escribir(entrada, 'dos')
+    assert ejecutar_dag(etapas, manifiesto) == {'a': 'OK', 'b': 'OK'}
+    assert llamadas == ['a', 'b', 'a', 'b']
+
+    # Lo que devuelve la acción queda en el manifiesto
+    with open(manifiesto, encoding='utf-8') as f:
+        assert json.load(f)['etapas']['a']['resultado'] == {'filas': 1}
+
+
+def test_error_bloquea_dependientes(tmp_path):
+    def falla():
+        raise RuntimeError("sin conexión")
+
+    etapas = [Etapa('a', falla), Etapa('b', lambda: None, depende_de=['a'])]
+    assert ejecutar_dag(etapas, str(tmp_path / 'estado.json')) == {'a': 'ERROR', 'b': 'BLOQUEADA'}
+
+
+def test_ciclo_detectado():
+    with pytest.raises(ValueError):
+        pipeline_dag.orden_topologico([Etapa('a', None, depende_de=['b']), Etapa('b', None, depende_de=['a'])])
+
+
+def test_programador_sobrevive_a_un_ciclo_fallido(tmp_path, monkeypatch):
+    manifiesto = str(tmp_path / 'estado.json')
+    corridas = []
+
+    def ejecutar(etapas, ruta, grupos=None):
+        corridas.append(grupos)
+        if len(corridas) == 1:
+            raise OSError("manifiesto bloqueado")
+
+    class Fin(Exception):
+        pass
+
+    revisiones = []
+
+    def dormir(_):
+        revisiones.append(1)
+        if len(revisiones) == 2:
+            raise Fin
+
+    monkeypatch.setattr(pipeline_dag, 'ejecutar_dag', ejecutar)
+    monkeypatch.setattr(pipeline_dag.time, 'sleep', dormir)
+    with pytest.raises(Fin):
+        ejecutar_programador([], manifiesto, {'ventas': 60})
+
+    # El primer ciclo falló sin marcar el grupo: el segundo lo reintenta y lo marca
+    assert corridas == [['ventas'], ['ventas']]
+    assert 'ventas' in pipeline_dag.cargar_manifiesto(manifiesto)['grupos']
+    assert os.path.exists(manifiesto)
@@ -0,0 +1,78 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+import snapshot
+from data_cleaning import leer_limpio
+from snapshot import publicar_snapshot, leer_puntero, leer_arrow
+
+
+def _consolidado(ruta, n=300, semilla=0):
+    rng = np.random.default_rng(semilla)
+    fecha = pd.Timestamp('2025-03-01') + pd.to_timedelta(np.sort(rng.integers(0, 60, n)), unit='D')
+    pd.DataFrame({
+        'FECHA': fecha,
+        'FECHA_STR': fecha.strftime('%Y-%m-%d'),
+        'SUCURSAL': rng.choice(['Tienda 1', 'Tienda 2', None], n),
+        'CANTIDAD': rng.integers(1, 5, n),
+        'IMPORTE_REAL': rng.uniform(0, 100, n).round(2),
+    }).to_csv(ruta, index=False)
+
+
+def _igual(a, b):
+    # Las cadenas del snapshot vienen como ArrowDtype: se comparan por valor
+    assert list(a.columns) == list(b.columns) and len(a) == len(b)
+    for col in a.columns:
+        assert a[col].astype(object).where(a[col].notna(), None).tolist() == \
+               b[col].astype(object).where(b[col].notna(), None).tolist(), col
+
+
+def test_ida_y_vuelta_igual_a_leer_limpio(tmp_path):
+    ruta = str(tmp_path / "ventas.csv")
+    _consolidado(ruta)
+    dir_snapshot = str(tmp_path / "snapshot")
+    publicar_snapshot({'ventas': ruta, 'cortes': str(tmp_path / "no_existe.csv")}, dir_snapshot)
+
+    puntero = leer_puntero(dir_snapshot)
+    assert set(puntero['reportes']) == {'ventas'}
+    info = puntero['reportes']['ventas']
+    assert info['formato'] == snapshot.FORMATO and info['origen'] == "ventas.csv" and info['filas'] == 300
+    _igual(leer_arrow(os.path.join(dir_snapshot, info['archivo'])), leer_limpio(ruta))
+
+
+def test_sin_cambios_se_reutiliza_y_otro_formato_se_republica(tmp_path):
+    ruta = str(tmp_path / "ventas.csv")
+    _consolidado(ruta)
+    dir_snapshot = str(tmp_path / "snapshot")
+    publicar_snapshot({'ventas': ruta}, dir_snapshot)
+    primero = leer_puntero(dir_snapshot)['reportes']['ventas']
+
+    publicar_snapshot({'ventas': ruta}, dir_snapshot)
+    assert leer_puntero(dir_snapshot)['reportes']['ventas'] == primero
+
+    # Un snapshot de un formato anterior (sin validar) no se reutiliza aunque el CSV no cambie
+    puntero = leer_puntero(dir_snapshot)
+    puntero['reportes']['ventas']['formato'] = snapshot.FORMATO - 1
+    with open(os.path.join(dir_snapshot, snapshot.ARCHIVO_PUNTERO), 'w', encoding='utf-8') as f:
+        json.dump(puntero, f)
+    os.remove(os.path.join(dir_snapshot, primero['archivo']))
+    publicar_snapshot({'ventas': ruta}, dir_snapshot)
+    nuevo = leer_puntero(dir_snapshot)['reportes']['ventas']
+    assert nuevo['formato'] == snapshot.FORMATO
+    assert os.path.exists(os.path.join(dir_snapshot, nuevo['archivo']))
+
+
+def test_csv_modificado_se_republica(tmp_path):
+    ruta = str(tmp_path / "ventas.csv")
+    _consolidado(ruta)
+    dir_snapshot = str(tmp_path / "snapshot")
+    publicar_snapshot({'ventas': ruta}, dir_snapshot)
+    firma = leer_puntero(dir_snapshot)['reportes']['ventas']['firma']
+
+    _consolidado(ruta, n=120, semilla=4)
+    publicar_snapshot({'ventas': ruta}, dir_snapshot)
+    info = leer_puntero(dir_snapshot)['reportes']['ventas']
+    assert info['firma'] != firma and info['filas'] == 120
+    _igual(leer_arrow(os.path.join(dir_snapshot, info['archivo'])), leer_limpio(ruta))
@@ -0,0 +1,130 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import sorted_merge
+from sorted_merge import fusionar_ordenado, leer_rango, leer_indice, ruta_indice
+
+
+@pytest.fixture(autouse=True)
+def bloques_chicos(monkeypatch):
+    # Bloques y grupos chicos para que la mezcla dé muchas vueltas con pocos datos
+    monkeypatch.setattr(sorted_merge, 'FILAS_BLOQUE', 17)
+    monkeypatch.setattr(sorted_merge, 'FILAS_POR_GRUPO', 23)
+
+
+def _shards(carpeta, semilla=0):
+    rng = np.random.default_rng(semilla)
+    rutas = []
+    for i, n in enumerate([150, 0, 90, 200]):
+        fechas = np.sort(pd.Timestamp('2025-01-01') + pd.to_timedelta(rng.integers(0, 40, n), unit='D'))
+        df = pd.DataFrame({
+            'SUCURSAL': f"Tienda {i}",
+            'FECHA': pd.DatetimeIndex(fechas).strftime('%Y-%m-%d'),
+            'FOLIO': [f"F{i}-{j}" for j in range(n)],
+            'IMPORTE': rng.uniform(0, 100, n).round(2),
+        })
+        if i == 2:
+            df['CLIENTE'] = "Cliente, con coma"      # Columna que sólo trae una tienda
+        if i == 3:
+            df = pd.concat([df, df.head(3).assign(FECHA='', FOLIO=lambda d: d['FOLIO'] + "-sin-fecha")])
+        ruta = str(carpeta / f"shard_{i}.csv")
+        df.to_csv(ruta, index=False)
+        rutas.append(ruta)
+    return rutas
+
+
+def _leer_texto(ruta):
+    return pd.read_csv(ruta, dtype=str, keep_default_na=False)
+
+
+def _concat_y_ordenar(rutas):
+    partes = [_leer_texto(r) for r in rutas]
+    columnas = list(dict.fromkeys(c for p in partes for c in p.columns))
+    todo = pd.concat([p.reindex(columns=columnas, fill_value='') for p in partes], ignore_index=True)
+    orden = pd.to_datetime(todo['FECHA'], errors='coerce')
+    return todo.iloc[np.argsort(orden.fillna(pd.Timestamp.max).to_numpy(), kind='stable')].reset_index(drop=True)
+
+
+def test_fusion_igual_a_concat_y_sort_estable(tmp_path):
+    rutas = _shards(tmp_path)
+    salida = str(tmp_path / "consolidado.csv")
+    indice = fusionar_ordenado(rutas, salida)
+
+    esperado = _concat_y_ordenar(rutas)
+    obtenido = _leer_texto(salida)
+    pd.testing.assert_frame_equal(obtenido, esperado)
+    assert obtenido['FECHA'].iloc[-3:].eq('').all()      # Sin fecha al final
+
+    # Índice: grupos contiguos que cubren el archivo y sus fechas
+    assert indice == leer_indice(salida)
+    assert indice['filas'] == len(esperado)
+    assert sum(g['filas'] for g in indice['grupos']) == len(esperado)
+    for a, b in zip(indice['grupos'], indice['grupos'][1:]):
+        assert a['byte_fin'] == b['byte_inicio'] and a['fila_inicio'] + a['filas'] == b['fila_inicio']
+    fechas = pd.to_datetime(esperado['FECHA'], errors='coerce')
+    for g in indice['grupos']:
+        tramo = fechas.iloc[g['fila_inicio']:g['fila_inicio'] + g['filas']].dropna()
+        if len(tramo):
+            assert (pd.Timestamp(g['fecha_min']), pd.Timestamp(g['fecha_max'])) == (tramo.min(), tramo.max())
+
+
+def test_shard_desordenado_falla(tmp_path):
+    ruta = str(tmp_path / "desordenado.csv")
+    fechas = pd.date_range('2025-01-01', periods=40).strftime('%Y-%m-%d').tolist()
+    fechas[30], fechas[5] = fechas[5], fechas[30]    # En otro bloque que el primero
+    pd.DataFrame({'FECHA': fechas, 'X': range(40)}).to_csv(ruta, index=False)
+    with pytest.raises(ValueError, match="no está ordenado"):
+        fusionar_ordenado([ruta], str(tmp_path / "salida.csv"))
+
+
+def test_leer_rango_igual_a_mascara(tmp_path):
+    rutas = _shards(tmp_path, semilla=3)
+    salida = str(tmp_path / "consolidado.csv")
+    fusionar_ordenado(rutas, salida)
+    completo = pd.read_csv(salida, parse_dates=['FECHA'])
+
+    rng = np.random.default_rng(8)
+    rangos = [(None, None), (None, '2025-01-10'), ('2025-01-30', None), ('2024-06-01', '2024-07-01')]
+    for _ in range(15):
+        a, b = sorted(rng.integers(-3, 43, 2))
+        rangos.append(tuple(str(pd.Timestamp('2025-01-01') + pd.Timedelta(days=int(d))) for d in (a, b)))
+
+    for desde, hasta in rangos:
+        mascara = pd.Series(True, index=completo.index)
+        if desde is not None:
+            mascara &= completo['FECHA'] >= pd.Timestamp(desde)
+        if hasta is not None:
+            mascara &= completo['FECHA'] <= pd.Timestamp(hasta)
+        obtenido = leer_rango(salida, desde, hasta).reset_index(drop=True)
+        pd.testing.assert_frame_equal(obtenido, completo[mascara].reset_index(drop=True), check_dtype=False)
+
+
+def test_indice_viejo_se_ignora(tmp_path):
+    rutas = _shards(tmp_path, semilla=5)
+    salida = str(tmp_path / "consolidado.csv")
+    fusionar_ordenado(rutas, salida)
+    with open(ruta_indice(salida), encoding='utf-8') as fh:
+        grupos = json.load(fh)['grupos']
+
+    # Otro proceso reescribió el CSV sin actualizar el índice (cambia el tamaño)
+    with open(salida, 'a', encoding='utf-8') as f:
+        f.write("Tienda 9,2025-01-02,EXTRA,1.0,\n")
+    assert leer_indice(salida) is None
+    rango = leer_rango(salida, '2025-01-02', '2025-01-02')
+    assert 'EXTRA' in rango['FOLIO'].tolist()
+    assert len(grupos) > 1
+
+
+def test_un_dia_en_muchos_bloques(tmp_path):
+    # Todas las filas con la misma fecha: la mezcla tiene que avanzar y dejar cada tienda junta
+    rutas = []
+    for i, n in enumerate([60, 5, 41]):
+        ruta = str(tmp_path / f"dia_{i}.csv")
+        pd.DataFrame({'FECHA': '2025-01-01', 'SUCURSAL': f"Tienda {i}", 'N': range(n)}).to_csv(ruta, index=False)
+        rutas.append(ruta)
+    salida = str(tmp_path / "consolidado.csv")
+    fusionar_ordenado(rutas, salida)
+    pd.testing.assert_frame_equal(_leer_texto(salida), _concat_y_ordenar(rutas))